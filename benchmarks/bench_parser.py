@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare the throughput of the available XML parser backends on synthetic JUnitXML results."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import time
+import click
+import shutil
+import tempfile
+from py_result_uploader.parser import available_backends
+from py_result_uploader.py_result_uploader import _load_input_file, _iter_input_testcases
+from junit_generator import generate_junit_xml
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_CASES = (10000, 100000, 1000000)
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _measure(file_path, backend_name):
+    """Parse a file completely and incrementally with a parser backend and measure the time taken for each.
+
+    Args:
+        file_path (str): The JUnitXML results file.
+        backend_name (str): The name of the parser backend.
+
+    Returns:
+        tuple(float, float): The seconds taken to load the whole document and to stream every testcase.
+    """
+
+    start = time.perf_counter()
+    _load_input_file(file_path, backend_name).findall('testcase')
+    loaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in _iter_input_testcases(file_path, backend_name):
+        pass
+    streamed = time.perf_counter() - start
+
+    return loaded, streamed
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.option('--cases', type=click.IntRange(min=1), multiple=True, default=DEFAULT_CASES, show_default=True,
+              help='The number of testcases to parse. (Can be given multiple times)')
+def main(cases):
+    """Compare the XML parser backends."""
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        click.echo('{:>10}{:>10}{:>16}{:>16}'.format('cases', 'parser', 'load cases/s', 'stream cases/s'))
+        for case_count in cases:
+            file_path = generate_junit_xml(os.path.join(temp_dir, 'junit_{}.xml'.format(case_count)), case_count)
+            for backend_name in available_backends():
+                loaded, streamed = _measure(file_path, backend_name)
+                click.echo('{:>10}{:>10}{:>16.0f}{:>16.0f}'.format(case_count,
+                                                                   backend_name,
+                                                                   case_count / loaded,
+                                                                   case_count / streamed))
+            os.remove(file_path)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Time every phase of an upload against synthetic JUnitXML results and record the throughput of each phase."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import sys
+import json
+import time
+import click
+import shutil
+import platform
+import tempfile
+import subprocess
+from py_result_uploader.py_result_uploader import _load_input_file, _build_auto_request, QTestUploader
+from py_result_uploader.serializer import serialize_auto_request, submit_serialized
+from py_result_uploader.fake_server import FakeQTestServer
+from py_result_uploader.parser import get_backend
+from junit_generator import (generate_junit_xml, DEFAULT_FAILURE_RATIO, DEFAULT_SKIP_RATIO, DEFAULT_TRACEBACK_LINES,
+                             DEFAULT_FANOUT, DEFAULT_PROPERTIES, DEFAULT_SEED)
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_CASES = (1000, 10000, 100000)
+PROJECT_ID = 12345
+TEST_CYCLE = 'CL-1'
+PHASES = ('parse', 'build', 'stream', 'serialize', 'submit', 'upload')
+WARM_UP_CASES = 10
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _git_commit():
+    """Identify the commit being measured so results can be compared across commits.
+
+    Returns:
+        str: The commit hash of the working tree. (None if it is not a git checkout)
+    """
+
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _timed(func, *args):
+    """Call a function and measure how long it took.
+
+    Args:
+        func (callable): The function to call.
+        *args: The arguments for the function.
+
+    Returns:
+        tuple(object, float): The return value and elapsed time in seconds.
+    """
+
+    start = time.perf_counter()
+    result = func(*args)
+
+    return result, time.perf_counter() - start
+
+
+def _measure(file_path, host):
+    """Time every phase of an upload for a single JUnitXML results file.
+
+    Args:
+        file_path (str): The JUnitXML results file.
+        host (str): The base URL of the fake qTest API.
+
+    Returns:
+        dict: The elapsed time in seconds of every phase. ("build" and "stream" include parsing the file, "upload" is
+            the whole upload as run by the CLI)
+    """
+
+    timings = {}
+
+    _, timings['parse'] = _timed(_load_input_file, file_path)
+    auto_req, timings['build'] = _timed(_build_auto_request, [file_path], TEST_CYCLE)
+    _, timings['stream'] = _timed(_build_auto_request, [file_path], TEST_CYCLE, True)
+
+    with QTestUploader('token', host) as uploader:
+        body, timings['serialize'] = _timed(serialize_auto_request, uploader.api_client, auto_req)
+        _, timings['submit'] = _timed(submit_serialized, uploader.api_client, PROJECT_ID, body)
+        _, timings['upload'] = _timed(uploader.upload_test_results, file_path, PROJECT_ID, TEST_CYCLE)
+
+    return timings
+
+
+def _warm_up(temp_dir, host):
+    """Run every phase once on a tiny results file so that the lazily imported modules (e.g. "swagger_client" and
+    the parser backend) are loaded before anything is timed.
+
+    Args:
+        temp_dir (str): The directory to write the results file to.
+        host (str): The base URL of the fake qTest API.
+    """
+
+    file_path = generate_junit_xml(os.path.join(temp_dir, 'warm_up.xml'), WARM_UP_CASES)
+    _measure(file_path, host)
+    os.remove(file_path)
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.option('--cases', type=click.IntRange(min=1), multiple=True, default=DEFAULT_CASES, show_default=True,
+              help='The number of testcases to measure. (Can be given multiple times)')
+@click.option('--failure-ratio', type=click.FloatRange(0, 1), default=DEFAULT_FAILURE_RATIO, show_default=True,
+              help='The fraction of testcases that fail or error.')
+@click.option('--skip-ratio', type=click.FloatRange(0, 1), default=DEFAULT_SKIP_RATIO, show_default=True,
+              help='The fraction of testcases that are skipped.')
+@click.option('--traceback-lines', type=click.IntRange(min=1), default=DEFAULT_TRACEBACK_LINES, show_default=True,
+              help='The number of lines in the traceback of every failure.')
+@click.option('--fanout', type=click.IntRange(min=1), default=DEFAULT_FANOUT, show_default=True,
+              help='The number of parameters every test is run with.')
+@click.option('--properties', type=click.IntRange(min=0), default=DEFAULT_PROPERTIES, show_default=True,
+              help='The number of testsuite properties in addition to GIT_BRANCH.')
+@click.option('--seed', type=click.INT, default=DEFAULT_SEED, show_default=True,
+              help='The seed for the random number generator.')
+@click.option('--json-output', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Write the results to a JSON file for comparison across commits.')
+def main(cases, failure_ratio, skip_ratio, traceback_lines, fanout, properties, seed, json_output):
+    """Measure the throughput of every upload phase against a local fake qTest API."""
+
+    server = FakeQTestServer().start()
+    temp_dir = tempfile.mkdtemp()
+    results = []
+
+    try:
+        _warm_up(temp_dir, server.url)
+
+        click.echo('{:>10}{:>12}{:>14}{:>16}'.format('cases', 'phase', 'seconds', 'cases/sec'))
+        for case_count in cases:
+            file_path = generate_junit_xml(os.path.join(temp_dir, 'junit_{}.xml'.format(case_count)),
+                                           case_count,
+                                           failure_ratio,
+                                           skip_ratio,
+                                           traceback_lines,
+                                           fanout,
+                                           properties,
+                                           seed)
+            timings = _measure(file_path, server.url)
+            os.remove(file_path)
+
+            for phase in PHASES:
+                throughput = case_count / timings[phase] if timings[phase] else float('inf')
+                results.append({'cases': case_count,
+                                'phase': phase,
+                                'seconds': timings[phase],
+                                'cases_per_sec': throughput})
+                click.echo('{:>10}{:>12}{:>14.4f}{:>16.0f}'.format(case_count, phase, timings[phase], throughput))
+    finally:
+        server.stop()
+        shutil.rmtree(temp_dir)
+
+    if json_output:
+        with open(json_output, 'w') as f:
+            json.dump({'commit': _git_commit(),
+                       'python': platform.python_version(),
+                       'platform': sys.platform,
+                       'parser': get_backend().name,
+                       'parameters': {'failure_ratio': failure_ratio,
+                                      'skip_ratio': skip_ratio,
+                                      'traceback_lines': traceback_lines,
+                                      'fanout': fanout,
+                                      'properties': properties,
+                                      'seed': seed},
+                       'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Measure the per-case memory and build cost of compact test log records against full swagger models."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import time
+import click
+import tracemalloc
+import swagger_client
+from py_result_uploader.records import CompactTestLog
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+MODULE_NAME = 'master'
+TIMESTAMP = '2018-01-01T00:00:00Z'
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _build_model(index):
+    test_log = swagger_client.AutomationTestLogResource()
+    test_log.name = 'test_case_{}'.format(index)
+    test_log.status = 'PASSED'
+    test_log.module_names = [MODULE_NAME]
+    test_log.exe_start_date = TIMESTAMP
+    test_log.exe_end_date = TIMESTAMP
+    test_log.automation_content = '{}#{}'.format(MODULE_NAME, test_log.name)
+
+    return test_log
+
+
+def _build_record(index):
+    name = 'test_case_{}'.format(index)
+
+    return CompactTestLog(name, 'PASSED', MODULE_NAME, TIMESTAMP, TIMESTAMP, '{}#{}'.format(MODULE_NAME, name))
+
+
+def _measure(build, cases):
+    """Build the given number of test logs and measure the time taken and the memory retained.
+
+    Args:
+        build (callable): Builds a single test log from its index.
+        cases (int): The number of test logs to build.
+
+    Returns:
+        tuple(float, int): The build time and retained memory in bytes per case.
+    """
+
+    start = time.perf_counter()
+    test_logs = [build(index) for index in range(cases)]
+    elapsed = time.perf_counter() - start
+    del test_logs
+
+    tracemalloc.start()     # Measured separately as tracing slows down the build considerably.
+    test_logs = [build(index) for index in range(cases)]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del test_logs
+
+    return elapsed / cases, retained / cases
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.option('--cases', type=click.IntRange(min=1), default=100000, show_default=True,
+              help='The number of test logs to build.')
+def main(cases):
+    """Compare compact test log records with swagger models."""
+
+    for label, build in (('AutomationTestLogResource', _build_model), ('CompactTestLog', _build_record)):
+        seconds, memory = _measure(build, cases)
+        click.echo('{:<28}{:>10.2f} us/case{:>10.0f} bytes/case'.format(label, seconds * 1e6, memory))
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare building the test logs of a single large JUnitXML file sequentially and in parallel shards."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import click
+import shutil
+import tempfile
+from py_result_uploader.py_result_uploader import _build_testsuites
+from py_result_uploader.sharding import find_testcases, DEFAULT_SHARD_BYTES
+from bench_pipeline import _timed
+from junit_generator import generate_junit_xml
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_CASES = (100000, 1000000)
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.option('--cases', type=click.IntRange(min=1), multiple=True, default=DEFAULT_CASES, show_default=True,
+              help='The number of testcases in the file. (Can be given multiple times)')
+@click.option('--processes', type=click.IntRange(min=1), default=os.cpu_count(), show_default=True,
+              help='The number of worker processes to parse the shards with.')
+@click.option('--shard-bytes', type=click.IntRange(min=1), default=DEFAULT_SHARD_BYTES, show_default=True,
+              help='The approximate size in bytes of every shard.')
+def main(cases, processes, shard_bytes):
+    """Measure the speed up of parsing shards of a single file in parallel."""
+
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        click.echo('{:>10}{:>10}{:>10}{:>14}{:>14}{:>10}'.format('cases', 'MB', 'shards', 'scan s',
+                                                                 'sequential s', 'speedup'))
+        for case_count in cases:
+            file_path = generate_junit_xml(os.path.join(temp_dir, 'junit_{}.xml'.format(case_count)), case_count)
+            layout, scanned = _timed(find_testcases, file_path, shard_bytes)
+            _, sequential = _timed(_build_testsuites, file_path, False, 1)
+            _, sharded = _timed(_build_testsuites, file_path, False, processes, False, None, None, shard_bytes)
+            row = (case_count, os.path.getsize(file_path) / 1e6, len(layout.ranges) if layout else 1, scanned,
+                   sequential, sequential / sharded)
+            click.echo('{:>10}{:>10.1f}{:>10}{:>14.3f}{:>14.3f}{:>10.2f}'.format(*row))
+            os.remove(file_path)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
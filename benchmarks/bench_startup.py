@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Measure the cold start latency of the CLI and guard it against regressions."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import sys
+import json
+import time
+import click
+import platform
+import subprocess
+from bench_pipeline import _git_commit
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_RUNS = 20
+# Modules that are only needed once results are parsed or uploaded and must never be imported by "--help".
+HEAVY_MODULES = ('swagger_client', 'urllib3', 'asyncio', 'multiprocessing', 'sqlite3', 'lxml', 'watchdog',
+                 'xml.etree.ElementTree')
+SCENARIOS = (('interpreter', 'pass'),
+             ('import', 'import py_result_uploader.cli'),
+             ('help', 'from py_result_uploader.cli import main\n'
+                      'try:\n'
+                      '    main(["--help"])\n'
+                      'except SystemExit:\n'
+                      '    pass'))
+REPORT_HEAVY_MODULES = '\nimport sys\nsys.stderr.write(",".join(m for m in {!r} if m in sys.modules))'
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _run(code):
+    """Run Python code in a fresh interpreter and measure the wall clock time it takes.
+
+    Args:
+        code (str): The Python code to run.
+
+    Returns:
+        tuple(float, str): The seconds taken and everything written to stderr.
+    """
+
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-c', code], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - start
+
+    if process.returncode:
+        raise click.ClickException('The benchmark failed:\n{}'.format(process.stderr.decode('utf-8')))
+
+    return elapsed, process.stderr.decode('utf-8')
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.option('--runs', type=click.IntRange(min=1), default=DEFAULT_RUNS, show_default=True,
+              help='The number of fresh interpreters to time for every scenario.')
+@click.option('--max-seconds', type=click.FloatRange(min=0), default=None,
+              help='Fail when the median time of "--help" beyond interpreter start up exceeds this many seconds.')
+@click.option('--json-output', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Write the results to a JSON file for comparison across commits.')
+def main(runs, max_seconds, json_output):
+    """Measure the cold start latency of "py_result_uploader --help"."""
+
+    _run('import py_result_uploader.cli')     # Warm the bytecode cache so that only start up is measured.
+    results = []
+
+    click.echo('{:>12}{:>12}{:>12}'.format('scenario', 'median', 'min'))
+    for name, code in SCENARIOS:
+        timings = [_run(code)[0] for _ in range(runs)]
+        results.append({'scenario': name, 'median': _median(timings), 'min': min(timings)})
+        click.echo('{:>12}{:>12.4f}{:>12.4f}'.format(name, _median(timings), min(timings)))
+
+    _, heavy_modules = _run(dict(SCENARIOS)['help'] + REPORT_HEAVY_MODULES.format(HEAVY_MODULES))
+    heavy_modules = [m for m in heavy_modules.split(',') if m]
+    overhead = results[-1]['median'] - results[0]['median']
+    click.echo('\nStart up overhead: {:.4f} seconds'.format(overhead))
+    click.echo('Heavy modules imported by "--help": {}'.format(', '.join(heavy_modules) or 'none'))
+
+    if json_output:
+        with open(json_output, 'w') as f:
+            json.dump({'commit': _git_commit(),
+                       'python': platform.python_version(),
+                       'platform': sys.platform,
+                       'parameters': {'runs': runs},
+                       'heavy_modules': heavy_modules,
+                       'results': results}, f, indent=2)
+
+    if heavy_modules:
+        raise click.ClickException('"--help" imported: {}'.format(', '.join(heavy_modules)))
+    if max_seconds is not None and overhead > max_seconds:
+        raise click.ClickException('The start up overhead of {:.4f} seconds exceeds {} seconds!'
+                                   .format(overhead, max_seconds))
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
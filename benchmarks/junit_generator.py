@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Generate deterministic, realistic JUnitXML results files of any size for benchmarking."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import random
+import click
+from xml.sax.saxutils import escape, quoteattr
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_SEED = 1234
+DEFAULT_FAILURE_RATIO = 0.05
+DEFAULT_SKIP_RATIO = 0.02
+DEFAULT_TRACEBACK_LINES = 20
+DEFAULT_FANOUT = 1
+DEFAULT_PROPERTIES = 10
+MODULE_NAME = 'master'
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _traceback(rng, index, lines):
+    frames = ['tests/test_module_{}.py:{}: in test_case_{}'.format(rng.randint(0, 99), rng.randint(1, 999), index)
+              for _ in range(max(0, lines - 1))]
+    frames.append('E       AssertionError: assert {} == {}'.format(rng.randint(0, 9), rng.randint(10, 19)))
+
+    return '\n'.join(frames)
+
+
+def generate_junit_xml(file_path,
+                       cases,
+                       failure_ratio=DEFAULT_FAILURE_RATIO,
+                       skip_ratio=DEFAULT_SKIP_RATIO,
+                       traceback_lines=DEFAULT_TRACEBACK_LINES,
+                       fanout=DEFAULT_FANOUT,
+                       properties=DEFAULT_PROPERTIES,
+                       seed=DEFAULT_SEED):
+    """Write a JUnitXML results file in the shape produced by pytest. The same arguments always produce the same
+    file. (Testcases are written one at a time, so files with millions of testcases can be generated)
+
+    Args:
+        file_path (str): The file path to write to.
+        cases (int): The number of testcases.
+        failure_ratio (float): The fraction of testcases that fail or error.
+        skip_ratio (float): The fraction of testcases that are skipped.
+        traceback_lines (int): The number of lines in the traceback of every failure.
+        fanout (int): The number of parameters every test is run with. (e.g. "test_case_1[host3]")
+        properties (int): The number of testsuite properties in addition to "GIT_BRANCH".
+        seed (int): The seed for the random number generator.
+
+    Returns:
+        str: The file path.
+    """
+
+    rng = random.Random(seed)
+    fanout = max(1, fanout)
+
+    with open(file_path, 'w') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write('<testsuite errors="0" failures="0" name="pytest" skips="0" tests="{}" time="0.0">\n'.format(cases))
+        f.write('    <properties>\n')
+        f.write('        <property name="GIT_BRANCH" value="{}"/>\n'.format(MODULE_NAME))
+        for index in range(properties):
+            f.write('        <property name="PROPERTY_{}" value="value_{}"/>\n'.format(index, rng.randint(0, 1 << 30)))
+        f.write('    </properties>\n')
+
+        for index in range(cases):
+            name = 'test_case_{}[ansible://host{}]'.format(index // fanout, index % fanout)
+            f.write('    <testcase classname="tests.test_module_{}" file="tests/test_module_{}.py" line="{}" '
+                    'name={} time="{:.6f}"'.format(index // 100,
+                                                   index // 100,
+                                                   index % 100,
+                                                   quoteattr(name),
+                                                   rng.random()))
+
+            outcome = rng.random()
+            if outcome < failure_ratio:
+                tag = 'failure' if outcome < failure_ratio / 2 else 'error'
+                f.write('>\n        <{0} message="assert False">{1}</{0}>\n    </testcase>\n'.format(
+                    tag, escape(_traceback(rng, index, traceback_lines))))
+            elif outcome < failure_ratio + skip_ratio:
+                f.write('>\n        <skipped message="unconditional skip" type="pytest.skip"/>\n    </testcase>\n')
+            else:
+                f.write('/>\n')
+
+        f.write('</testsuite>\n')
+
+    return file_path
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.argument('file_path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--cases', type=click.IntRange(min=0), default=1000, show_default=True,
+              help='The number of testcases.')
+@click.option('--failure-ratio', type=click.FloatRange(0, 1), default=DEFAULT_FAILURE_RATIO, show_default=True,
+              help='The fraction of testcases that fail or error.')
+@click.option('--skip-ratio', type=click.FloatRange(0, 1), default=DEFAULT_SKIP_RATIO, show_default=True,
+              help='The fraction of testcases that are skipped.')
+@click.option('--traceback-lines', type=click.IntRange(min=1), default=DEFAULT_TRACEBACK_LINES, show_default=True,
+              help='The number of lines in the traceback of every failure.')
+@click.option('--fanout', type=click.IntRange(min=1), default=DEFAULT_FANOUT, show_default=True,
+              help='The number of parameters every test is run with.')
+@click.option('--properties', type=click.IntRange(min=0), default=DEFAULT_PROPERTIES, show_default=True,
+              help='The number of testsuite properties in addition to GIT_BRANCH.')
+@click.option('--seed', type=click.INT, default=DEFAULT_SEED, show_default=True,
+              help='The seed for the random number generator.')
+def main(file_path, cases, failure_ratio, skip_ratio, traceback_lines, fanout, properties, seed):
+    """Generate a synthetic JUnitXML results file."""
+
+    generate_junit_xml(file_path, cases, failure_ratio, skip_ratio, traceback_lines, fanout, properties, seed)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
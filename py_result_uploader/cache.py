@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""A persistent cache of completed uploads used to avoid sending identical JUnitXML results twice."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import json
+import time
+import hashlib
+import threading
+from py_result_uploader.lazy import LazyModule
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'py_result_uploader')
+CACHE_FILE_NAME = 'uploads.sqlite'
+DEFAULT_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+DEFAULT_CACHE_MAX_ENTRIES = 10000
+HASH_CHUNK_SIZE = 1024 * 1024
+
+sqlite3 = LazyModule('sqlite3')
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def hash_files(file_paths, options=None):
+    """Compute a digest of the combined contents of one or more files without reading them into memory.
+
+    Files with identical contents produce the same digest regardless of their paths. The order of the files is
+    significant.
+
+    Args:
+        file_paths (list(str)): The files to hash.
+        options (dict): The upload options that change the payload built from the files. (e.g. aggregation) The same
+            files uploaded with different options produce different digests.
+
+    Returns:
+        str: The hex encoded SHA-256 digest.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    combined = hashlib.sha256()
+
+    for file_path in file_paths:
+        digest = hashlib.sha256()
+        try:
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        except IOError:
+            raise RuntimeError('Invalid path "{}" for JUnitXML results file!'.format(file_path))
+        combined.update(digest.digest())
+
+    if options:
+        combined.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+
+    return combined.hexdigest()
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class UploadCache(object):
+    """A persistent record of the queue processing jobs created for previously uploaded results, keyed by the
+    digest of the results plus the target project and test cycle.
+
+    Entries older than the maximum age are evicted, as are the least recently used entries once the cache holds more
+    than the maximum number of entries.
+    """
+
+    def __init__(self,
+                 directory=DEFAULT_CACHE_DIR,
+                 max_age=DEFAULT_CACHE_MAX_AGE,
+                 max_entries=DEFAULT_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            directory (str): The directory holding the SQLite database. (Created if missing)
+            max_age (float): The number of seconds an entry is kept. (None to keep entries forever)
+            max_entries (int): The maximum number of entries to keep. (None for no limit)
+        """
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self.path = os.path.join(directory, CACHE_FILE_NAME)
+        self.max_age = max_age
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS uploads ('
+                           'digest TEXT, project_id INTEGER, test_cycle TEXT, job_ids TEXT, created REAL, '
+                           'last_used REAL, PRIMARY KEY (digest, project_id, test_cycle))')
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the database."""
+
+        with self._lock:
+            self._conn.close()
+
+    def get(self, digest, project_id, test_cycle):
+        """Look up the queue processing jobs of an earlier upload of the same results.
+
+        Args:
+            digest (str): The digest of the results files.
+            project_id (int): The target qTest project for the test results.
+            test_cycle (str): The parent qTest test cycle for test results.
+
+        Returns:
+            list(int): The queue processing IDs of the earlier upload or None if the results were not uploaded.
+        """
+
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute('SELECT job_ids, created FROM uploads '
+                                     'WHERE digest = ? AND project_id = ? AND test_cycle = ?',
+                                     (digest, project_id, test_cycle)).fetchone()
+            if row is None or (self.max_age is not None and now - row[1] > self.max_age):
+                return None
+            self._conn.execute('UPDATE uploads SET last_used = ? '
+                               'WHERE digest = ? AND project_id = ? AND test_cycle = ?',
+                               (now, digest, project_id, test_cycle))
+            self._conn.commit()
+
+        return json.loads(row[0])
+
+    def put(self, digest, project_id, test_cycle, job_ids):
+        """Record the queue processing jobs of a completed upload and evict expired entries.
+
+        Args:
+            digest (str): The digest of the results files.
+            project_id (int): The target qTest project for the test results.
+            test_cycle (str): The parent qTest test cycle for test results.
+            job_ids (list(int)): The queue processing IDs for the upload.
+        """
+
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?)',
+                               (digest, project_id, test_cycle, json.dumps([int(j) for j in job_ids]), now, now))
+            self._conn.commit()
+
+        self.evict()
+
+    def evict(self):
+        """Remove entries older than the maximum age and the least recently used entries beyond the maximum number.
+
+        Returns:
+            int: The number of entries removed.
+        """
+
+        removed = 0
+
+        with self._lock:
+            if self.max_age is not None:
+                removed += self._conn.execute('DELETE FROM uploads WHERE created < ?',
+                                              (time.time() - self.max_age,)).rowcount
+            if self.max_entries is not None:
+                removed += self._conn.execute('DELETE FROM uploads WHERE rowid NOT IN '
+                                              '(SELECT rowid FROM uploads ORDER BY last_used DESC LIMIT ?)',
+                                              (self.max_entries,)).rowcount
+            self._conn.commit()
+
+        return removed
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM uploads').fetchone()[0]
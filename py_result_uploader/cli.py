@@ -7,23 +7,308 @@
 from __future__ import absolute_import
 import os
 import sys
+import stat
 import click
+import tempfile
+import contextlib
 import py_result_uploader.py_result_uploader as ptu
+from py_result_uploader.polling import DEFAULT_POLL_TIMEOUT
+from py_result_uploader.submission import DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE
+from py_result_uploader.serializer import CONTENT_ENCODING_WBITS, DEFAULT_COMPRESS_LEVEL
+from py_result_uploader.cache import (UploadCache, hash_files, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_AGE,
+                                      DEFAULT_CACHE_MAX_ENTRIES)
+from py_result_uploader.delta import StatusSnapshot
+from py_result_uploader.metadata import MetadataCache, DEFAULT_METADATA_TTL
+from py_result_uploader.failures import DEFAULT_MAX_DETAIL_SIZE
+from py_result_uploader.inputs import STDIN_PATH
+from py_result_uploader.sharding import DEFAULT_SHARD_BYTES
+from py_result_uploader.spool import list_spools
+from py_result_uploader.metrics import UploadMetrics
+from py_result_uploader.watch import (DirectoryWatcher, UploadLedger, DEFAULT_WATCH_PATTERN, DEFAULT_SETTLE_TIME,
+                                      LEDGER_FILE_NAME)
+
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+API_TOKEN_ENV_VAR = 'QTEST_API_TOKEN'
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _get_api_token():
+    """Read the qTest API token from the environment.
+
+    Returns:
+        str: The qTest API token.
+
+    Raises:
+        RuntimeError: The API token environment variable is not defined.
+    """
+
+    if not os.environ.get(API_TOKEN_ENV_VAR):
+        raise RuntimeError('The "{}" environment variable is not defined! '
+                           'See help for more details.'.format(API_TOKEN_ENV_VAR))
+
+    return os.environ[API_TOKEN_ENV_VAR]
+
+
+@contextlib.contextmanager
+def _open_output(output):
+    """Open a binary output file that is only moved into place once everything has been written successfully.
+
+    Args:
+        output (str): The file path to write to. ("-" for stdout)
+
+    Returns:
+        generator: Yields the binary file object to write to.
+    """
+
+    if output == '-':
+        yield click.open_file(output, 'wb')
+        return
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.{}.'.format(os.path.basename(output)),
+                                    dir=os.path.dirname(os.path.abspath(output)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        # Temporary files are only readable by their owner, so apply the mode a plainly created file would get.
+        try:
+            mode = stat.S_IMODE(os.stat(output).st_mode)
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, output)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _echo_batch_reports(batch_reports, total=None):
+    """Print a summary line for every uploaded batch.
+
+    Args:
+        batch_reports (list(BatchReport)): The reports for every uploaded batch.
+        total (int): The total number of batches of the upload. (None for the number of reports)
+
+    Raises:
+        RuntimeError: One or more batches failed to upload.
+    """
+
+    for report in batch_reports:
+        summary = "\nBatch {}/{}: {} test logs, {} bytes, {:.2f}s".format(report.index + 1,
+                                                                          total or len(batch_reports),
+                                                                          report.test_log_count,
+                                                                          report.byte_size,
+                                                                          report.elapsed)
+        if report.error:
+            click.echo(click.style("{}\n{}".format(summary, report.error), fg='red'))
+        else:
+            click.echo(click.style("{}\nQueue Job ID: {}".format(summary, report.job_id)))
+
+    failed = [r for r in batch_reports if r.error]
+    if failed:
+        raise RuntimeError("\n{} of {} batches failed to upload!".format(len(failed), len(batch_reports)))
+
+
+def _echo_compression_report(report):
+    """Print the compression ratio and bytes saved for an uploaded request body.
+
+    Args:
+        report (CompressionReport): The size of the request body before and after compression.
+    """
+
+    if report.content_encoding:
+        click.echo(click.style("\nCompression: {} {} -> {} bytes ({:.1f}x, {} bytes saved)".format(
+            report.content_encoding, report.raw_bytes, report.sent_bytes, report.ratio, report.saved_bytes)))
+    else:
+        click.echo(click.style("\nCompression: rejected by the qTest API, sent {} bytes uncompressed".format(
+            report.raw_bytes), fg='yellow'))
+
+
+def _echo_delta_report(report):
+    """Print how many test logs a delta upload sent and skipped.
+
+    Args:
+        report (DeltaReport): The number of test logs sent and skipped.
+    """
+
+    click.echo(click.style("\nDelta: {} new or changed test logs sent, {} unchanged test logs skipped".format(
+        report.sent, report.skipped)))
+
+
+def _echo_job_reports(job_reports):
+    """Print the final state of every queue processing job and how long it was waited for.
+
+    Args:
+        job_reports (list(JobReport)): The reports for every polled job.
+
+    Raises:
+        RuntimeError: One or more jobs failed or did not finish in time.
+    """
+
+    for report in job_reports:
+        summary = "\nQueue Job ID {}: {} after {:.2f}s ({} polls)".format(report.job_id,
+                                                                          report.state,
+                                                                          report.waited,
+                                                                          report.polls)
+        if report.error:
+            click.echo(click.style("{}\n{}".format(summary, report.error), fg='red'))
+        elif report.state != 'SUCCESS':
+            click.echo(click.style("{}\nThe qTest API failed to process the job!".format(summary), fg='red'))
+        else:
+            click.echo(click.style(summary))
+
+    unfinished = [r for r in job_reports if r.error or r.state != 'SUCCESS']
+    if unfinished:
+        raise RuntimeError("\n{} of {} queue jobs did not succeed!".format(len(unfinished), len(job_reports)))
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class _DefaultCommandGroup(click.Group):
+    """A command group that runs the "upload" command when the arguments do not start with a command name. (Keeps
+    the original "py_result_uploader JUNIT_INPUT_FILES... QTEST_PROJECT_ID QTEST_TEST_CYCLE" usage working)
+    """
+
+    default_command = 'upload'
+
+    def parse_args(self, ctx, args):
+        args = list(args)
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args.insert(0, self.default_command)
+
+        return super(_DefaultCommandGroup, self).parse_args(ctx, args)
 
 
 # ======================================================================================================================
 # Main
 # ======================================================================================================================
-@click.command()
-@click.argument('junit_input_file', type=click.Path(exists=True))
+@click.group(cls=_DefaultCommandGroup)
+def main():
+    """Upload JUnitXML results to qTest manager.
+
+    \b
+    Run "upload" when no command is given, for example:
+        py_result_uploader results.xml 12345 CL-1
+    """
+
+
+@main.command('upload')
+@click.argument('junit_input_files', nargs=-1, required=True, type=click.STRING)
 @click.argument('qtest_project_id', type=click.INT)
 @click.argument('qtest_test_cycle', type=click.STRING)
-def main(junit_input_file, qtest_project_id, qtest_test_cycle):
+@click.option('--stream', is_flag=True, default=False,
+              help='Incrementally parse the JUnit XML file to keep memory usage flat for very large files.')
+@click.option('--batch-size', type=click.IntRange(min=1), default=None,
+              help='Split the upload into batches with at most this many test logs.')
+@click.option('--batch-bytes', type=click.IntRange(min=1), default=None,
+              help='Split the upload into batches with at most this many serialized bytes.')
+@click.option('--workers', type=click.IntRange(min=1), default=ptu.DEFAULT_BATCH_WORKERS, show_default=True,
+              help='The number of batches to upload concurrently at the start.')
+@click.option('--max-workers', type=click.IntRange(min=1), default=None,
+              help='Let the number of batches uploaded concurrently grow up to this many while qTest keeps up. '
+                   '[default: --workers, a hard ceiling]')
+@click.option('--max-retries', type=click.IntRange(min=0), default=DEFAULT_MAX_RETRIES, show_default=True,
+              help='The number of times a transient qTest API failure (e.g. 429/503) is retried.')
+@click.option('--latency-target', type=click.FloatRange(min=0), default=None,
+              help='Reduce the number of batches in flight when a batch upload takes longer than this many seconds.')
+@click.option('--aggregate', is_flag=True, default=False,
+              help='Collapse the results of a parametrized test into a single test log with the worst status.')
+@click.option('--processes', type=click.IntRange(min=1), default=None,
+              help='The number of worker processes used to parse multiple files or testsuites. '
+                   '[default: number of CPUs]')
+@click.option('--shard-bytes', type=click.IntRange(min=0), default=DEFAULT_SHARD_BYTES, show_default=True,
+              help='Split JUnit XML files larger than twice this many bytes into shards of testcases that are parsed '
+                   'in parallel. (0 to never shard)')
+@click.option('--per-suite', is_flag=True, default=False,
+              help='Upload the results of every testsuite in batches of their own instead of combining them.')
+@click.option('--failure-details', is_flag=True, default=False,
+              help='Record the message and traceback of failed, errored and skipped tests in the test log notes. '
+                   '(Identical tracebacks are recorded once and referenced by the other test logs)')
+@click.option('--failure-details-size', type=click.IntRange(min=1), default=DEFAULT_MAX_DETAIL_SIZE, show_default=True,
+              help='The maximum number of characters kept of every failure message and traceback.')
+@click.option('--chunked', is_flag=True, default=False,
+              help='Serialize the upload while it is being sent instead of building the whole request in memory.')
+@click.option('--compress', type=click.Choice(sorted(CONTENT_ENCODING_WBITS)), default=None,
+              help='Compress the upload with this content encoding. (Sent uncompressed if the server rejects it)')
+@click.option('--compress-level', type=click.IntRange(min=1, max=9), default=DEFAULT_COMPRESS_LEVEL,
+              show_default=True, help='The compression level from 1 (fastest) to 9 (smallest).')
+@click.option('--wait', is_flag=True, default=False,
+              help='Wait for qTest to finish processing the uploaded results.')
+@click.option('--wait-timeout', type=click.FloatRange(min=0), default=DEFAULT_POLL_TIMEOUT, show_default=True,
+              help='The number of seconds to wait for qTest to finish processing the uploaded results.')
+@click.option('--cache-dir', type=click.Path(file_okay=False), default=None,
+              help='Remember uploads in this directory and skip results that were already uploaded to the same '
+                   'project and test cycle with the same aggregation, failure detail and delta options.')
+@click.option('--cache-max-age', type=click.FloatRange(min=0), default=DEFAULT_CACHE_MAX_AGE / 86400.0,
+              show_default=True, help='The number of days an upload is remembered.')
+@click.option('--cache-max-entries', type=click.IntRange(min=1), default=DEFAULT_CACHE_MAX_ENTRIES,
+              show_default=True, help='The maximum number of uploads to remember.')
+@click.option('--preflight', is_flag=True, default=False,
+              help='Check that the project and test cycle exist before parsing and uploading any results. (Their '
+                   'metadata is cached in the cache directory)')
+@click.option('--preflight-ttl', type=click.FloatRange(min=0), default=DEFAULT_METADATA_TTL, show_default=True,
+              help='The number of seconds the cached project and test cycle metadata is used for. (0 to always look '
+                   'them up)')
+@click.option('--delta', is_flag=True, default=False,
+              help='Only send test logs whose status changed since the last upload to the same test cycle. (Combine '
+                   'with "--wait" so that a queue job qTest fails to process is sent in full next time)')
+@click.option('--force-full', is_flag=True, default=False,
+              help='Send every test log in delta mode while still refreshing the snapshot of submitted statuses.')
+@click.option('--snapshot-dir', type=click.Path(file_okay=False), default=DEFAULT_CACHE_DIR, show_default=True,
+              help='The directory holding the snapshot of submitted statuses for delta uploads.')
+@click.option('--spool-dir', type=click.Path(file_okay=False), default=None,
+              help='Seal the batches of the upload into this directory before sending them so that an interrupted '
+                   'upload can be finished with the "resume" command. (Cannot be combined with "--delta", '
+                   '"--chunked", "--compress", "--per-suite", "--latency-target" or the metrics options)')
+@click.option('--metrics-json', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Write the duration, size and peak memory of every upload phase to a JSON file.')
+@click.option('--metrics-prom', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Write the upload phase metrics to a Prometheus textfile. (e.g. for the node exporter)')
+def upload(junit_input_files,
+           qtest_project_id,
+           qtest_test_cycle,
+           stream,
+           batch_size,
+           batch_bytes,
+           workers,
+           max_workers,
+           max_retries,
+           latency_target,
+           aggregate,
+           processes,
+           shard_bytes,
+           per_suite,
+           failure_details,
+           failure_details_size,
+           chunked,
+           compress,
+           compress_level,
+           wait,
+           wait_timeout,
+           cache_dir,
+           cache_max_age,
+           cache_max_entries,
+           preflight,
+           preflight_ttl,
+           delta,
+           force_full,
+           snapshot_dir,
+           spool_dir,
+           metrics_json,
+           metrics_prom):
     """Upload JUnitXML results to qTest manager.
 
     \b
     Required Arguments:
-        JUNIT_INPUT_FILE        A valid JUnit XML results file.
+        JUNIT_INPUT_FILES       One or more JUnit XML results files, directories or glob patterns
+                                (Files may be gzip, bzip2 or xz compressed, "-" reads stdin)
         QTEST_PROJECT_ID        The the target qTest Project ID for results
         QTEST_TEST_CYCLE        The qTest cycle to use as a parent for results
 
@@ -32,19 +317,342 @@ def main(junit_input_file, qtest_project_id, qtest_test_cycle):
         QTEST_API_TOKEN         The qTest API token to use for authorization
     """
 
-    api_token_env_var = 'QTEST_API_TOKEN'
+    if spool_dir:
+        unsupported = [name for name, value in (('--delta', delta),
+                                                ('--force-full', force_full),
+                                                ('--chunked', chunked),
+                                                ('--compress', compress),
+                                                ('--per-suite', per_suite),
+                                                ('--latency-target', latency_target is not None),
+                                                ('--metrics-json', metrics_json),
+                                                ('--metrics-prom', metrics_prom)) if value]
+        if unsupported:
+            raise click.UsageError('"--spool-dir" cannot be combined with {}.'.format(', '.join(unsupported)))
+
+    cache = None
+    snapshot = None
+    metrics = UploadMetrics() if metrics_json or metrics_prom else None
+    failure_details = failure_details_size if failure_details else None
 
     try:
-        if not os.environ.get(api_token_env_var):
-            raise RuntimeError('The "{}" environment variable is not defined! '
-                               'See help for more details.'.format(api_token_env_var))
+        api_token = _get_api_token()
+        junit_input_files = ptu.expand_input_paths(junit_input_files)
+        click.echo(click.style("\nInput Files: {}".format(len(junit_input_files))))
+
+        cached_job_ids = None
+        if cache_dir:
+            if STDIN_PATH in junit_input_files:
+                raise RuntimeError('Results read from stdin cannot be remembered with "--cache-dir"!')
+            cache = UploadCache(cache_dir, max_age=cache_max_age * 86400, max_entries=cache_max_entries)
+            digest = hash_files(junit_input_files, {'aggregate': aggregate,
+                                                    'per_suite': per_suite,
+                                                    'failure_details': failure_details,
+                                                    'delta': delta and not force_full})
+            cached_job_ids = cache.get(digest, qtest_project_id, qtest_test_cycle)
+
+        if delta:
+            snapshot = StatusSnapshot(snapshot_dir)
+
+        with ptu.QTestUploader(api_token, pool_size=max(DEFAULT_POOL_SIZE, workers, max_workers or 0)) as uploader:
+            if preflight and not cached_job_ids:
+                with MetadataCache(cache_dir or DEFAULT_CACHE_DIR, ttl=preflight_ttl) as metadata_cache:
+                    cached = uploader.validate_target(qtest_project_id,
+                                                      qtest_test_cycle,
+                                                      metadata_cache,
+                                                      max_retries=max_retries)
+                click.echo(click.style("\nPre-flight: test cycle {} found in project {}{}."
+                                       .format(qtest_test_cycle, qtest_project_id, ' (cached)' if cached else '')))
+
+            if cached_job_ids:
+                click.echo(click.style("\nThese results were already uploaded to this test cycle, skipping upload.",
+                                       fg='yellow'))
+                for job_id in cached_job_ids:
+                    click.echo(click.style("\nQueue Job ID: {}".format(job_id)))
+                job_ids = cached_job_ids
+            elif spool_dir:
+                max_logs = batch_size or ptu.DEFAULT_BATCH_MAX_LOGS
+                max_bytes = batch_bytes or ptu.DEFAULT_BATCH_MAX_BYTES
+                spool, batch_reports = uploader.upload_test_results_spooled(junit_input_files,
+                                                                            qtest_project_id,
+                                                                            qtest_test_cycle,
+                                                                            spool_dir,
+                                                                            max_logs=max_logs,
+                                                                            max_bytes=max_bytes,
+                                                                            workers=workers,
+                                                                            max_workers=max_workers,
+                                                                            max_retries=max_retries,
+                                                                            stream=stream,
+                                                                            processes=processes,
+                                                                            aggregate=aggregate,
+                                                                            failure_details=failure_details,
+                                                                            shard_bytes=shard_bytes)
+                try:
+                    _echo_batch_reports(batch_reports)
+                except RuntimeError as e:
+                    raise RuntimeError('{}\nThe upload was spooled to "{}", run "resume {}" to send the remaining '
+                                       'batches.'.format(e, spool.path, spool_dir))
+                job_ids = [r.job_id for r in batch_reports]
+            elif batch_size or batch_bytes or per_suite:
+                batch_reports = uploader.upload_test_results_in_batches(junit_input_files,
+                                                                        qtest_project_id,
+                                                                        qtest_test_cycle,
+                                                                        max_logs=batch_size,
+                                                                        max_bytes=batch_bytes,
+                                                                        workers=workers,
+                                                                        max_workers=max_workers,
+                                                                        max_retries=max_retries,
+                                                                        latency_target=latency_target,
+                                                                        stream=stream,
+                                                                        processes=processes,
+                                                                        chunked=chunked,
+                                                                        compression=compress,
+                                                                        compress_level=compress_level,
+                                                                        on_compression=_echo_compression_report,
+                                                                        aggregate=aggregate,
+                                                                        snapshot=snapshot,
+                                                                        force_full=force_full,
+                                                                        on_delta=_echo_delta_report,
+                                                                        metrics=metrics,
+                                                                        per_suite=per_suite,
+                                                                        failure_details=failure_details,
+                                                                        shard_bytes=shard_bytes)
+                _echo_batch_reports(batch_reports)
+                job_ids = [r.job_id for r in batch_reports]
+            else:
+                job_id = uploader.upload_test_results(junit_input_files,
+                                                      qtest_project_id,
+                                                      qtest_test_cycle,
+                                                      stream=stream,
+                                                      processes=processes,
+                                                      max_retries=max_retries,
+                                                      chunked=chunked,
+                                                      compression=compress,
+                                                      compress_level=compress_level,
+                                                      on_compression=_echo_compression_report,
+                                                      aggregate=aggregate,
+                                                      snapshot=snapshot,
+                                                      force_full=force_full,
+                                                      on_delta=_echo_delta_report,
+                                                      metrics=metrics,
+                                                      failure_details=failure_details,
+                                                      shard_bytes=shard_bytes)
+
+                if job_id is None:
+                    click.echo(click.style("\nNo new or changed test logs, nothing was uploaded."))
+                    job_ids = []
+                else:
+                    click.echo(click.style("\nQueue Job ID: {}".format(str(job_id))))
+                    job_ids = [job_id]
+
+            if wait:
+                with (metrics or UploadMetrics()).span('queue', len(job_ids)):
+                    job_reports = uploader.wait_for_queue_jobs(job_ids, wait_timeout, max_retries)
+                try:
+                    _echo_job_reports(job_reports)
+                except RuntimeError:
+                    if snapshot is not None:
+                        snapshot.forget(qtest_project_id, qtest_test_cycle)
+                    raise
+
+        if cache is not None and not cached_job_ids:
+            cache.put(digest, qtest_project_id, qtest_test_cycle, job_ids)
+
+        click.echo(click.style("\nSuccess!", fg='green'))
+    except RuntimeError as e:
+        click.echo(click.style(str(e), fg='red'))
+        click.echo(click.style("\nFailed!", fg='red'))
+
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+        if snapshot is not None:
+            snapshot.close()
+        if metrics_json:
+            metrics.write_json(metrics_json)
+        if metrics_prom:
+            metrics.write_prometheus(metrics_prom)
+
+
+@main.command('convert')
+@click.argument('junit_input_files', nargs=-1, required=True, type=click.STRING)
+@click.argument('qtest_test_cycle', type=click.STRING)
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True, allow_dash=True), default='-',
+              show_default=True, help='The file to write the JSON to. ("-" for stdout)')
+@click.option('--format', 'output_format', type=click.Choice(ptu.CONVERT_FORMATS), default='json', show_default=True,
+              help='Write the request body of an upload ("json") or one test log per line ("ndjson").')
+@click.option('--stream', is_flag=True, default=False,
+              help='Incrementally parse the JUnit XML files and write every test log as soon as it has been parsed.')
+@click.option('--aggregate', is_flag=True, default=False,
+              help='Collapse the results of a parametrized test into a single test log with the worst status.')
+@click.option('--processes', type=click.IntRange(min=1), default=None,
+              help='The number of worker processes used to parse multiple files or testsuites. '
+                   '[default: number of CPUs]')
+@click.option('--shard-bytes', type=click.IntRange(min=0), default=DEFAULT_SHARD_BYTES, show_default=True,
+              help='Split JUnit XML files larger than twice this many bytes into shards of testcases that are parsed '
+                   'in parallel. (0 to never shard)')
+@click.option('--failure-details', is_flag=True, default=False,
+              help='Record the message and traceback of failed, errored and skipped tests in the test log notes. '
+                   '(Identical tracebacks are recorded once and referenced by the other test logs)')
+@click.option('--failure-details-size', type=click.IntRange(min=1), default=DEFAULT_MAX_DETAIL_SIZE, show_default=True,
+              help='The maximum number of characters kept of every failure message and traceback.')
+def convert(junit_input_files,
+            qtest_test_cycle,
+            output,
+            output_format,
+            stream,
+            aggregate,
+            processes,
+            shard_bytes,
+            failure_details,
+            failure_details_size):
+    """Convert JUnitXML results to qTest JSON without uploading them.
+
+    \b
+    Required Arguments:
+        JUNIT_INPUT_FILES       One or more JUnit XML results files, directories or glob patterns
+                                (Files may be gzip, bzip2 or xz compressed, "-" reads stdin)
+        QTEST_TEST_CYCLE        The qTest cycle to use as a parent for results
+    """
+
+    try:
+        junit_input_files = ptu.expand_input_paths(junit_input_files)
+
+        with _open_output(output) as f:
+            count = ptu.convert_test_results(junit_input_files,
+                                             f,
+                                             qtest_test_cycle,
+                                             output_format=output_format,
+                                             stream=stream,
+                                             processes=processes,
+                                             aggregate=aggregate,
+                                             failure_details=failure_details_size if failure_details else None,
+                                             shard_bytes=shard_bytes)
+
+        click.echo(click.style("\nConverted {} test logs from {} input files.".format(count, len(junit_input_files)),
+                               fg='green'), err=True)
+    except RuntimeError as e:
+        click.echo(click.style(str(e), fg='red'), err=True)
+        click.echo(click.style("\nFailed!", fg='red'), err=True)
+
+        sys.exit(1)
+
+
+@main.command('watch')
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.argument('qtest_project_id', type=click.INT)
+@click.argument('qtest_test_cycle', type=click.STRING)
+@click.option('--pattern', default=DEFAULT_WATCH_PATTERN, show_default=True,
+              help='Only upload files whose names match this glob pattern.')
+@click.option('--recursive', is_flag=True, default=False,
+              help='Also watch subdirectories.')
+@click.option('--settle', type=click.FloatRange(min=0), default=DEFAULT_SETTLE_TIME, show_default=True,
+              help='The number of seconds a file must stop changing before it is considered complete.')
+@click.option('--state-file', type=click.Path(dir_okay=False), default=None,
+              help='The database recording uploaded files. [default: DIRECTORY/{}]'.format(LEDGER_FILE_NAME))
+@click.option('--max-retries', type=click.IntRange(min=0), default=DEFAULT_MAX_RETRIES, show_default=True,
+              help='The number of times a transient qTest API failure (e.g. 429/503) is retried.')
+def watch(directory, qtest_project_id, qtest_test_cycle, pattern, recursive, settle, state_file, max_retries):
+    """Watch a directory and upload every completed JUnitXML results file exactly once.
+
+    \b
+    Required Arguments:
+        DIRECTORY               The directory that JUnit XML results files are written to
+        QTEST_PROJECT_ID        The the target qTest Project ID for results
+        QTEST_TEST_CYCLE        The qTest cycle to use as a parent for results
+
+    \b
+    Required Environment Variables:
+        QTEST_API_TOKEN         The qTest API token to use for authorization
+    """
+
+    def echo_result(path, job_id, error):
+        if error:
+            click.echo(click.style("\n{}\n{}".format(path, error), fg='red'))
+        else:
+            click.echo(click.style("\n{}\nQueue Job ID: {}".format(path, job_id)))
+
+    try:
+        api_token = _get_api_token()
+        ledger = UploadLedger(state_file or os.path.join(directory, LEDGER_FILE_NAME))
+
+        try:
+            with ptu.QTestUploader(api_token) as uploader:
+                watcher = DirectoryWatcher(directory,
+                                           lambda path: uploader.upload_test_results(path,
+                                                                                     qtest_project_id,
+                                                                                     qtest_test_cycle,
+                                                                                     max_retries=max_retries),
+                                           ledger,
+                                           pattern=pattern,
+                                           settle=settle,
+                                           recursive=recursive,
+                                           on_result=echo_result)
+
+                click.echo(click.style("\nWatching: {}".format(watcher.directory)))
+                watcher.run()
+        finally:
+            ledger.close()
+    except KeyboardInterrupt:
+        click.echo(click.style("\nStopped watching.", fg='green'))
+    except RuntimeError as e:
+        click.echo(click.style(str(e), fg='red'))
+        click.echo(click.style("\nFailed!", fg='red'))
+
+        sys.exit(1)
+
+
+@main.command('resume')
+@click.argument('spool_dir', type=click.Path(file_okay=False))
+@click.option('--workers', type=click.IntRange(min=1), default=ptu.DEFAULT_BATCH_WORKERS, show_default=True,
+              help='The number of batches to upload concurrently at the start.')
+@click.option('--max-workers', type=click.IntRange(min=1), default=None,
+              help='Let the number of batches uploaded concurrently grow up to this many while qTest keeps up. '
+                   '[default: --workers, a hard ceiling]')
+@click.option('--max-retries', type=click.IntRange(min=0), default=DEFAULT_MAX_RETRIES, show_default=True,
+              help='The number of times a transient qTest API failure (e.g. 429/503) is retried.')
+def resume(spool_dir, workers, max_workers, max_retries):
+    """Send the unacknowledged batches of interrupted spooled uploads.
+
+    \b
+    Required Arguments:
+        SPOOL_DIR               The directory given to "upload --spool-dir"
+
+    \b
+    Required Environment Variables:
+        QTEST_API_TOKEN         The qTest API token to use for authorization
+    """
+
+    try:
+        api_token = _get_api_token()
+        spools = list_spools(spool_dir)
+        failed = 0
+
+        if not spools:
+            click.echo(click.style("\nNo spooled uploads to resume."))
+
+        with ptu.QTestUploader(api_token, pool_size=max(DEFAULT_POOL_SIZE, workers, max_workers or 0)) as uploader:
+            for spool in spools:
+                click.echo(click.style("\nResuming: {}\nProject: {}, Test Cycle: {}, Pending Batches: {}/{}".format(
+                    spool.path,
+                    spool.qtest_project_id,
+                    spool.qtest_test_cycle,
+                    len(spool.pending),
+                    len(spool.batches))))
+                batch_reports = uploader.resume_spooled_upload(spool,
+                                                               workers=workers,
+                                                               max_retries=max_retries,
+                                                               max_workers=max_workers)
+                try:
+                    _echo_batch_reports(batch_reports, total=len(spool.batches))
+                except RuntimeError as e:
+                    click.echo(click.style(str(e), fg='red'))
+                    failed += 1
 
-        job_id = ptu.upload_test_results(junit_input_file,
-                                         os.environ[api_token_env_var],
-                                         qtest_project_id,
-                                         qtest_test_cycle)
+        if failed:
+            raise RuntimeError("\n{} of {} spooled uploads still have unacknowledged batches!".format(
+                failed, len(spools)))
 
-        click.echo(click.style("\nQueue Job ID: {}".format(str(job_id))))
         click.echo(click.style("\nSuccess!", fg='green'))
     except RuntimeError as e:
         click.echo(click.style(str(e), fg='red'))
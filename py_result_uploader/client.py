@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""A self-contained qTest API client with its own authorization and HTTP connection pool."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import swagger_client
+from swagger_client.rest import RESTClientObject
+from py_result_uploader.submission import DEFAULT_POOL_SIZE
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class QTestApiClient(swagger_client.ApiClient):
+    """A swagger API client that owns its authorization token, target host and keep-alive connection pool.
+
+    The generated client reads the API token from the process wide 'swagger_client.configuration' which means that
+    clients with different tokens cannot coexist. This client authorizes every request with its own token instead and
+    never touches the global configuration, so instances for different tokens or hosts can be used side by side from
+    concurrent threads. (The underlying urllib3 pool manager is thread-safe)
+    """
+
+    def __init__(self, api_token, host=None, pool_size=DEFAULT_POOL_SIZE):
+        """
+        Args:
+            api_token (str): Token to use for authorization to the qTest API.
+            host (str): The base URL of the qTest API. (None for the swagger client default)
+            pool_size (int): The number of keep-alive connections to retain for concurrent requests.
+        """
+
+        super(QTestApiClient, self).__init__()
+
+        if host:
+            self.host = host.rstrip('/')
+
+        self.api_token = api_token
+        self.pool_size = pool_size
+        self.rest_client = RESTClientObject(pools_size=1, maxsize=pool_size)
+
+    def update_params_for_auth(self, headers, querys, auth_settings):
+        """Authorize a request with the token owned by this client.
+
+        Args:
+            headers (dict): The header parameters of the request, updated in place.
+            querys (list): The query parameters of the request. (Unused)
+            auth_settings (list(str)): The authentication setting identifiers of the request.
+        """
+
+        if auth_settings:
+            headers['Authorization'] = self.api_token
+
+    def close(self):
+        """Release all pooled connections."""
+
+        self.rest_client.pool_manager.clear()
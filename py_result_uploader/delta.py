@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""A persistent snapshot of the last submitted status of every test used to upload only what changed."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import time
+import threading
+from collections import namedtuple
+from py_result_uploader.cache import DEFAULT_CACHE_DIR
+from py_result_uploader.lazy import LazyModule
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+SNAPSHOT_FILE_NAME = 'snapshots.sqlite'
+
+sqlite3 = LazyModule('sqlite3')
+
+DeltaReport = namedtuple('DeltaReport', ['sent', 'skipped'])
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _group_statuses(test_logs):
+    """Combine the statuses of the test logs that share an automation content. (e.g. every parameter of a
+    parametrized test when the results are not aggregated)
+
+    Args:
+        test_logs (list(CompactTestLog)): The test logs.
+
+    Returns:
+        dict: The statuses of every automation content in submission order joined by commas.
+    """
+
+    statuses = {}
+    for test_log in test_logs:
+        statuses.setdefault(test_log.automation_content, []).append(test_log.status)
+
+    return {automation_content: ','.join(s) for automation_content, s in statuses.items()}
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class StatusSnapshot(object):
+    """The last statuses submitted for every test, keyed by project, test cycle and automation content.
+
+    Comparing new results against the snapshot lets an upload skip every test whose statuses have not changed
+    since they were last submitted to the same test cycle. The test logs that share an automation content map to the
+    same qTest test case, so they are compared and sent as a group: if any of them changed they are all sent again.
+
+    Statuses are recorded once qTest accepts the queue job, not once the job is processed. Call "forget" when a job
+    fails afterwards so that the next upload sends every test log again.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        """
+        Args:
+            directory (str): The directory holding the SQLite database. (Created if missing)
+        """
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self.path = os.path.join(directory, SNAPSHOT_FILE_NAME)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS statuses ('
+                           'project_id INTEGER, test_cycle TEXT, automation_content TEXT, status TEXT, updated REAL, '
+                           'PRIMARY KEY (project_id, test_cycle, automation_content))')
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the database."""
+
+        with self._lock:
+            self._conn.close()
+
+    def changed(self, project_id, test_cycle, test_logs):
+        """Select the test logs that are new or whose automation content has statuses that differ from the last
+        submitted statuses.
+
+        Args:
+            project_id (int): The target qTest project for the test results.
+            test_cycle (str): The parent qTest test cycle for test results.
+            test_logs (list(CompactTestLog)): The test logs about to be submitted.
+
+        Returns:
+            list(CompactTestLog): The new or changed test logs in their original order.
+        """
+
+        with self._lock:
+            last_statuses = dict(self._conn.execute('SELECT automation_content, status FROM statuses '
+                                                    'WHERE project_id = ? AND test_cycle = ?',
+                                                    (project_id, test_cycle)))
+
+        statuses = _group_statuses(test_logs)
+
+        return [t for t in test_logs if last_statuses.get(t.automation_content) != statuses[t.automation_content]]
+
+    def record(self, project_id, test_cycle, test_logs):
+        """Record the statuses of successfully submitted test logs.
+
+        Args:
+            project_id (int): The target qTest project for the test results.
+            test_cycle (str): The parent qTest test cycle for test results.
+            test_logs (list(CompactTestLog)): The submitted test logs. (Every test log of an automation content must
+                be included)
+        """
+
+        now = time.time()
+
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO statuses VALUES (?, ?, ?, ?, ?)',
+                                   ((project_id, test_cycle, automation_content, statuses, now)
+                                    for automation_content, statuses in _group_statuses(test_logs).items()))
+            self._conn.commit()
+
+    def forget(self, project_id, test_cycle):
+        """Discard the recorded statuses of a test cycle so that the next upload sends every test log.
+
+        Args:
+            project_id (int): The target qTest project for the test results.
+            test_cycle (str): The parent qTest test cycle for test results.
+        """
+
+        with self._lock:
+            self._conn.execute('DELETE FROM statuses WHERE project_id = ? AND test_cycle = ?', (project_id, test_cycle))
+            self._conn.commit()
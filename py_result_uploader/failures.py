@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""Bounded failure details for qTest test logs with identical tracebacks recorded only once."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import hashlib
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_MAX_DETAIL_SIZE = 4096
+DETAIL_TAGS = ('failure', 'error', 'skipped')     # Most severe first
+DIGEST_LENGTH = 12
+TRUNCATION_MARKER = '\n... [{} characters truncated] ...\n'
+TRACEBACK_LINE = '[traceback {}]'
+TRACEBACK_REFERENCE_LINE = '[traceback {} is recorded in full with the first failure of "{}"]'
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def truncate_detail(text, max_size=DEFAULT_MAX_DETAIL_SIZE):
+    """Shorten a failure detail by cutting out its middle, which keeps both the start of a traceback and the
+    exception at its end.
+
+    Args:
+        text (str): The failure detail.
+        max_size (int): The maximum number of characters of the original text to keep.
+
+    Returns:
+        str: The text unchanged or with a marker in place of the characters that were cut out.
+    """
+
+    if len(text) <= max_size:
+        return text
+
+    head = max_size // 2
+    tail = max_size - head
+
+    return '{}{}{}'.format(text[:head], TRUNCATION_MARKER.format(len(text) - max_size), text[-tail:] if tail else '')
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class FailureDetails(object):
+    """Describes why a JUnitXML test result failed, errored or was skipped, and replaces every traceback that was
+    already recorded by an earlier test log with a reference to it.
+
+    Tracebacks are keyed by a hash of their full contents, so only the digest and the automation content of the
+    test log holding each distinct traceback are remembered. Thousands of parametrized runs failing the same way
+    therefore carry the traceback once instead of thousands of times.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_DETAIL_SIZE):
+        """
+        Args:
+            max_size (int): The maximum number of characters kept of every failure message and traceback.
+        """
+
+        self.max_size = max_size
+        self._recorded = {}
+
+    def describe(self, junit_testcase_xml):
+        """Build the note of a test log from the "failure", "error" or "skipped" element of a testcase.
+
+        Args:
+            junit_testcase_xml (ElementTree): A XML element representing a JUnit style testcase result.
+
+        Returns:
+            tuple(str, str): The note and the digest of its traceback. (None for either when the testcase has no
+                details or the element has no traceback)
+        """
+
+        for tag in DETAIL_TAGS:
+            detail_xml = junit_testcase_xml.find(tag)
+            if detail_xml is not None:
+                break
+        else:
+            return None, None
+
+        summary = tag.capitalize()
+        if detail_xml.get('type'):
+            summary = '{} ({})'.format(summary, detail_xml.get('type'))
+        if detail_xml.get('message'):
+            summary = '{}: {}'.format(summary, truncate_detail(detail_xml.get('message'), self.max_size))
+
+        traceback = (detail_xml.text or '').strip()
+        if not traceback:
+            return summary, None
+
+        digest = hashlib.sha1(traceback.encode('utf-8')).hexdigest()[:DIGEST_LENGTH]
+
+        return '\n'.join((summary, TRACEBACK_LINE.format(digest), truncate_detail(traceback, self.max_size))), digest
+
+    def dedupe(self, test_log):
+        """Record the traceback of a test log or, if an earlier test log already recorded it, replace it with a
+        reference. (Test logs built by separate instances, e.g. on a process pool, can be passed through a single
+        instance in order to dedupe them across all of them)
+
+        Args:
+            test_log (CompactTestLog): The test log, updated in place.
+
+        Returns:
+            CompactTestLog: The same test log.
+        """
+
+        digest = test_log.detail_digest
+
+        if digest is None:
+            return test_log
+
+        if digest not in self._recorded:
+            self._recorded[digest] = test_log.automation_content
+        else:
+            # Both the full traceback and a reference start with the same line prefix.
+            summary = test_log.note[:test_log.note.index('\n' + TRACEBACK_LINE.format(digest)[:-1])]
+            test_log.note = '\n'.join((summary, TRACEBACK_REFERENCE_LINE.format(digest, self._recorded[digest])))
+
+        return test_log
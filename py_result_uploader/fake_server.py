@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+"""An in-process stand-in for the qTest Manager API used to exercise the real HTTP path of an upload offline."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import re
+import json
+import time
+import zlib
+import random
+import threading
+import socketserver
+from collections import namedtuple, deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+SUBMIT_PATH_RGX = re.compile(r'^/api/v3(?:\.1)?/projects/(\d+)/auto-test-logs$')
+TRACK_PATH_RGX = re.compile(r'^/api/v3(?:\.1)?/projects/queue-processing/(\d+)$')
+DEFAULT_ERROR_STATUSES = (429, 503)
+SHUTDOWN_POLL_INTERVAL = 0.05
+CONTENT_ENCODING_WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+DROP_CONNECTION = 0     # Injected "status" that closes the connection without sending a response
+
+CapturedRequest = namedtuple('CapturedRequest', ['method', 'path', 'query', 'headers', 'body', 'status', 'received'])
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """An HTTP server that handles every request in a thread of its own. ("http.server.ThreadingHTTPServer" is only
+    available on Python 3.7+)"""
+
+    daemon_threads = True
+
+
+class _FakeJob(object):
+    """A simulated queue processing job."""
+
+    __slots__ = ('job_id', 'project_id', 'test_log_count', 'submitted', 'failed')
+
+    def __init__(self, job_id, project_id, test_log_count, submitted, failed):
+        self.job_id = job_id
+        self.project_id = project_id
+        self.test_log_count = test_log_count
+        self.submitted = submitted
+        self.failed = failed
+
+
+class _FakeQTestHandler(BaseHTTPRequestHandler):
+    """Route requests to the 'FakeQTestServer' that owns the HTTP server."""
+
+    protocol_version = 'HTTP/1.1'   # Keep-alive, so connection reuse by the client is exercised.
+
+    def _read_body(self):
+        """Read the request body, undoing chunked transfer encoding and content encoding.
+
+        Returns:
+            bytes: The decoded request body.
+        """
+
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if not size:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            body = b''.join(chunks)
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        content_encoding = self.headers.get('Content-Encoding')
+        if content_encoding in CONTENT_ENCODING_WBITS:
+            body = zlib.decompress(body, CONTENT_ENCODING_WBITS[content_encoding])
+
+        return body
+
+    def _respond(self, status, payload=None, headers=None):
+        body = json.dumps(payload if payload is not None else {'message': self.responses[status][0]}).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        body = self._read_body() if self.command == 'POST' else b''
+        path, _, query = self.path.partition('?')
+        status, payload, headers = self.server.fake.dispatch(self.command, path, query, self.headers, body)
+
+        if status == DROP_CONNECTION:
+            self.close_connection = True
+            return
+
+        self._respond(status, payload, headers)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeQTestServer(object):
+    """A local HTTP server that implements the qTest Manager automation test log submission and queue processing
+    endpoints.
+
+    Submitted jobs move from "IN_WAITING" to "IN_PROCESSING" to "SUCCESS" (or "FAILED") over a configurable processing
+    time. Every request can be delayed and transient failures can be injected either at random or from a scripted
+    queue of status codes, so upload concurrency and retry behavior can be load-tested without a qTest Manager
+    instance. Every request is captured with its decoded body for later inspection.
+    """
+
+    def __init__(self,
+                 latency=0.0,
+                 processing_time=0.0,
+                 error_rate=0.0,
+                 error_statuses=DEFAULT_ERROR_STATUSES,
+                 failed_job_rate=0.0,
+                 retry_after=None,
+                 reject_compression=False,
+                 seed=None,
+                 host='127.0.0.1',
+                 port=0):
+        """
+        Args:
+            latency (float): The number of seconds to delay every response.
+            processing_time (float): The number of seconds a submitted job takes to reach a terminal state.
+            error_rate (float): The fraction of requests that fail with a random status from 'error_statuses'.
+            error_statuses (tuple(int)): The HTTP statuses used for randomly injected failures.
+            failed_job_rate (float): The fraction of submitted jobs that finish in the "FAILED" state.
+            retry_after (float): The "Retry-After" header value in seconds sent with injected failures. (None to omit)
+            reject_compression (bool): Reject compressed request bodies with "415 Unsupported Media Type".
+            seed (int): The seed for the random number generator used for error injection.
+            host (str): The interface to listen on.
+            port (int): The port to listen on. (0 for any free port)
+        """
+
+        self.latency = latency
+        self.processing_time = processing_time
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.failed_job_rate = failed_job_rate
+        self.retry_after = retry_after
+        self.reject_compression = reject_compression
+
+        self.requests = []
+        self.jobs = {}
+
+        self._random = random.Random(seed)
+        self._scripted_errors = deque()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = _ThreadingHTTPServer((host, port), _FakeQTestHandler)
+        self._httpd.fake = self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def url(self):
+        """str: The base URL of the server to use as the qTest API host."""
+
+        return 'http://{}:{}'.format(*self._httpd.server_address[:2])
+
+    @property
+    def submissions(self):
+        """list(CapturedRequest): The captured automation test log submissions that were accepted."""
+
+        with self._lock:
+            return [r for r in self.requests if r.method == 'POST' and r.status == 201]
+
+    def start(self):
+        """Serve requests from a background thread.
+
+        Returns:
+            FakeQTestServer: This server.
+        """
+
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        kwargs={'poll_interval': SHUTDOWN_POLL_INTERVAL},
+                                        name='fake-qtest-server')
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        """Stop serving requests and release the listening socket."""
+
+        if self._thread:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def inject_errors(self, *statuses):
+        """Fail the next requests with the given HTTP statuses, one status per request, in order.
+
+        Args:
+            *statuses (int): The HTTP statuses to respond with. (DROP_CONNECTION to close the connection without a
+                response)
+        """
+
+        with self._lock:
+            self._scripted_errors.extend(statuses)
+
+    def _job_state(self, job):
+        elapsed = time.time() - job.submitted
+
+        if elapsed >= self.processing_time:
+            return 'FAILED' if job.failed else 'SUCCESS'
+
+        return 'IN_WAITING' if elapsed < self.processing_time / 2 else 'IN_PROCESSING'
+
+    def _next_error(self):
+        if self._scripted_errors:
+            return self._scripted_errors.popleft()
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self._random.choice(self.error_statuses)
+
+        return None
+
+    def _route(self, method, path, headers, body):
+        """Produce the response for a request that was not failed by error injection.
+
+        Returns:
+            tuple(int, dict): The HTTP status and JSON payload.
+        """
+
+        submit_match = SUBMIT_PATH_RGX.match(path)
+        track_match = TRACK_PATH_RGX.match(path)
+
+        if method == 'POST' and submit_match:
+            if self.reject_compression and headers.get('Content-Encoding'):
+                return 415, None
+            try:
+                test_log_count = len(json.loads(body.decode('utf-8'))['test_logs'])
+            except (ValueError, KeyError, TypeError):
+                return 400, {'message': 'Malformed automation request!'}
+
+            with self._lock:
+                job = _FakeJob(len(self.jobs) + 1,
+                               int(submit_match.group(1)),
+                               test_log_count,
+                               time.time(),
+                               self._random.random() < self.failed_job_rate)
+                self.jobs[job.job_id] = job
+
+            return 201, {'id': job.job_id, 'type': 'automation', 'state': self._job_state(job)}
+        elif method == 'GET' and track_match:
+            job = self.jobs.get(int(track_match.group(1)))
+            if not job:
+                return 404, None
+
+            return 200, {'id': job.job_id, 'type': 'automation', 'state': self._job_state(job)}
+
+        return 404, None
+
+    def dispatch(self, method, path, query, headers, body):
+        """Handle a single request. (Called from the HTTP server threads)
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The request path without the query string.
+            query (str): The query string.
+            headers (Message): The request headers.
+            body (bytes): The decoded request body.
+
+        Returns:
+            tuple(int, dict, dict): The HTTP status, JSON payload and extra response headers.
+        """
+
+        received = time.time()
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            error = self._next_error()
+
+        if error is not None:
+            status, payload = error, None
+            extra_headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+        else:
+            (status, payload), extra_headers = self._route(method, path, headers, body), {}
+
+        with self._lock:
+            self.requests.append(CapturedRequest(method, path, query, dict(headers), body, status, received))
+
+        return status, payload, extra_headers
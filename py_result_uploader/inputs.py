@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""Open JUnitXML results files that are compressed with gzip, bzip2 or xz or piped in on stdin."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import io
+import os
+import sys
+import zlib
+import contextlib
+from py_result_uploader.lazy import LazyModule
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+STDIN_PATH = '-'
+XML_FILE_SUFFIXES = ('.xml', '.xml.gz', '.xml.bz2', '.xml.xz')
+COMPRESSION_MAGIC = (('gzip', b'\x1f\x8b'), ('bzip2', b'BZh'), ('xz', b'\xfd7zXZ\x00'))
+MAGIC_LENGTH = max(len(magic) for _, magic in COMPRESSION_MAGIC)
+
+# Only imported once a compressed file is actually read
+gzip = LazyModule('gzip')
+bz2 = LazyModule('bz2')
+lzma = LazyModule('lzma')
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def detect_compression(header):
+    """Identify the compression format of a file by its magic bytes.
+
+    Args:
+        header (bytes): The first bytes of the file. (At least "MAGIC_LENGTH" bytes unless the file is shorter)
+
+    Returns:
+        str: The compression format. ('gzip', 'bzip2', 'xz' or None for an uncompressed file)
+    """
+
+    for compression, magic in COMPRESSION_MAGIC:
+        if header.startswith(magic):
+            return compression
+
+    return None
+
+
+def is_compressed(file_path):
+    """Check whether a file is compressed without reading more than its magic bytes.
+
+    Args:
+        file_path (str): A file path. ("-" for stdin is never reported as compressed since it cannot be peeked at
+            without a buffer)
+
+    Returns:
+        bool: True if the file is compressed. (False if it cannot be read)
+    """
+
+    if file_path == STDIN_PATH:
+        return False
+
+    try:
+        with open(file_path, 'rb') as f:
+            return detect_compression(f.read(MAGIC_LENGTH)) is not None
+    except (IOError, OSError):
+        return False
+
+
+def input_size(file_path):
+    """The number of bytes read from an input file. (As stored, before any decompression)
+
+    Args:
+        file_path (str): A file path. ("-" for stdin)
+
+    Returns:
+        int: The size of the file. (0 for stdin since it is unknown ahead of reading it)
+    """
+
+    return 0 if file_path == STDIN_PATH else os.path.getsize(file_path)
+
+
+def corrupt_input_errors():
+    """The exceptions raised while reading a compressed file that is corrupt or truncated.
+
+    Returns:
+        tuple(type): The exception types.
+    """
+
+    return IOError, EOFError, zlib.error, lzma.LZMAError
+
+
+def _decompressed(stream):
+    """Wrap a binary stream in a decompressor if the stream starts with the magic bytes of a compression format.
+
+    Args:
+        stream (file): A readable binary stream that supports "peek".
+
+    Returns:
+        file: A readable binary stream of the decompressed contents. (The stream itself if it is not compressed)
+    """
+
+    compression = detect_compression(stream.peek(MAGIC_LENGTH)[:MAGIC_LENGTH])
+
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if compression == 'bzip2':
+        return bz2.BZ2File(stream)
+    if compression == 'xz':
+        return lzma.LZMAFile(stream)
+
+    return stream
+
+
+@contextlib.contextmanager
+def open_input(file_path):
+    """Open a JUnitXML results file for reading, decompressing it on the fly when it is compressed. The contents are
+    decompressed a block at a time as they are read, so no intermediate file is written and memory usage is bounded
+    regardless of the size of the file.
+
+    Args:
+        file_path (str): A file path to a plain, gzip, bzip2 or xz compressed file. ("-" for stdin, which is left
+            open)
+
+    Returns:
+        generator: Yields a readable binary stream of the (decompressed) contents.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    if file_path == STDIN_PATH:
+        stream = sys.stdin.buffer
+        stream = stream if hasattr(stream, 'peek') else io.BufferedReader(stream)
+    else:
+        try:
+            stream = open(file_path, 'rb')
+        except (IOError, OSError):
+            raise RuntimeError('Invalid path "{}" for JUnitXML results file!'.format(file_path))
+
+    contents = _decompressed(stream)
+    try:
+        yield contents
+    finally:
+        if contents is not stream:
+            contents.close()
+        if file_path != STDIN_PATH:
+            stream.close()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Deferred imports for heavy modules that are only needed once an upload actually happens."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import importlib
+import importlib.util
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def is_installed(name):
+    """Check whether an optional top level package is installed without importing it.
+
+    Args:
+        name (str): The name of the package. (e.g. "lxml")
+
+    Returns:
+        bool: True if the package can be imported.
+    """
+
+    return importlib.util.find_spec(name) is not None
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class LazyModule(object):
+    """A stand-in for a module that imports the module the first time one of its attributes is accessed.
+
+    Importing the generated swagger client pulls in every API, every model and the urllib3 HTTP stack, which dominates
+    the start up time of the CLI. Commands such as "--help" or an upload that fails validation never need it.
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): The absolute name of the module. (e.g. "swagger_client.rest")
+        """
+
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        return '<LazyModule "{}"{}>'.format(self._name, '' if self._module is None else ' (imported)')
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""A persistent, time limited cache of qTest project metadata used to validate the target of an upload up front."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import json
+import time
+import threading
+from py_result_uploader.cache import DEFAULT_CACHE_DIR
+from py_result_uploader.lazy import LazyModule
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+METADATA_FILE_NAME = 'metadata.sqlite'
+DEFAULT_METADATA_TTL = 15 * 60
+
+sqlite3 = LazyModule('sqlite3')
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def collect_test_cycle_ids(test_cycles):
+    """Collect the identifiers of every test cycle in a tree of test cycles.
+
+    Args:
+        test_cycles (list(TestCycleResource)): The root test cycles of a project with their descendants expanded.
+
+    Returns:
+        set(str): The PID (e.g. "CL-1") and numeric ID of every test cycle.
+    """
+
+    ids = set()
+    pending = list(test_cycles or [])
+
+    while pending:
+        test_cycle = pending.pop()
+        ids.update(str(i) for i in (test_cycle.pid, test_cycle.id) if i is not None)
+        pending.extend(getattr(test_cycle, 'test_cycles', None) or [])
+
+    return ids
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class MetadataCache(object):
+    """The test cycles of every qTest project looked up recently, keyed by the qTest host and project.
+
+    Entries expire after the time to live so that repeated uploads in the same pipeline skip the lookup while test
+    cycles created or removed later are still noticed. Only projects that were found are recorded.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_METADATA_TTL):
+        """
+        Args:
+            directory (str): The directory holding the SQLite database. (Created if missing)
+            ttl (float): The number of seconds an entry is used for.
+        """
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self.path = os.path.join(directory, METADATA_FILE_NAME)
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS projects ('
+                           'host TEXT, project_id INTEGER, test_cycles TEXT, fetched REAL, '
+                           'PRIMARY KEY (host, project_id))')
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the database."""
+
+        with self._lock:
+            self._conn.close()
+
+    def get(self, host, project_id):
+        """Look up the test cycles of a project.
+
+        Args:
+            host (str): The base URL of the qTest API.
+            project_id (int): The qTest project.
+
+        Returns:
+            set(str): The identifiers of the test cycles of the project or None if the project was not looked up
+                within the time to live.
+        """
+
+        with self._lock:
+            row = self._conn.execute('SELECT test_cycles, fetched FROM projects WHERE host = ? AND project_id = ?',
+                                     (host, project_id)).fetchone()
+
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+
+        return set(json.loads(row[0]))
+
+    def put(self, host, project_id, test_cycle_ids):
+        """Record the test cycles of a project and evict expired entries.
+
+        Args:
+            host (str): The base URL of the qTest API.
+            project_id (int): The qTest project.
+            test_cycle_ids (set(str)): The identifiers of the test cycles of the project.
+        """
+
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?)',
+                               (host, project_id, json.dumps(sorted(test_cycle_ids)), now))
+            self._conn.execute('DELETE FROM projects WHERE fetched < ?', (now - self.ttl,))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM projects').fetchone()[0]
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""Timing and resource instrumentation for every phase of an upload with JSON and Prometheus exports."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import sys
+import json
+import time
+import threading
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:     # Not available on Windows.
+    resource = None
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+PROMETHEUS_PREFIX = 'py_result_uploader'
+PROMETHEUS_METRICS = (('duration', 'duration_seconds', 'The time spent in the phase of the last upload.'),
+                      ('cases', 'cases', 'The number of test cases handled by the phase of the last upload.'),
+                      ('bytes', 'bytes', 'The number of bytes handled by the phase of the last upload.'),
+                      ('peak_memory', 'peak_memory_bytes', 'The peak resident memory of the process at the end of the '
+                                                           'phase.'))
+
+Span = namedtuple('Span', ['name', 'duration', 'cases', 'bytes', 'peak_memory'])
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _peak_memory():
+    """Read the peak resident memory of the current process.
+
+    Returns:
+        int: The peak resident memory in bytes. (None if the platform does not report it)
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak if sys.platform == 'darwin' else peak * 1024     # Linux reports kilobytes.
+
+
+def _add(a, b):
+    return b if a is None else a if b is None else a + b
+
+
+def _max(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class _SpanRecorder(object):
+    """The mutable counters of a span that is being measured."""
+
+    __slots__ = ('cases', 'bytes')
+
+    def __init__(self, cases, byte_count):
+        self.cases = cases
+        self.bytes = byte_count
+
+
+class UploadMetrics(object):
+    """Collect the duration, case count, byte count and peak memory of every phase of an upload.
+
+    The phases are "parse" (reading the JUnitXML files), "build" (constructing test logs), "serialize" (encoding
+    the request body), "submit" (HTTP round trips to qTest Manager) and "queue" (waiting for qTest Manager to process
+    the jobs). A phase that is measured more than once, such as "parse" for multiple files, is reported as the sum of
+    its measurements. Instances are safe to share between threads.
+    """
+
+    def __init__(self, on_span=None):
+        """
+        Args:
+            on_span (callable): Called with every 'Span' as soon as it has been measured.
+        """
+
+        self.on_span = on_span
+        self.started = time.time()
+
+        self._spans = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self):
+        """list(Span): Every measured phase in the order it was first measured."""
+
+        with self._lock:
+            return list(self._spans.values())
+
+    @contextmanager
+    def span(self, name, cases=None, byte_count=None):
+        """Measure a phase of an upload. The yielded recorder accepts the "cases" and "bytes" handled by the phase
+        when they are only known once the phase has finished.
+
+        Args:
+            name (str): The name of the phase.
+            cases (int): The number of test cases handled by the phase.
+            byte_count (int): The number of bytes handled by the phase.
+
+        Yields:
+            _SpanRecorder: The counters of the phase.
+        """
+
+        recorder = _SpanRecorder(cases, byte_count)
+        start = time.perf_counter()
+
+        yield recorder
+
+        self.record(Span(name, time.perf_counter() - start, recorder.cases, recorder.bytes, _peak_memory()))
+
+    def record(self, span):
+        """Add a measured span, merging it with any earlier measurement of the same phase.
+
+        Args:
+            span (Span): The measured span.
+        """
+
+        with self._lock:
+            previous = self._spans.get(span.name)
+            if previous:
+                self._spans[span.name] = Span(span.name,
+                                              previous.duration + span.duration,
+                                              _add(previous.cases, span.cases),
+                                              _add(previous.bytes, span.bytes),
+                                              _max(previous.peak_memory, span.peak_memory))
+            else:
+                self._spans[span.name] = span
+
+        if self.on_span:
+            self.on_span(span)
+
+    def to_dict(self):
+        """Convert the measurements to plain data.
+
+        Returns:
+            dict: The start time and every measured phase.
+        """
+
+        return {'started': self.started, 'spans': [span._asdict() for span in self.spans]}
+
+    def write_json(self, file_path):
+        """Write the measurements to a JSON file.
+
+        Args:
+            file_path (str): The destination file path.
+        """
+
+        with open(file_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_prometheus(self):
+        """Format the measurements in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one gauge per measurement labeled by phase.
+        """
+
+        spans = self.spans
+        lines = []
+
+        for field, suffix, help_text in PROMETHEUS_METRICS:
+            metric = '{}_phase_{}'.format(PROMETHEUS_PREFIX, suffix)
+            lines.append('# HELP {} {}'.format(metric, help_text))
+            lines.append('# TYPE {} gauge'.format(metric))
+            for span in spans:
+                value = getattr(span, field)
+                if value is not None:
+                    lines.append('{}{{phase="{}"}} {}'.format(metric, span.name, value))
+
+        metric = '{}_last_upload_timestamp_seconds'.format(PROMETHEUS_PREFIX)
+        lines.append('# HELP {} The time the last upload started.'.format(metric))
+        lines.append('# TYPE {} gauge'.format(metric))
+        lines.append('{} {}'.format(metric, self.started))
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, file_path):
+        """Write the measurements to a Prometheus textfile. (The file is replaced atomically so that a collector
+        such as the node exporter never reads a partial file)
+
+        Args:
+            file_path (str): The destination file path. (Should end with ".prom")
+        """
+
+        temp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+
+        with open(temp_path, 'w') as f:
+            f.write(self.to_prometheus())
+
+        os.rename(temp_path, file_path)
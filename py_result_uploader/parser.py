@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""Interchangeable XML parser backends for reading JUnitXML files. (lxml when installed, otherwise the stdlib)"""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+from collections import namedtuple
+from py_result_uploader.lazy import LazyModule, is_installed
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+# Both parsers are only imported once a file is actually parsed. (lxml is None when it is not installed)
+StdlibEtree = LazyModule('xml.etree.ElementTree')
+LxmlEtree = LazyModule('lxml.etree') if is_installed('lxml') else None
+
+PARSER_ENV_VAR = 'PY_RESULT_UPLOADER_PARSER'
+PARSER_BACKENDS = ('lxml', 'stdlib')     # Fastest first
+
+ParserBackend = namedtuple('ParserBackend', ['name', 'parse', 'parse_string', 'iterparse', 'parse_error'])
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _stdlib_parse(file_path):
+    return StdlibEtree.parse(file_path).getroot()
+
+
+def _stdlib_parse_string(data):
+    return StdlibEtree.fromstring(data)
+
+
+def _stdlib_iterparse(file_path, events):
+    return StdlibEtree.iterparse(file_path, events=events)
+
+
+def _lxml_parser():
+    # "huge_tree" lifts the limits on text size (e.g. long tracebacks) and entities are never resolved.
+    return LxmlEtree.XMLParser(huge_tree=True, resolve_entities=False)
+
+
+def _lxml_parse(file_path):
+    return LxmlEtree.parse(file_path, _lxml_parser()).getroot()
+
+
+def _lxml_parse_string(data):
+    return LxmlEtree.fromstring(data, _lxml_parser())
+
+
+def _lxml_iterparse(file_path, events):
+    return LxmlEtree.iterparse(file_path, events=events, huge_tree=True, resolve_entities=False)
+
+
+def available_backends():
+    """List the parser backends that can be used in this environment, fastest first.
+
+    Returns:
+        list(str): The names of the available backends.
+    """
+
+    return [name for name in PARSER_BACKENDS if name != 'lxml' or LxmlEtree is not None]
+
+
+def get_backend(name=None):
+    """Select a parser backend. Both backends produce identical results, lxml is simply faster.
+
+    Args:
+        name (str): The name of the backend. ('lxml', 'stdlib' or None to use the "PY_RESULT_UPLOADER_PARSER"
+            environment variable and fall back to the fastest available backend)
+
+    Returns:
+        ParserBackend: The parser backend.
+
+    Raises:
+        RuntimeError: The backend is unknown or not installed.
+    """
+
+    name = name or os.environ.get(PARSER_ENV_VAR) or available_backends()[0]
+
+    if name not in PARSER_BACKENDS:
+        raise RuntimeError('Unknown XML parser "{}"! (Choose from: {})'.format(name, ', '.join(PARSER_BACKENDS)))
+    if name not in available_backends():
+        raise RuntimeError('The "{}" XML parser is not installed!'.format(name))
+
+    if name == 'lxml':
+        return ParserBackend(name, _lxml_parse, _lxml_parse_string, _lxml_iterparse, LxmlEtree.ParseError)
+
+    return ParserBackend(name, _stdlib_parse, _stdlib_parse_string, _stdlib_iterparse, StdlibEtree.ParseError)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""Concurrent polling of qTest queue processing jobs."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import time
+import random
+from collections import namedtuple
+from py_result_uploader.submission import is_transient, retry_delay, DEFAULT_MAX_RETRIES
+from py_result_uploader.lazy import LazyModule
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+TERMINAL_JOB_STATES = ('SUCCESS', 'FAILED')
+DEFAULT_POLL_TIMEOUT = 600
+DEFAULT_POLL_INITIAL_DELAY = 1.0
+DEFAULT_POLL_MAX_DELAY = 30.0
+DEFAULT_POLL_WORKERS = 8
+
+asyncio = LazyModule('asyncio')
+futures = LazyModule('concurrent.futures')
+
+JobReport = namedtuple('JobReport', ['job_id', 'state', 'waited', 'polls', 'error'])
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _backoff_delay(attempt, initial_delay, max_delay):
+    """Calculate a jittered exponential backoff delay. ("Equal jitter": half of the capped exponential delay is
+    fixed and the other half is random so that concurrent pollers do not synchronize)
+
+    Args:
+        attempt (int): The zero based number of polls already made.
+        initial_delay (float): The delay in seconds before the second poll.
+        max_delay (float): The upper bound for the delay in seconds.
+
+    Returns:
+        float: The number of seconds to wait before the next poll.
+    """
+
+    delay = min(max_delay, initial_delay * (2 ** attempt))
+
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def _poll_job(loop, executor, track, job_id, deadline, initial_delay, max_delay, max_retries):
+    """Poll a single queue processing job until it reaches a terminal state or the deadline passes. Transient
+    failures (e.g. 429/503) are retried with the same backoff as submissions. (See 'retry_delay')
+
+    Args:
+        loop (AbstractEventLoop): The event loop the poller is running on.
+        executor (Executor): The executor used to run the blocking "track" calls.
+        track (callable): A blocking callable that accepts a job ID and returns a queue processing response.
+        job_id (int): The queue processing job ID.
+        deadline (float): The "time.time()" after which polling is abandoned.
+        initial_delay (float): The delay in seconds before the second poll.
+        max_delay (float): The upper bound for the delay between polls in seconds.
+        max_retries (int): The number of consecutive transient failures retried before giving up on the job.
+
+    Returns:
+        JobReport: The final state of the job.
+    """
+
+    start = time.time()
+    state = None
+    polls = 0
+    attempt = 0     # Polls that reported a state
+    retries = 0     # Consecutive transient failures
+
+    while True:
+        polls += 1
+        try:
+            state = (await loop.run_in_executor(executor, track, job_id)).state
+        except Exception as e:
+            if not is_transient(e) or retries >= max_retries:
+                return JobReport(job_id, state, time.time() - start, polls, 'Failed to poll job: {}'.format(e))
+            delay = retry_delay(retries, e, initial_delay, max_delay)
+            retries += 1
+        else:
+            if state in TERMINAL_JOB_STATES:
+                return JobReport(job_id, state, time.time() - start, polls, None)
+            delay = _backoff_delay(attempt, initial_delay, max_delay)
+            attempt += 1
+            retries = 0
+
+        if time.time() + delay > deadline:
+            return JobReport(job_id, state, time.time() - start, polls, 'Timed out waiting for job to finish!')
+
+        await asyncio.sleep(delay)
+
+
+async def _poll_all_jobs(loop, executor, track, job_ids, deadline, initial_delay, max_delay, max_retries):
+    """Run a poller for every queue processing job concurrently.
+
+    Args:
+        loop (AbstractEventLoop): The event loop the pollers are running on.
+        executor (Executor): The executor used to run the blocking "track" calls.
+        track (callable): A blocking callable that accepts a job ID and returns a queue processing response.
+        job_ids (list(int)): The queue processing job IDs to poll.
+        deadline (float): The "time.time()" after which polling is abandoned.
+        initial_delay (float): The delay in seconds before the second poll of a job.
+        max_delay (float): The upper bound for the delay between polls in seconds.
+        max_retries (int): The number of consecutive transient failures retried for every job.
+
+    Returns:
+        list(JobReport): The final state of every job in the order of the given job IDs.
+    """
+
+    pollers = [_poll_job(loop, executor, track, job_id, deadline, initial_delay, max_delay, max_retries)
+               for job_id in job_ids]
+
+    return list(await asyncio.gather(*pollers))
+
+
+def poll_jobs(track,
+              job_ids,
+              timeout=DEFAULT_POLL_TIMEOUT,
+              initial_delay=DEFAULT_POLL_INITIAL_DELAY,
+              max_delay=DEFAULT_POLL_MAX_DELAY,
+              workers=DEFAULT_POLL_WORKERS,
+              max_retries=DEFAULT_MAX_RETRIES):
+    """Concurrently poll many queue processing jobs on a single event loop until each reaches a terminal state.
+
+    Args:
+        track (callable): A blocking callable that accepts a job ID and returns a queue processing response.
+        job_ids (list(int)): The queue processing job IDs to poll.
+        timeout (float): The number of seconds to wait for all jobs to finish.
+        initial_delay (float): The delay in seconds before the second poll of a job.
+        max_delay (float): The upper bound for the delay between polls in seconds.
+        workers (int): The maximum number of "track" calls in flight at once.
+        max_retries (int): The number of consecutive transient failures (e.g. 429/503) retried for every job.
+
+    Returns:
+        list(JobReport): The final state of every job and the number of seconds waited for it from the start of
+            polling, in the order of the given job IDs.
+    """
+
+    deadline = time.time() + timeout
+    loop = asyncio.new_event_loop()
+
+    try:
+        with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return loop.run_until_complete(_poll_all_jobs(loop,
+                                                          executor,
+                                                          track,
+                                                          job_ids,
+                                                          deadline,
+                                                          initial_delay,
+                                                          max_delay,
+                                                          max_retries))
+    finally:
+        loop.close()
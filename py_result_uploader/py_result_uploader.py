@@ -3,58 +3,279 @@
 # ======================================================================================================================
 # Imports
 # ======================================================================================================================
+import os
 import re
-import swagger_client
-from swagger_client.rest import ApiException
-import xml.etree.ElementTree as Etree
+import glob
+import json
+import time
+import operator
+import itertools
 from datetime import datetime
+from collections import namedtuple, OrderedDict, Counter
+from py_result_uploader.polling import poll_jobs, DEFAULT_POLL_TIMEOUT
+from py_result_uploader.submission import SubmissionController, DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE
+from py_result_uploader.records import CompactTestLog
+from py_result_uploader.failures import FailureDetails
+from py_result_uploader.delta import DeltaReport
+from py_result_uploader.serializer import (submit_chunked, submit_compressed, submit_serialized, serialize_auto_request,
+                                           iter_json_chunks, iter_ndjson_chunks, DEFAULT_COMPRESS_LEVEL)
+from py_result_uploader.spool import UploadSpool
+from py_result_uploader.metrics import UploadMetrics
+from py_result_uploader.parser import get_backend
+from py_result_uploader.sharding import (find_testsuites, read_testsuite, find_testcases, read_testcases,
+                                         DEFAULT_SHARD_BYTES)
+from py_result_uploader.inputs import (open_input, is_compressed, input_size, corrupt_input_errors, STDIN_PATH,
+                                       XML_FILE_SUFFIXES)
+from py_result_uploader.metadata import collect_test_cycle_ids
+from py_result_uploader.lazy import LazyModule
 
 # ======================================================================================================================
 # Globals
 # ======================================================================================================================
+# Deferred until the first qTest swagger model or API client is needed
+swagger_client = LazyModule('swagger_client')
+client = LazyModule('py_result_uploader.client')
+futures = LazyModule('concurrent.futures')
+urllib3 = LazyModule('urllib3')
+
 TESTCASE_NAME_RGX = re.compile(r'(\w+)(\[.+\])')
+DEFAULT_BATCH_MAX_LOGS = 1000
+DEFAULT_BATCH_MAX_BYTES = 4 * 1024 * 1024
+DEFAULT_BATCH_WORKERS = 4
+JUNIT_ROOT_ELEMENTS = ('testsuite', 'testsuites')
+CONVERT_FORMATS = ('json', 'ndjson')
+TEST_LOG_STATUS_SEVERITY = ('PASSED', 'SKIPPED', 'FAILED')     # Least to most severe
+
+TestsuiteFragment = namedtuple('TestsuiteFragment', ['file_path', 'prolog', 'start', 'end', 'shared_props'])
+TestcaseShard = namedtuple('TestcaseShard', ['file_path', 'prolog', 'root_tag', 'start', 'end', 'testsuite_props',
+                                             'index'])
+BatchReport = namedtuple('BatchReport', ['index', 'test_log_count', 'byte_size', 'job_id', 'state', 'elapsed', 'error'])
 
 
 # ======================================================================================================================
 # Functions
 # ======================================================================================================================
-def _load_input_file(file_path):
+def _utc_timestamp():
+    """Format the current time the way qTest expects it.
+
+    Returns:
+        str: The current UTC time. (e.g. "2018-01-01T00:00:00Z")
+    """
+
+    return datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')   # UTC timezone 'Zulu'
+
+
+def _load_input_file(file_path, parser=None):
     """Read and validate the input file contents.
 
     Args:
-        file_path (str): A string representing a valid file path.
+        file_path (str): A string representing a valid file path. (Optionally compressed with gzip, bzip2 or xz, or
+            "-" for stdin)
+        parser (str): The XML parser backend to use. ('lxml', 'stdlib' or None for the fastest available)
 
     Returns:
-        ElementTree: An ET object already pointed at the root "testsuite" element.
+        ElementTree: An ET object already pointed at the root "testsuite" or "testsuites" element.
 
     Raises:
         RuntimeError: invalid path.
     """
 
-    root_element = "testsuite"
+    backend = get_backend(parser)
 
-    try:
-        junit_xml = Etree.parse(file_path).getroot()
-    except IOError:
-        raise RuntimeError('Invalid path "{}" for JUnitXML results file!'.format(file_path))
-    except Etree.ParseError:
-        raise RuntimeError('The file "{}" does not contain valid XML!'.format(file_path))
+    with open_input(file_path) as f:
+        try:
+            junit_xml = backend.parse(f)
+        except backend.parse_error:
+            raise RuntimeError('The file "{}" does not contain valid XML!'.format(file_path))
+        except corrupt_input_errors():
+            raise RuntimeError('The file "{}" is corrupt or truncated!'.format(file_path))
 
-    if junit_xml.tag != root_element:
-        raise RuntimeError('The file "{}" does not have JUnitXML "{}" root element!'.format(file_path, root_element))
+    if junit_xml.tag not in JUNIT_ROOT_ELEMENTS:
+        raise RuntimeError('The file "{}" does not have JUnitXML "{}" root element!'
+                           .format(file_path, '" or "'.join(JUNIT_ROOT_ELEMENTS)))
 
     return junit_xml
 
 
-def _generate_test_log(junit_testcase_xml, testsuite_props):
-    """Construct a qTest swagger model for a single JUnitXML test result.
+def _read_properties(junit_xml, inherited_props=None):
+    """Read the properties of a "testsuite" or "testsuites" element.
+
+    Args:
+        junit_xml (ElementTree): A XML element with a "properties" child element.
+        inherited_props (dict): Properties of an enclosing element that apply unless they are overridden.
+
+    Returns:
+        dict: The properties.
+    """
+
+    props = dict(inherited_props or {})
+    props.update((p.attrib['name'], p.attrib['value']) for p in junit_xml.findall('./properties/property'))
+
+    return props
+
+
+def _add_properties(properties_xml, props):
+    """Read a single "properties" element on top of properties read before it.
+
+    Args:
+        properties_xml (ElementTree): A "properties" XML element.
+        props (dict): The properties read so far.
+
+    Returns:
+        dict: The properties including those of the element. (A new dict, "props" is left untouched)
+    """
+
+    props = dict(props)
+    props.update((p.attrib['name'], p.attrib['value']) for p in properties_xml.findall('property'))
+
+    return props
+
+
+def _iter_testcases(junit_xml):
+    """Iterate over the test results of a loaded JUnitXML file. The properties of a "testsuite" only apply to its own
+    testcases. (Properties of a "testsuites" root element apply to every testsuite that does not override them)
+
+    Args:
+        junit_xml (ElementTree): A XML element representing a JUnit style "testsuite" or "testsuites" result.
+
+    Returns:
+        generator: Yields tuples of the index of the testsuite (int), the testsuite properties (dict) and a
+            "testcase" element (Element).
+    """
+
+    if junit_xml.tag == 'testsuite':
+        testsuites = [(_read_properties(junit_xml), junit_xml)]
+    else:
+        shared_props = _read_properties(junit_xml)
+        testsuites = ((_read_properties(ts_xml, shared_props), ts_xml) for ts_xml in junit_xml.findall('testsuite'))
+
+    for index, (testsuite_props, testsuite_xml) in enumerate(testsuites):
+        for tc_xml in testsuite_xml.findall('testcase'):
+            yield index, testsuite_props, tc_xml
+
+
+def _iter_input_testcases(file_path, parser=None):
+    """Incrementally parse the input file yielding each "testcase" element as soon as it has been completely read.
+
+    The "properties" of a "testsuite" element are always resolved before any of its testcases are yielded.
+    (Testcases that appear ahead of the "properties" element are held back until the properties are known) Every
+    further "properties" element adds to the properties of the testcases that follow it. The "properties" of a
+    "testsuites" root element must precede its "testsuite" elements to apply to them. Every element
+    is cleared and detached from the tree once it has been consumed so that memory usage stays flat regardless of the
+    size of the input file.
+
+    Args:
+        file_path (str): A string representing a valid file path. (Optionally compressed with gzip, bzip2 or xz, or
+            "-" for stdin) Compressed files are decompressed as they are parsed.
+        parser (str): The XML parser backend to use. ('lxml', 'stdlib' or None for the fastest available)
+
+    Returns:
+        generator: Yields tuples of the index of the testsuite (int), the testsuite properties (dict) and a
+            "testcase" element (Element).
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    backend = get_backend(parser)
+
+    with open_input(file_path) as f:
+        for testcase in _iterparse_testcases(f, file_path, backend):
+            yield testcase
+
+
+def _iterparse_testcases(f, file_path, backend):
+    """Incrementally parse an opened input file. (See '_iter_input_testcases')
+
+    Args:
+        f (file): A readable binary stream of the (decompressed) contents of the input file.
+        file_path (str): The file path the stream was opened from. (Only used in error messages)
+        backend (ParserBackend): The XML parser backend to use.
+
+    Returns:
+        generator: Yields tuples of the index of the testsuite (int), the testsuite properties (dict) and a
+            "testcase" element (Element).
+
+    Raises:
+        RuntimeError: invalid XML or a corrupt compressed file.
+    """
+
+    root = None
+    testsuite = None        # The "testsuite" element that is currently being read.
+    index = -1
+    depth = 0
+    shared_props = {}
+    testsuite_props = None
+    held_testcases = []
+
+    try:
+        for event, element in backend.iterparse(f, ('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                    if root.tag not in JUNIT_ROOT_ELEMENTS:
+                        raise RuntimeError('The file "{}" does not have JUnitXML "{}" root element!'
+                                           .format(file_path, '" or "'.join(JUNIT_ROOT_ELEMENTS)))
+                    if root.tag == 'testsuite':
+                        testsuite, index = root, 0
+                elif depth == 1 and testsuite is None and element.tag == 'testsuite':
+                    testsuite, index = element, index + 1
+                depth += 1
+                continue
+
+            depth -= 1
+            if testsuite is not None and depth == (1 if testsuite is root else 2):
+                # Only direct children of the testsuite are of interest.
+                if element.tag == 'properties':
+                    # Read from the element itself since the parser may already have added later siblings to the tree.
+                    testsuite_props = _add_properties(element,
+                                                      shared_props if testsuite_props is None else testsuite_props)
+                    for testcase in held_testcases:
+                        yield index, testsuite_props, testcase
+                        testcase.clear()
+                    held_testcases = []
+                elif element.tag == 'testcase':
+                    if testsuite_props is None:
+                        held_testcases.append(element)
+                        testsuite.remove(element)
+                        continue
+                    yield index, testsuite_props, element
+
+                element.clear()
+                testsuite.remove(element)
+            elif depth == 1:
+                # Direct children of a "testsuites" root element.
+                if element.tag == 'properties':
+                    shared_props = _add_properties(element, shared_props)
+                elif element is testsuite:
+                    for testcase in held_testcases:     # The testsuite did not contain a "properties" element.
+                        yield index, shared_props, testcase
+                    held_testcases = []
+                    testsuite = testsuite_props = None
+
+                element.clear()
+                root.remove(element)
+    except backend.parse_error:
+        raise RuntimeError('The file "{}" does not contain valid XML!'.format(file_path))
+    except corrupt_input_errors():
+        raise RuntimeError('The file "{}" is corrupt or truncated!'.format(file_path))
+
+    for testcase in held_testcases:     # The testsuite did not contain a "properties" element.
+        yield index, shared_props, testcase
+
+
+def _generate_test_log(junit_testcase_xml, testsuite_props, timestamp=None, details=None):
+    """Construct a compact record of a qTest test log for a single JUnitXML test result.
 
     Args:
         junit_testcase_xml (ElementTree): A XML element representing a JUnit style testcase result.
         testsuite_props (dict): A dictionary of properties for the testsuite from within which the testcase executed.
+        timestamp (str): The UTC execution time to record for the test. (None for the current time)
+        details (FailureDetails): Record the failure message and traceback in the note of the test log. (None to
+            only record the status)
 
     Returns:
-        AutomationTestLogResource: A qTest swagger model for an test log.
+        CompactTestLog: A record that serializes to a qTest swagger model for an test log.
     """
 
     testcase_status = 'PASSED'
@@ -64,74 +285,1848 @@ def _generate_test_log(junit_testcase_xml, testsuite_props):
     elif junit_testcase_xml.find('skipped') is not None:
         testcase_status = 'SKIPPED'
 
-    test_log = swagger_client.AutomationTestLogResource()
+    name = TESTCASE_NAME_RGX.match(junit_testcase_xml.attrib['name']).group(1)
+    module_name = testsuite_props['GIT_BRANCH']                                  # GIT_BRANCH == RPC release
+    timestamp = timestamp or _utc_timestamp()
+    note, detail_digest = details.describe(junit_testcase_xml) if details else (None, None)
+
+    return CompactTestLog(name,
+                          testcase_status,
+                          module_name,
+                          timestamp,
+                          timestamp,
+                          "{}#{}".format(module_name, name),
+                          note,
+                          detail_digest)
+
+
+def _more_severe(test_log, other_test_log):
+    """Check whether a test log has a more severe status than another one.
+
+    Args:
+        test_log (CompactTestLog): The test log to check.
+        other_test_log (CompactTestLog): The test log to compare with.
 
-    test_log.name = TESTCASE_NAME_RGX.match(junit_testcase_xml.attrib['name']).group(1)
-    test_log.status = testcase_status
-    test_log.module_names = [testsuite_props['GIT_BRANCH']]                      # GIT_BRANCH == RPC release
-    test_log.exe_start_date = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')   # UTC timezone 'Zulu'
-    test_log.exe_end_date = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')     # UTC timezone 'Zulu'
-    test_log.automation_content = "{}#{}".format(testsuite_props['GIT_BRANCH'], test_log.name)
+    Returns:
+        bool: True if the status of the test log is more severe.
+    """
 
-    return test_log
+    return TEST_LOG_STATUS_SEVERITY.index(test_log.status) > TEST_LOG_STATUS_SEVERITY.index(other_test_log.status)
 
 
-def _generate_auto_request(junit_xml, test_cycle):
-    """Construct a qTest swagger model for a JUnitXML test run result. (Called an "automation request" in
-    qTest parlance)
+def _group_test_logs(testcases, timestamp=None, groups=None, details=None):
+    """Group JUnitXML test results by their normalized test name in a single pass, counting the statuses of every
+    parameter of a parametrized test. (e.g. "test_x[host1]" and "test_x[host2]" belong to the "test_x" group)
 
     Args:
-        junit_xml (ElementTree): A XML element representing a JUnit style testsuite result.
-        test_cycle (str): The parent qTest test cycle for test results.
+        testcases (iterable(tuple(dict, ElementTree))): The testsuite properties and "testcase" element of every test
+            result.
+        timestamp (str): The UTC execution time to record for the tests. (None for the current time)
+        groups (OrderedDict): Existing groups to add the test results to. (None to start new groups)
+        details (FailureDetails): Record the failure message and traceback in the note of the test logs. (None to
+            only record the status)
 
     Returns:
-        AutomationRequest: A qTest swagger model for an automation request.
+        OrderedDict: Maps the automation content of every group to a tuple of the first test log of the group with
+            the most severe status and an OrderedDict that maps every parameter to a Counter of its statuses.
     """
 
-    testsuite_props = {p.attrib['name']: p.attrib['value'] for p in junit_xml.findall('./properties/property')}
-    test_logs = [_generate_test_log(tc_xml, testsuite_props) for tc_xml in junit_xml.findall('testcase')]
+    groups = OrderedDict() if groups is None else groups
 
-    auto_req = swagger_client.AutomationRequest()
-    auto_req.test_cycle = test_cycle
-    auto_req.test_logs = test_logs
-    auto_req.execution_date = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')   # UTC timezone 'Zulu'
+    for testsuite_props, tc_xml in testcases:
+        test_log = _generate_test_log(tc_xml, testsuite_props, timestamp, details)
+        parameter = TESTCASE_NAME_RGX.match(tc_xml.attrib['name']).group(2)
 
-    return auto_req
+        if test_log.automation_content not in groups:
+            groups[test_log.automation_content] = (test_log, OrderedDict())
+        elif _more_severe(test_log, groups[test_log.automation_content][0]):
+            # The failure details of the group come from the test log that decides the status of the group.
+            groups[test_log.automation_content] = (test_log, groups[test_log.automation_content][1])
+        groups[test_log.automation_content][1].setdefault(parameter, Counter())[test_log.status] += 1
 
+    return groups
 
-def upload_test_results(junit_xml_file_path, qtest_api_token, qtest_project_id, qtest_test_cycle):
-    """Construct a 'AutomationRequest' qTest resource and upload the test results to the desired project in
-    qTest Manager.
+
+def _merge_test_log_groups(groups_list):
+    """Merge test log groups built from separate JUnitXML files, preserving the order in which groups first appear.
+
+    Args:
+        groups_list (iterable(OrderedDict)): Groups built by '_group_test_logs'.
+
+    Returns:
+        OrderedDict: The combined groups.
+    """
+
+    merged = OrderedDict()
+
+    for groups in groups_list:
+        for automation_content, (test_log, parameter_counts) in groups.items():
+            if automation_content not in merged:
+                merged[automation_content] = (test_log, parameter_counts)
+                continue
+            if _more_severe(test_log, merged[automation_content][0]):
+                merged[automation_content] = (test_log, merged[automation_content][1])
+            for parameter, status_counts in parameter_counts.items():
+                merged[automation_content][1].setdefault(parameter, Counter()).update(status_counts)
+
+    return merged
+
+
+def _format_status_counts(status_counts):
+    """Format status counts from the most to the least severe status. (e.g. "2 FAILED, 3 PASSED")
+
+    Args:
+        status_counts (Counter): The number of occurrences of every status.
+
+    Returns:
+        str: The formatted counts.
+    """
+
+    return ', '.join('{} {}'.format(status_counts[status], status)
+                     for status in reversed(TEST_LOG_STATUS_SEVERITY) if status_counts[status])
+
+
+def _aggregate_test_logs(groups):
+    """Collapse every group of test results into a single test log.
+
+    The status of a group is the most severe status of its members. (FAILED > SKIPPED > PASSED) The note of the test
+    log records the status counts for the whole group followed by the status counts of every parameter and the
+    failure details of the first member with that status, if any. Groups with a single test result are left
+    untouched.
+
+    Args:
+        groups (OrderedDict): Groups built by '_group_test_logs'.
+
+    Returns:
+        list(CompactTestLog): One test log per group.
+    """
+
+    test_logs = []
+
+    for test_log, parameter_counts in groups.values():
+        status_counts = Counter()
+        for counts in parameter_counts.values():
+            status_counts.update(counts)
+
+        total = sum(status_counts.values())
+        if total == 1:
+            test_logs.append(test_log)
+            continue
+
+        note = ['Aggregated {} parametrized runs: {}'.format(total, _format_status_counts(status_counts))]
+        note.extend('{}: {}'.format(parameter, _format_status_counts(counts))
+                    for parameter, counts in parameter_counts.items())
+        if test_log.note:
+            note.extend(('', test_log.note))
+
+        test_logs.append(CompactTestLog(test_log.name,
+                                        max(status_counts, key=TEST_LOG_STATUS_SEVERITY.index),
+                                        test_log.module_name,
+                                        test_log.exe_start_date,
+                                        test_log.exe_end_date,
+                                        test_log.automation_content,
+                                        '\n'.join(note),
+                                        test_log.detail_digest))
+
+    return test_logs
+
+
+def expand_input_paths(input_paths):
+    """Expand a mix of file paths, directories and glob patterns into a list of JUnitXML file paths.
+
+    Directories are searched recursively for "*.xml" files and their gzip, bzip2 or xz compressed "*.xml.gz",
+    "*.xml.bz2" and "*.xml.xz" counterparts. A "-" reads the results from stdin instead. Duplicate paths are only
+    included once and the order of the input is preserved. (Matches for a single directory or glob pattern are sorted)
+
+    Args:
+        input_paths (list(str)): File paths, directories or glob patterns.
+
+    Returns:
+        list(str): The expanded file paths.
+
+    Raises:
+        RuntimeError: A path or pattern did not match any files.
+    """
+
+    file_paths = []
+    seen = set()
+
+    for input_path in input_paths:
+        if input_path == STDIN_PATH:
+            matches = [input_path]
+        elif os.path.isdir(input_path):
+            matches = sorted(os.path.join(dir_path, f)
+                             for dir_path, _, file_names in os.walk(input_path)
+                             for f in file_names if f.endswith(XML_FILE_SUFFIXES))
+        elif glob.has_magic(input_path):
+            matches = sorted(p for p in glob.glob(input_path, recursive=True) if os.path.isfile(p))
+        else:
+            matches = [input_path] if os.path.isfile(input_path) else []
+
+        if not matches:
+            raise RuntimeError('The path "{}" does not match any JUnitXML results files!'.format(input_path))
+
+        for file_path in matches:
+            if file_path not in seen:
+                seen.add(file_path)
+                file_paths.append(file_path)
+
+    return file_paths
+
+
+def _build_testsuite_results(testcases, aggregate=False, timestamp=None, failure_details=None):
+    """Construct the qTest swagger models for the test results of every testsuite separately.
+
+    Identical tracebacks are only recorded by the first test log they occur in. (Within the results of this call,
+    see '_dedupe_failure_details' to dedupe results built separately)
+
+    Args:
+        testcases (iterable(tuple(int, dict, ElementTree))): The index of the testsuite, the testsuite properties and
+            the "testcase" element of every test result. (Ordered by testsuite)
+        aggregate (bool): Group the test results by normalized test name instead of building test logs.
+        timestamp (str): The UTC execution time to record for the tests. (None for the current time)
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+
+    Returns:
+        list(list(CompactTestLog) or OrderedDict): The records of the test logs or groups as built by
+            '_group_test_logs' of every testsuite with at least one test result.
+    """
+
+    timestamp = timestamp or _utc_timestamp()
+    details = FailureDetails(failure_details) if failure_details else None
+    results = []
+
+    for _, testsuite_testcases in itertools.groupby(testcases, key=operator.itemgetter(0)):
+        pairs = ((props, tc_xml) for _, props, tc_xml in testsuite_testcases)
+        if aggregate:
+            groups = _group_test_logs(pairs, timestamp, details=details)
+            if details:
+                for test_log, _ in groups.values():
+                    details.dedupe(test_log)
+            results.append(groups)
+        elif details:
+            # Deduped as they are built so that repeated tracebacks are never held in memory.
+            results.append([details.dedupe(_generate_test_log(tc_xml, props, timestamp, details))
+                            for props, tc_xml in pairs])
+        else:
+            results.append([_generate_test_log(tc_xml, props, timestamp) for props, tc_xml in pairs])
+
+    return results
+
+
+def _dedupe_failure_details(results, aggregate=False, failure_details=None):
+    """Dedupe the tracebacks of test results that were built separately (e.g. one file or testsuite per worker
+    process) so that every distinct traceback is only recorded by the first test log in document order.
+
+    Args:
+        results (list(list(CompactTestLog) or OrderedDict)): The results of every testsuite as built by
+            '_build_testsuite_results', updated in place.
+        aggregate (bool): The results are groups of test results instead of test logs.
+        failure_details (int): The maximum number of characters of the recorded failure details. (None if no
+            failure details were recorded)
+    """
+
+    if not failure_details:
+        return
+
+    details = FailureDetails(failure_details)
+
+    for result in results:
+        for test_log in ((test_log for test_log, _ in result.values()) if aggregate else result):
+            details.dedupe(test_log)
+
+
+def _build_file(junit_xml_file_path, stream=False, aggregate=False, failure_details=None, timestamp=None):
+    """Load a JUnitXML file and construct the qTest swagger models for the test results of each of its testsuites.
+    (Module level so that it can be dispatched to a process pool)
 
     Args:
         junit_xml_file_path (str): A file path to a XML element representing a JUnit style testsuite response.
-        qtest_api_token (str): Token to use for authorization to the qTest API.
-        qtest_project_id (int): The target qTest project for the test results.
-        qtest_test_cycle (str): The parent qTest test cycle for test results.
+        stream (bool): Incrementally parse the JUnitXML file to keep memory usage flat for very large files.
+        aggregate (bool): Group the test results by normalized test name instead of building test logs.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        timestamp (str): The UTC execution time to record for the tests. (None for the current time)
 
     Returns:
-        int: The queue processing ID for the job.
+        list(list(CompactTestLog) or OrderedDict): The results of every testsuite as built by
+            '_build_testsuite_results'.
 
     Raises:
-        RuntimeError: Failed to upload test results to qTest Manager.
+        RuntimeError: invalid path.
+    """
+
+    if stream:
+        testcases = _iter_input_testcases(junit_xml_file_path)
+    else:
+        testcases = _iter_testcases(_load_input_file(junit_xml_file_path))
+
+    return _build_testsuite_results(testcases, aggregate, timestamp, failure_details)
+
+
+def _build_fragment(fragment, aggregate=False, failure_details=None, timestamp=None):
+    """Parse a single "testsuite" element of a larger JUnitXML file and construct the qTest swagger models for its
+    test results. (Module level so that it can be dispatched to a process pool)
+
+    Args:
+        fragment (TestsuiteFragment): The location of the testsuite.
+        aggregate (bool): Group the test results by normalized test name instead of building test logs.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        timestamp (str): The UTC execution time to record for the tests. (None for the current time)
+
+    Returns:
+        list(list(CompactTestLog) or OrderedDict): The results of the testsuite as built by
+            '_build_testsuite_results'.
+
+    Raises:
+        RuntimeError: The testsuite is not valid XML on its own.
     """
 
-    junit_xml = _load_input_file(junit_xml_file_path)
+    backend = get_backend()
+
+    try:
+        testsuite_xml = backend.parse_string(read_testsuite(*fragment[:4]))
+    except backend.parse_error:
+        raise RuntimeError('The file "{}" does not contain a valid "testsuite" at byte {}!'
+                           .format(fragment.file_path, fragment.start))
+
+    testsuite_props = _read_properties(testsuite_xml, fragment.shared_props)
+    testcases = ((0, testsuite_props, tc_xml) for tc_xml in testsuite_xml.findall('testcase'))
+
+    return _build_testsuite_results(testcases, aggregate, timestamp, failure_details)
+
+
+def _build_shard(shard, aggregate=False, failure_details=None, timestamp=None):
+    """Parse a shard of the "testcase" elements of a larger JUnitXML file and construct the qTest swagger models for
+    its test results. (Module level so that it can be dispatched to a process pool)
+
+    Args:
+        shard (TestcaseShard): The location of the testcases.
+        aggregate (bool): Group the test results by normalized test name instead of building test logs.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        timestamp (str): The UTC execution time to record for the tests. (None for the current time)
+
+    Returns:
+        list(list(CompactTestLog) or OrderedDict): The results of the testcases as built by
+            '_build_testsuite_results'.
+
+    Raises:
+        RuntimeError: The testcases are not valid XML on their own.
+    """
 
-    swagger_client.configuration.api_key['Authorization'] = qtest_api_token
-    auto_api = swagger_client.TestlogApi()
-    auto_req = _generate_auto_request(junit_xml, qtest_test_cycle)
+    backend = get_backend()
 
     try:
-        response = auto_api.submit_automation_test_logs_0(project_id=qtest_project_id,
-                                                          body=auto_req,
-                                                          type='automation')
-    except ApiException as e:
-        raise RuntimeError("The qTest API reported an error!\n"
-                           "Status code: {}\n"
-                           "Reason: {}\n"
-                           "Message: {}".format(e.status, e.reason, e.body))
-    if response.state == 'FAILED':
-        raise RuntimeError("The qTest API failed to process the job!\nJob ID: {}".format(response.id))
+        shard_xml = backend.parse_string(read_testcases(*shard[:5]))
+    except backend.parse_error:
+        raise RuntimeError('The file "{}" does not contain valid "testcase" elements at byte {}!'
+                           .format(shard.file_path, shard.start))
+
+    testcases = ((0, shard.testsuite_props, tc_xml) for tc_xml in shard_xml.findall('testcase'))
+
+    return _build_testsuite_results(testcases, aggregate, timestamp, failure_details)
+
+
+def _join_shards(units, results_per_unit, aggregate=False):
+    """Join the results of the shards of a testsuite back into a single result for the testsuite.
+
+    Args:
+        units (list(str or TestsuiteFragment or TestcaseShard)): The units the results were built from.
+        results_per_unit (list(list(list(CompactTestLog) or OrderedDict))): The results built for every unit.
+        aggregate (bool): The results are groups of test results instead of test logs.
+
+    Returns:
+        list(list(list(CompactTestLog) or OrderedDict)): The results of every unit with the shards of a testsuite
+            joined into the unit of its first shard.
+    """
+
+    joined = []
+
+    for unit, results in zip(units, results_per_unit):
+        if not isinstance(unit, TestcaseShard) or not unit.index:
+            joined.append(results)
+        elif aggregate:
+            joined[-1] = [_merge_test_log_groups([joined[-1][0], results[0]])]
+        else:
+            joined[-1] = [joined[-1][0] + results[0]]
+
+    return joined
+
+
+def _build_unit(unit, stream=False, aggregate=False, failure_details=None, timestamp=None):
+    """Construct the qTest swagger models for a whole JUnitXML file, a single testsuite or a shard of the testcases
+    of a larger file. (Module level so that it can be dispatched to a process pool)
+
+    Args:
+        unit (str or TestsuiteFragment or TestcaseShard): A file path to a JUnitXML file or the location of a
+            testsuite or testcases.
+        stream (bool): Incrementally parse whole JUnitXML files to keep memory usage flat for very large files.
+        aggregate (bool): Group the test results by normalized test name instead of building test logs.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        timestamp (str): The UTC execution time to record for the tests. (None for the current time)
+
+    Returns:
+        list(list(CompactTestLog) or OrderedDict): The results of every testsuite as built by
+            '_build_testsuite_results'.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    if isinstance(unit, TestsuiteFragment):
+        return _build_fragment(unit, aggregate, failure_details, timestamp)
+    if isinstance(unit, TestcaseShard):
+        return _build_shard(unit, aggregate, failure_details, timestamp)
+
+    return _build_file(unit, stream, aggregate, failure_details, timestamp)
+
+
+def _split_into_units(junit_xml_file_paths, shard_bytes=None):
+    """Split JUnitXML files with a "testsuites" root element into their testsuites and large files with a
+    "testsuite" root element into shards of testcases so that every unit can be processed independently. (Other files,
+    including compressed files and stdin which cannot be sliced by byte offset, are kept whole)
+
+    The properties of the root element are parsed once from the file with the units cut out and handed to every
+    unit.
+
+    Args:
+        junit_xml_file_paths (list(str)): File paths to JUnitXML files.
+        shard_bytes (int): The approximate size in bytes of every shard of testcases. (None for the default, 0 to never
+            shard)
+
+    Returns:
+        list(str or TestsuiteFragment or TestcaseShard): The file paths, testsuite and testcase locations in document
+            order.
+    """
+
+    units = []
+    backend = get_backend()
+
+    for file_path in junit_xml_file_paths:
+        if file_path == STDIN_PATH or is_compressed(file_path):
+            units.append(file_path)
+            continue
+
+        testsuites_layout = find_testsuites(file_path)
+        if testsuites_layout or shard_bytes == 0:
+            testcases_layout = None
+        else:
+            testcases_layout = find_testcases(file_path, DEFAULT_SHARD_BYTES if shard_bytes is None else shard_bytes)
+        layout = testsuites_layout or testcases_layout
+        if layout is None or len(layout.ranges) < 2:
+            units.append(file_path)
+            continue
+
+        try:
+            props = _read_properties(backend.parse_string(layout.prolog + layout.skeleton))
+        except backend.parse_error:
+            units.append(file_path)
+            continue
+
+        if testsuites_layout:
+            units.extend(TestsuiteFragment(file_path, layout.prolog, start, end, props) for start, end in layout.ranges)
+        else:
+            units.extend(TestcaseShard(file_path, layout.prolog, layout.root_tag, start, end, props, index)
+                         for index, (start, end) in enumerate(layout.ranges))
+
+    return units
+
+
+def _build_measured(junit_xml_file_path, stream, aggregate, metrics, failure_details=None, timestamp=None):
+    """Load a JUnitXML file and construct the qTest swagger models for all of its test results while measuring the
+    "parse" and "build" phases. (Streamed files are parsed while they are built, so both are measured as "build")
+
+    Args:
+        junit_xml_file_path (str): A file path to a XML element representing a JUnit style testsuite response.
+        stream (bool): Incrementally parse the JUnitXML file to keep memory usage flat for very large files.
+        aggregate (bool): Group the test results by normalized test name instead of building test logs.
+        metrics (UploadMetrics): The metrics to record the phases in.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        timestamp (str): The UTC execution time to record for the tests. (None for the current time)
+
+    Returns:
+        list(list(CompactTestLog) or OrderedDict): The results of every testsuite as built by
+            '_build_testsuite_results'.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    if stream:
+        with metrics.span('build') as span:
+            results = _build_file(junit_xml_file_path, stream, aggregate, failure_details, timestamp)
+            span.cases = sum(len(result) for result in results)
+            span.bytes = input_size(junit_xml_file_path)
+    else:
+        with metrics.span('parse') as span:
+            junit_xml = _load_input_file(junit_xml_file_path)
+            span.bytes = input_size(junit_xml_file_path)
+        with metrics.span('build') as span:
+            results = _build_testsuite_results(_iter_testcases(junit_xml), aggregate, timestamp, failure_details)
+            span.cases = sum(len(result) for result in results)
+
+    return results
+
+
+def _build_testsuites(junit_xml_file_paths,
+                      stream=False,
+                      processes=None,
+                      aggregate=False,
+                      metrics=None,
+                      failure_details=None,
+                      shard_bytes=None,
+                      timestamp=None):
+    """Load one or more JUnitXML files and construct the qTest swagger models for the test results of every
+    testsuite.
+
+    Multiple files are parsed in parallel on a process pool. Unless streaming, the testsuites of a file with a
+    "testsuites" root element and shards of the testcases of a large file with a "testsuite" root element are also
+    parsed in parallel. (The file is scanned for the byte range of every testsuite or shard first and a file that
+    cannot be split that way is parsed whole instead) Results read from stdin are parsed in this process along with
+    every other file since worker processes cannot read it. The results retain the order of the input files and of the
+    testsuites and testcases within them, exactly as if the files were parsed one by one.
+
+    Args:
+        junit_xml_file_paths (str or list(str)): One or more file paths to JUnitXML files.
+        stream (bool): Incrementally parse the JUnitXML files to keep memory usage flat for very large files.
+        processes (int): The number of worker processes to parse with. (None for the number of CPUs)
+        aggregate (bool): Group the test results by normalized test name instead of building test logs.
+        metrics (UploadMetrics): Record the "parse" and "build" phases. (Files parsed on the process pool are measured
+            as a single "build" phase)
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses, identical tracebacks are recorded once across all
+            files)
+        shard_bytes (int): The approximate size in bytes of every shard of testcases. (None for the default, 0 to never
+            shard)
+        timestamp (str): The UTC execution time to record for every test, whichever file, testsuite or shard it was
+            built from. (None for the current time)
+
+    Returns:
+        list(list(CompactTestLog) or OrderedDict): The results of every testsuite as built by
+            '_build_testsuite_results'.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    if not isinstance(junit_xml_file_paths, (list, tuple)):
+        junit_xml_file_paths = [junit_xml_file_paths]
+
+    timestamp = timestamp or _utc_timestamp()
+    measured = metrics is not None
+    metrics = metrics if measured else UploadMetrics()
+    serial = processes == 1 or STDIN_PATH in junit_xml_file_paths     # Worker processes cannot read stdin.
+    if stream or serial:
+        units = junit_xml_file_paths
+    else:
+        units = _split_into_units(junit_xml_file_paths, shard_bytes)
+
+    if (len(units) == 1 or serial) and measured:
+        results_per_file = [_build_measured(path, stream, aggregate, metrics, failure_details, timestamp)
+                            for path in junit_xml_file_paths]
+    elif len(units) == 1 or serial:
+        results_per_file = [_build_file(path, stream, aggregate, failure_details, timestamp)
+                            for path in junit_xml_file_paths]
+    else:
+        with metrics.span('build') as span:
+            try:
+                with futures.ProcessPoolExecutor(max_workers=processes) as executor:
+                    results_per_file = _join_shards(units,
+                                                    list(executor.map(_build_unit,
+                                                                      units,
+                                                                      [stream] * len(units),
+                                                                      [aggregate] * len(units),
+                                                                      [failure_details] * len(units),
+                                                                      [timestamp] * len(units))),
+                                                    aggregate)
+            except RuntimeError:
+                if len(units) == len(junit_xml_file_paths):
+                    raise
+                # A testsuite or shard could not be parsed on its own. (e.g. It relies on a namespace declared by the
+                # root element) Parse the files whole to either succeed or report the actual error.
+                results_per_file = [_build_file(path, stream, aggregate, failure_details, timestamp)
+                                    for path in junit_xml_file_paths]
+            span.cases = sum(len(result) for results in results_per_file for result in results)
+            span.bytes = sum(input_size(path) for path in junit_xml_file_paths)
+
+    results = [result for results in results_per_file for result in results]
+    if len(units) > 1:
+        _dedupe_failure_details(results, aggregate, failure_details)
+
+    return results
+
+
+def _build_auto_request(junit_xml_file_paths,
+                        test_cycle,
+                        stream=False,
+                        processes=None,
+                        aggregate=False,
+                        metrics=None,
+                        failure_details=None,
+                        shard_bytes=None):
+    """Load one or more JUnitXML files and construct a single qTest swagger model for the combined test run result.
+
+    The files and testsuites are parsed in parallel. (See '_build_testsuites') The test logs of the combined result
+    retain the order of the input files and of the testsuites within them.
+
+    Args:
+        junit_xml_file_paths (str or list(str)): One or more file paths to JUnitXML files.
+        test_cycle (str): The parent qTest test cycle for test results.
+        stream (bool): Incrementally parse the JUnitXML files to keep memory usage flat for very large files.
+        processes (int): The number of worker processes to parse with. (None for the number of CPUs)
+        aggregate (bool): Collapse the results of a parametrized test into a single test log. (Across all files)
+        metrics (UploadMetrics): Record the "parse" and "build" phases. (Files parsed on the process pool are measured
+            as a single "build" phase)
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        shard_bytes (int): The approximate size in bytes of every shard of testcases. (None for the default, 0 to never
+            shard)
+
+    Returns:
+        AutomationRequest: A qTest swagger model for an automation request.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    timestamp = _utc_timestamp()
+    results = _build_testsuites(junit_xml_file_paths,
+                                stream,
+                                processes,
+                                aggregate,
+                                metrics,
+                                failure_details,
+                                shard_bytes,
+                                timestamp)
+
+    auto_req = swagger_client.AutomationRequest()
+    auto_req.test_cycle = test_cycle
+    if aggregate:
+        auto_req.test_logs = _aggregate_test_logs(_merge_test_log_groups(results))
+    else:
+        auto_req.test_logs = [test_log for test_logs in results for test_log in test_logs]
+    auto_req.execution_date = timestamp
+
+    return auto_req
+
+
+def _build_testsuite_auto_requests(junit_xml_file_paths,
+                                   test_cycle,
+                                   stream=False,
+                                   processes=None,
+                                   aggregate=False,
+                                   metrics=None,
+                                   failure_details=None,
+                                   shard_bytes=None):
+    """Load one or more JUnitXML files and construct a separate qTest swagger model for the test run result of every
+    testsuite. (See '_build_auto_request')
+
+    Args:
+        junit_xml_file_paths (str or list(str)): One or more file paths to JUnitXML files.
+        test_cycle (str): The parent qTest test cycle for test results.
+        stream (bool): Incrementally parse the JUnitXML files to keep memory usage flat for very large files.
+        processes (int): The number of worker processes to parse with. (None for the number of CPUs)
+        aggregate (bool): Collapse the results of a parametrized test into a single test log. (Within each testsuite)
+        metrics (UploadMetrics): Record the "parse" and "build" phases.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        shard_bytes (int): The approximate size in bytes of every shard of testcases. (None for the default, 0 to never
+            shard)
+
+    Returns:
+        list(AutomationRequest): A qTest swagger model for an automation request per testsuite.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    timestamp = _utc_timestamp()
+    results = _build_testsuites(junit_xml_file_paths,
+                                stream,
+                                processes,
+                                aggregate,
+                                metrics,
+                                failure_details,
+                                shard_bytes,
+                                timestamp)
+    auto_reqs = []
+
+    for result in results:
+        auto_req = swagger_client.AutomationRequest()
+        auto_req.test_cycle = test_cycle
+        auto_req.test_logs = _aggregate_test_logs(result) if aggregate else result
+        auto_req.execution_date = timestamp
+        auto_reqs.append(auto_req)
+
+    return auto_reqs
+
+
+def _split_test_logs(test_logs, max_logs=None, max_bytes=None, overhead=0, api_client=None):
+    """Split a list of test logs into batches capped by the number of test logs and by serialized JSON size.
+
+    A single test log that is larger than "max_bytes" on its own is placed into a batch by itself.
+
+    Args:
+        test_logs (list(CompactTestLog)): The test logs to split.
+        max_logs (int): The maximum number of test logs per batch. (None for no limit)
+        max_bytes (int): The maximum serialized size of a batch in bytes. (None for no limit)
+        overhead (int): The serialized size in bytes of the request envelope that wraps every batch.
+        api_client (ApiClient): The swagger API client used to serialize test logs. (None for a default client)
+
+    Returns:
+        list(tuple(list(CompactTestLog), int)): The batches of test logs along with their serialized size.
+    """
+
+    api_client = api_client or swagger_client.ApiClient()
+    batches = []
+    batch = []
+    batch_bytes = overhead
+
+    for test_log in test_logs:
+        log_bytes = len(json.dumps(api_client.sanitize_for_serialization(test_log)).encode('utf-8'))
+        separator_bytes = len(', ') if batch else 0
+
+        if batch and ((max_logs and len(batch) >= max_logs) or
+                      (max_bytes and batch_bytes + separator_bytes + log_bytes > max_bytes)):
+            batches.append((batch, batch_bytes))
+            batch = []
+            batch_bytes = overhead
+            separator_bytes = 0
+
+        batch.append(test_log)
+        batch_bytes += separator_bytes + log_bytes
+
+    if batch:
+        batches.append((batch, batch_bytes))
+
+    return batches
+
+
+def _api_error(api_exception):
+    """Describe an error reported by the qTest API.
+
+    Args:
+        api_exception (ApiException): The exception raised by the swagger client.
+
+    Returns:
+        RuntimeError: The exception to raise in its place.
+    """
+
+    return RuntimeError("The qTest API reported an error!\n"
+                        "Status code: {}\n"
+                        "Reason: {}\n"
+                        "Message: {}".format(api_exception.status, api_exception.reason, api_exception.body))
+
+
+def _transport_error(exception):
+    """Describe a failure to reach the qTest API. (e.g. A refused or dropped connection)
+
+    Args:
+        exception (Exception): The urllib3 or socket exception raised while sending the request.
+
+    Returns:
+        RuntimeError: The exception to raise in its place.
+    """
+
+    return RuntimeError("The qTest API could not be reached!\n"
+                        "Reason: {}".format(exception))
+
+
+def _fetch_test_cycles(api_client, qtest_project_id, controller=None):
+    """Look up a qTest project and the identifiers of all of its test cycles.
+
+    Args:
+        api_client (ApiClient): The qTest swagger API client to send the requests with.
+        qtest_project_id (int): The qTest project.
+        controller (SubmissionController): The controller used to retry transient failures. (None for a default
+            controller)
+
+    Returns:
+        set(str): The PID and numeric ID of every test cycle of the project.
+
+    Raises:
+        RuntimeError: The project does not exist, cannot be accessed or the qTest API reported an error.
+    """
+
+    controller = controller or SubmissionController()
+
+    try:
+        controller.submit(swagger_client.ProjectApi(api_client).get_project, qtest_project_id)
+        test_cycles = controller.submit(swagger_client.TestcycleApi(api_client).get_test_cycles,
+                                        qtest_project_id,
+                                        expand='descendants')
+    except swagger_client.rest.ApiException as e:
+        if e.status in (403, 404):
+            raise RuntimeError('The qTest project "{}" does not exist or cannot be accessed with this API token!'
+                               .format(qtest_project_id))
+        raise _api_error(e)
+
+    return collect_test_cycle_ids(test_cycles)
+
+
+def _make_batch_request(auto_req, test_logs):
+    """Construct an 'AutomationRequest' qTest resource for a batch of the test logs of a larger request.
+
+    Args:
+        auto_req (AutomationRequest): The qTest swagger model the batch is taken from.
+        test_logs (list(CompactTestLog)): The test logs of the batch.
+
+    Returns:
+        AutomationRequest: A qTest swagger model for the batch.
+    """
+
+    batch_req = swagger_client.AutomationRequest()
+    batch_req.test_cycle = auto_req.test_cycle
+    batch_req.test_logs = test_logs
+    batch_req.execution_date = auto_req.execution_date
+
+    return batch_req
+
+
+def _select_delta(auto_reqs, qtest_project_id, qtest_test_cycle, snapshot, force_full=False, on_delta=None):
+    """Drop the test logs whose status has not changed since they were last submitted to the test cycle.
+
+    Args:
+        auto_reqs (list(AutomationRequest)): The qTest swagger models for the automation requests, updated in place.
+            (Compared together since test logs of the same automation content may span requests)
+        qtest_project_id (int): The target qTest project for the test results.
+        qtest_test_cycle (str): The parent qTest test cycle for test results.
+        snapshot (StatusSnapshot): The last submitted status of every test.
+        force_full (bool): Keep every test log regardless of the snapshot.
+        on_delta (callable): Called with the 'DeltaReport' of the number of test logs sent and skipped.
+
+    Returns:
+        list(CompactTestLog): The test logs that are kept across every request.
+    """
+
+    test_logs = [t for auto_req in auto_reqs for t in auto_req.test_logs]
+    selected = test_logs if force_full else snapshot.changed(qtest_project_id, qtest_test_cycle, test_logs)
+
+    if len(selected) != len(test_logs):
+        kept = set(id(t) for t in selected)
+        for auto_req in auto_reqs:
+            auto_req.test_logs = [t for t in auto_req.test_logs if id(t) in kept]
+
+    if on_delta:
+        on_delta(DeltaReport(len(selected), len(test_logs) - len(selected)))
+
+    return selected
+
+
+def _fully_submitted(test_logs, submitted):
+    """Select the test logs of every automation content whose test logs were all submitted successfully.
+
+    Args:
+        test_logs (list(CompactTestLog)): The test logs that were meant to be submitted.
+        submitted (list(CompactTestLog)): The test logs of the batches that were submitted successfully.
+
+    Returns:
+        list(CompactTestLog): The test logs whose statuses can be recorded in a snapshot.
+    """
+
+    submitted = set(id(t) for t in submitted)
+    incomplete = set(t.automation_content for t in test_logs if id(t) not in submitted)
+
+    return [t for t in test_logs if t.automation_content not in incomplete]
+
+
+def _submit_auto_request(auto_api,
+                         qtest_project_id,
+                         auto_req,
+                         controller=None,
+                         chunked=False,
+                         compression=None,
+                         compress_level=DEFAULT_COMPRESS_LEVEL,
+                         on_compression=None,
+                         metrics=None):
+    """Submit an 'AutomationRequest' qTest resource to the desired project in qTest Manager.
+
+    Args:
+        auto_api (TestlogApi): The qTest swagger API to use for submission.
+        qtest_project_id (int): The target qTest project for the test results.
+        auto_req (AutomationRequest): A qTest swagger model for an automation request.
+        controller (SubmissionController): The controller used to limit and retry the submission. (None for a
+            default controller that retries transient failures)
+        chunked (bool): Serialize the request body while it is being sent instead of building it in memory first.
+        compression (str): The HTTP content encoding used to compress the request body. ('gzip', 'deflate' or None
+            for an uncompressed body)
+        compress_level (int): The zlib compression level from 1 (fastest) to 9 (smallest).
+        on_compression (callable): Called with the 'CompressionReport' of every compressed submission.
+        metrics (UploadMetrics): Record the "serialize" and "submit" phases. (An uncompressed, unchunked body is
+            serialized ahead of sending so that the phases can be measured apart, otherwise serialization is part of
+            "submit")
+
+    Returns:
+        QueueProcessingResponse: The qTest swagger model for the queued job.
+
+    Raises:
+        RuntimeError: Failed to upload test results to qTest Manager.
+    """
+
+    controller = controller or SubmissionController()
+    measured = metrics is not None
+    metrics = metrics if measured else UploadMetrics()
+    test_log_count = len(auto_req.test_logs)
+
+    try:
+        if compression:
+            with metrics.span('submit', test_log_count) as span:
+                response, report = controller.submit(submit_compressed,
+                                                     auto_api.api_client,
+                                                     qtest_project_id,
+                                                     auto_req,
+                                                     compression,
+                                                     compress_level,
+                                                     chunked)
+                span.bytes = report.sent_bytes
+            if on_compression:
+                on_compression(report)
+        elif chunked:
+            with metrics.span('submit', test_log_count):
+                response = controller.submit(submit_chunked, auto_api.api_client, qtest_project_id, auto_req)
+        elif measured:
+            with metrics.span('serialize', test_log_count) as span:
+                body = serialize_auto_request(auto_api.api_client, auto_req)
+                span.bytes = len(body)
+            with metrics.span('submit', test_log_count, len(body)):
+                response = controller.submit(submit_serialized, auto_api.api_client, qtest_project_id, body)
+        else:
+            response = controller.submit(auto_api.submit_automation_test_logs_0,
+                                         project_id=qtest_project_id,
+                                         body=auto_req,
+                                         type='automation')
+    except swagger_client.rest.ApiException as e:
+        raise _api_error(e)
+    if response.state == 'FAILED':
+        raise RuntimeError("The qTest API failed to process the job!\nJob ID: {}".format(response.id))
+
+    return response
+
+
+def _batch_controller(workers, max_workers=None, max_retries=DEFAULT_MAX_RETRIES, latency_target=None):
+    """Create the controller adapting the number of batches in flight for a batched upload.
+
+    Args:
+        workers (int): The number of batches uploaded concurrently at the start.
+        max_workers (int): The number of batches in flight may grow up to this many. (None for "workers")
+        max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+        latency_target (float): Batch submissions slower than this many seconds lower the number of batches in
+            flight. (None to only react to errors)
+
+    Returns:
+        SubmissionController: The controller. (Its "max_limit" is the number of threads to submit with)
+    """
+
+    return SubmissionController(initial_limit=workers,
+                                max_limit=max(workers, max_workers or workers),
+                                latency_target=latency_target,
+                                max_retries=max_retries)
+
+
+def _submit_in_batches(auto_api,
+                       qtest_project_id,
+                       auto_reqs,
+                       max_logs,
+                       max_bytes,
+                       workers,
+                       controller,
+                       chunked=False,
+                       compression=None,
+                       compress_level=DEFAULT_COMPRESS_LEVEL,
+                       on_compression=None,
+                       on_submitted=None,
+                       metrics=None):
+    """Split 'AutomationRequest' qTest resources into batches and concurrently submit them to qTest Manager.
+
+    Args:
+        auto_api (TestlogApi): The qTest swagger API to use for submission.
+        qtest_project_id (int): The target qTest project for the test results.
+        auto_reqs (list(AutomationRequest)): The qTest swagger models for automation requests. (A batch never
+            combines test logs from different requests)
+        max_logs (int): The maximum number of test logs per batch. (None for no limit)
+        max_bytes (int): The maximum serialized size of a batch in bytes. (None for no limit)
+        workers (int): The maximum number of batches to upload concurrently.
+        controller (SubmissionController): The controller used to adapt the number of batches in flight and retry
+            transient failures.
+        chunked (bool): Serialize each batch while it is being sent instead of building it in memory first.
+        compression (str): The HTTP content encoding used to compress each batch. ('gzip', 'deflate' or None for
+            uncompressed batches)
+        compress_level (int): The zlib compression level from 1 (fastest) to 9 (smallest).
+        on_compression (callable): Called with the 'CompressionReport' of every compressed batch.
+        on_submitted (callable): Called with the test logs of every batch that was submitted successfully.
+        metrics (UploadMetrics): Record the "serialize" phase of sizing the batches and the "submit" phase of sending
+            all of them.
+
+    Returns:
+        list(BatchReport): A report for each batch in submission order.
+    """
+
+    metrics = metrics if metrics is not None else UploadMetrics()
+    test_log_count = sum(len(auto_req.test_logs) for auto_req in auto_reqs)
+    batches = []
+
+    with metrics.span('serialize', test_log_count) as span:
+        for auto_req in auto_reqs:
+            envelope = _make_batch_request(auto_req, [])
+            overhead = len(json.dumps(auto_api.api_client.sanitize_for_serialization(envelope)).encode('utf-8'))
+
+            batches.extend((auto_req, test_logs, byte_size) for test_logs, byte_size
+                           in _split_test_logs(auto_req.test_logs, max_logs, max_bytes, overhead, auto_api.api_client))
+        span.bytes = sum(byte_size for _, _, byte_size in batches)
+
+    def submit(index):
+        auto_req, test_logs, byte_size = batches[index]
+        batch_req = _make_batch_request(auto_req, test_logs)
+
+        start = time.time()
+        try:
+            response = _submit_auto_request(auto_api,
+                                            qtest_project_id,
+                                            batch_req,
+                                            controller,
+                                            chunked,
+                                            compression,
+                                            compress_level,
+                                            on_compression)
+            job_id, state, error = int(response.id), response.state, None
+        except RuntimeError as e:
+            job_id, state, error = None, None, str(e)
+        except (urllib3.exceptions.HTTPError, OSError) as e:
+            job_id, state, error = None, None, str(_transport_error(e))
+        else:
+            if on_submitted:
+                on_submitted(test_logs)
+
+        return BatchReport(index, len(test_logs), byte_size, job_id, state, time.time() - start, error)
+
+    with metrics.span('submit', test_log_count) as span:
+        with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            reports = list(executor.map(submit, range(len(batches))))
+        span.bytes = sum(r.byte_size for r in reports if not r.error)
+
+    return reports
+
+
+def _submit_spool(api_client, spool, workers, controller):
+    """Concurrently submit every unacknowledged batch of a spool, checkpointing each batch as soon as qTest Manager
+    accepts it.
+
+    Args:
+        api_client (ApiClient): The swagger API client used for submission.
+        spool (UploadSpool): The sealed spool of serialized batches.
+        workers (int): The maximum number of batches to upload concurrently.
+        controller (SubmissionController): The controller used to adapt the number of batches in flight and retry
+            transient failures.
+
+    Returns:
+        list(BatchReport): A report for each batch that was pending in index order.
+    """
+
+    def submit(index):
+        start = time.time()
+        try:
+            try:
+                response = controller.submit(submit_serialized,
+                                             api_client,
+                                             spool.qtest_project_id,
+                                             spool.read_batch(index))
+            except swagger_client.rest.ApiException as e:
+                raise _api_error(e)
+            if response.state == 'FAILED':
+                raise RuntimeError("The qTest API failed to process the job!\nJob ID: {}".format(response.id))
+            spool.acknowledge(index, int(response.id))
+            job_id, state, error = int(response.id), response.state, None
+        except RuntimeError as e:
+            job_id, state, error = None, None, str(e)
+        except (urllib3.exceptions.HTTPError, OSError) as e:
+            job_id, state, error = None, None, str(_transport_error(e))
+
+        return BatchReport(index,
+                           spool.batches[index]['test_log_count'],
+                           spool.batches[index]['byte_size'],
+                           job_id,
+                           state,
+                           time.time() - start,
+                           error)
+
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(submit, spool.pending))
+
+
+def upload_test_results(junit_xml_file_path,
+                        qtest_api_token,
+                        qtest_project_id,
+                        qtest_test_cycle,
+                        stream=False,
+                        processes=None,
+                        max_retries=DEFAULT_MAX_RETRIES,
+                        chunked=False,
+                        compression=None,
+                        compress_level=DEFAULT_COMPRESS_LEVEL,
+                        on_compression=None,
+                        aggregate=False,
+                        snapshot=None,
+                        force_full=False,
+                        on_delta=None,
+                        metrics=None,
+                        failure_details=None,
+                        shard_bytes=None):
+    """Construct a 'AutomationRequest' qTest resource and upload the test results to the desired project in
+    qTest Manager. (Uses a single-use 'QTestUploader', create one directly to reuse connections across uploads)
+
+    Args:
+        junit_xml_file_path (str or list(str)): One or more file paths to JUnitXML files. (Results from multiple
+            files are combined into a single upload)
+        qtest_api_token (str): Token to use for authorization to the qTest API.
+        qtest_project_id (int): The target qTest project for the test results.
+        qtest_test_cycle (str): The parent qTest test cycle for test results.
+        stream (bool): Incrementally parse the JUnitXML file to keep memory usage flat for very large files.
+        processes (int): The number of worker processes used to parse multiple files or testsuites. (None for the
+            number of CPUs)
+        max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+        chunked (bool): Serialize the request body while it is being sent instead of building it in memory first.
+        compression (str): The HTTP content encoding used to compress the request body. ('gzip', 'deflate' or None
+            for an uncompressed body)
+        compress_level (int): The zlib compression level from 1 (fastest) to 9 (smallest).
+        on_compression (callable): Called with the 'CompressionReport' of the upload when it is compressed.
+        aggregate (bool): Collapse the results of a parametrized test into a single test log.
+        snapshot (StatusSnapshot): Only send test logs that are new or changed since the last upload to the test cycle
+            and record the submitted statuses. (None to always send every test log)
+        force_full (bool): Send every test log even when a snapshot is given. (The snapshot is still updated)
+        on_delta (callable): Called with the 'DeltaReport' of the number of test logs sent and skipped.
+        metrics (UploadMetrics): Record the duration, size and peak memory of every phase of the upload.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        shard_bytes (int): Split JUnitXML files larger than twice this many bytes into shards of testcases that are
+            parsed in parallel. (None for the default, 0 to never shard)
+
+    Returns:
+        int: The queue processing ID for the job. (None if a delta upload found nothing to send)
+
+    Raises:
+        RuntimeError: Failed to upload test results to qTest Manager.
+    """
+
+    with QTestUploader(qtest_api_token) as uploader:
+        return uploader.upload_test_results(junit_xml_file_path,
+                                            qtest_project_id,
+                                            qtest_test_cycle,
+                                            stream=stream,
+                                            processes=processes,
+                                            max_retries=max_retries,
+                                            chunked=chunked,
+                                            compression=compression,
+                                            compress_level=compress_level,
+                                            on_compression=on_compression,
+                                            aggregate=aggregate,
+                                            snapshot=snapshot,
+                                            force_full=force_full,
+                                            on_delta=on_delta,
+                                            metrics=metrics,
+                                            failure_details=failure_details,
+                                            shard_bytes=shard_bytes)
+
+
+def upload_test_results_in_batches(junit_xml_file_path,
+                                   qtest_api_token,
+                                   qtest_project_id,
+                                   qtest_test_cycle,
+                                   max_logs=DEFAULT_BATCH_MAX_LOGS,
+                                   max_bytes=DEFAULT_BATCH_MAX_BYTES,
+                                   workers=DEFAULT_BATCH_WORKERS,
+                                   max_workers=None,
+                                   stream=False,
+                                   processes=None,
+                                   max_retries=DEFAULT_MAX_RETRIES,
+                                   latency_target=None,
+                                   chunked=False,
+                                   compression=None,
+                                   compress_level=DEFAULT_COMPRESS_LEVEL,
+                                   on_compression=None,
+                                   aggregate=False,
+                                   snapshot=None,
+                                   force_full=False,
+                                   on_delta=None,
+                                   metrics=None,
+                                   per_suite=False,
+                                   failure_details=None,
+                                   shard_bytes=None):
+    """Construct a 'AutomationRequest' qTest resource, split its test logs into batches capped by test log count
+    and serialized size then concurrently upload each batch to the desired project in qTest Manager. (Uses a
+    single-use 'QTestUploader', create one directly to reuse connections across uploads)
+
+    Args:
+        junit_xml_file_path (str or list(str)): One or more file paths to JUnitXML files. (Results from multiple
+            files are combined into a single upload)
+        qtest_api_token (str): Token to use for authorization to the qTest API.
+        qtest_project_id (int): The target qTest project for the test results.
+        qtest_test_cycle (str): The parent qTest test cycle for test results.
+        max_logs (int): The maximum number of test logs per batch. (None for no limit)
+        max_bytes (int): The maximum serialized size of a batch in bytes. (None for no limit)
+        workers (int): The number of batches uploaded concurrently at the start.
+        max_workers (int): The number of batches in flight may grow up to this many while qTest Manager keeps up.
+            (None for "workers", which makes it a hard ceiling)
+        stream (bool): Incrementally parse the JUnitXML file to keep memory usage flat for very large files.
+        processes (int): The number of worker processes used to parse multiple files or testsuites. (None for the
+            number of CPUs)
+        max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+        latency_target (float): Batch submissions slower than this many seconds lower the number of batches in
+            flight. (None to only react to errors)
+        chunked (bool): Serialize each batch while it is being sent instead of building it in memory first.
+        compression (str): The HTTP content encoding used to compress each batch. ('gzip', 'deflate' or None for
+            uncompressed batches)
+        compress_level (int): The zlib compression level from 1 (fastest) to 9 (smallest).
+        on_compression (callable): Called with the 'CompressionReport' of every compressed batch.
+        aggregate (bool): Collapse the results of a parametrized test into a single test log.
+        snapshot (StatusSnapshot): Only send test logs that are new or changed since the last upload to the test cycle
+            and record the submitted statuses. (None to always send every test log)
+        force_full (bool): Send every test log even when a snapshot is given. (The snapshot is still updated)
+        on_delta (callable): Called with the 'DeltaReport' of the number of test logs sent and skipped.
+        metrics (UploadMetrics): Record the duration, size and peak memory of every phase of the upload.
+        per_suite (bool): Submit the test logs of every testsuite in batches of their own instead of combining them.
+            (Parametrized tests are only aggregated within a testsuite)
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        shard_bytes (int): Split JUnitXML files larger than twice this many bytes into shards of testcases that are
+            parsed in parallel. (None for the default, 0 to never shard)
+
+    Returns:
+        list(BatchReport): A report for each batch in submission order.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    with QTestUploader(qtest_api_token, pool_size=max(DEFAULT_POOL_SIZE, workers, max_workers or 0)) as uploader:
+        return uploader.upload_test_results_in_batches(junit_xml_file_path,
+                                                       qtest_project_id,
+                                                       qtest_test_cycle,
+                                                       max_logs=max_logs,
+                                                       max_bytes=max_bytes,
+                                                       workers=workers,
+                                                       max_workers=max_workers,
+                                                       stream=stream,
+                                                       processes=processes,
+                                                       max_retries=max_retries,
+                                                       latency_target=latency_target,
+                                                       chunked=chunked,
+                                                       compression=compression,
+                                                       compress_level=compress_level,
+                                                       on_compression=on_compression,
+                                                       aggregate=aggregate,
+                                                       snapshot=snapshot,
+                                                       force_full=force_full,
+                                                       on_delta=on_delta,
+                                                       metrics=metrics,
+                                                       per_suite=per_suite,
+                                                       failure_details=failure_details,
+                                                       shard_bytes=shard_bytes)
+
+
+def upload_test_results_spooled(junit_xml_file_path,
+                                qtest_api_token,
+                                qtest_project_id,
+                                qtest_test_cycle,
+                                spool_dir,
+                                max_logs=DEFAULT_BATCH_MAX_LOGS,
+                                max_bytes=DEFAULT_BATCH_MAX_BYTES,
+                                workers=DEFAULT_BATCH_WORKERS,
+                                max_workers=None,
+                                stream=False,
+                                processes=None,
+                                max_retries=DEFAULT_MAX_RETRIES,
+                                aggregate=False,
+                                failure_details=None,
+                                shard_bytes=None):
+    """Construct a 'AutomationRequest' qTest resource, seal its batches into a spool on disk then upload every batch
+    to the desired project in qTest Manager. (Uses a single-use 'QTestUploader', create one directly to reuse
+    connections across uploads)
+
+    Args:
+        junit_xml_file_path (str or list(str)): One or more file paths to JUnitXML files. (Results from multiple
+            files are combined into a single upload)
+        qtest_api_token (str): Token to use for authorization to the qTest API.
+        qtest_project_id (int): The target qTest project for the test results.
+        qtest_test_cycle (str): The parent qTest test cycle for test results.
+        spool_dir (str): The directory to write the spool to. (Created if missing)
+        max_logs (int): The maximum number of test logs per batch. (None for no limit)
+        max_bytes (int): The maximum serialized size of a batch in bytes. (None for no limit)
+        workers (int): The number of batches uploaded concurrently at the start.
+        max_workers (int): The number of batches in flight may grow up to this many while qTest Manager keeps up.
+            (None for "workers", which makes it a hard ceiling)
+        stream (bool): Incrementally parse the JUnitXML file to keep memory usage flat for very large files.
+        processes (int): The number of worker processes used to parse multiple files or testsuites. (None for the
+            number of CPUs)
+        max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+        aggregate (bool): Collapse the results of a parametrized test into a single test log.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        shard_bytes (int): Split JUnitXML files larger than twice this many bytes into shards of testcases that are
+            parsed in parallel. (None for the default, 0 to never shard)
+
+    Returns:
+        tuple(UploadSpool, list(BatchReport)): The spool and a report for each batch in submission order. (The spool
+            is removed from disk once every batch has been acknowledged)
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    with QTestUploader(qtest_api_token, pool_size=max(DEFAULT_POOL_SIZE, workers, max_workers or 0)) as uploader:
+        return uploader.upload_test_results_spooled(junit_xml_file_path,
+                                                    qtest_project_id,
+                                                    qtest_test_cycle,
+                                                    spool_dir,
+                                                    max_logs=max_logs,
+                                                    max_bytes=max_bytes,
+                                                    workers=workers,
+                                                    max_workers=max_workers,
+                                                    stream=stream,
+                                                    processes=processes,
+                                                    max_retries=max_retries,
+                                                    aggregate=aggregate,
+                                                    failure_details=failure_details,
+                                                    shard_bytes=shard_bytes)
+
+
+def resume_spooled_upload(spool,
+                          qtest_api_token,
+                          workers=DEFAULT_BATCH_WORKERS,
+                          max_retries=DEFAULT_MAX_RETRIES,
+                          max_workers=None):
+    """Upload the batches of a spool that qTest Manager has not acknowledged yet. (Uses a single-use
+    'QTestUploader', create one directly to reuse connections across uploads)
+
+    Args:
+        spool (UploadSpool or str): The spool or the directory of the spool.
+        qtest_api_token (str): Token to use for authorization to the qTest API.
+        workers (int): The number of batches uploaded concurrently at the start.
+        max_workers (int): The number of batches in flight may grow up to this many while qTest Manager keeps up.
+            (None for "workers", which makes it a hard ceiling)
+        max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+
+    Returns:
+        list(BatchReport): A report for each batch that was pending in index order.
+
+    Raises:
+        RuntimeError: The spool is incomplete or corrupt.
+    """
+
+    with QTestUploader(qtest_api_token, pool_size=max(DEFAULT_POOL_SIZE, workers, max_workers or 0)) as uploader:
+        return uploader.resume_spooled_upload(spool, workers=workers, max_retries=max_retries, max_workers=max_workers)
+
+
+def _iter_streamed_test_logs(junit_xml_file_paths, timestamp, counts, failure_details=None):
+    """Construct the test logs of JUnitXML files while the files are incrementally parsed.
+
+    Args:
+        junit_xml_file_paths (list(str)): File paths to JUnitXML files.
+        timestamp (str): The UTC execution time to record for the tests.
+        counts (list(int)): The number of test logs constructed, updated in place as the test logs are consumed.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+
+    Returns:
+        generator: Yields a 'CompactTestLog' for every test result.
+
+    Raises:
+        RuntimeError: invalid path.
+    """
+
+    details = FailureDetails(failure_details) if failure_details else None
+
+    for junit_xml_file_path in junit_xml_file_paths:
+        for _, testsuite_props, tc_xml in _iter_input_testcases(junit_xml_file_path):
+            counts[0] += 1
+            test_log = _generate_test_log(tc_xml, testsuite_props, timestamp, details)
+            yield details.dedupe(test_log) if details else test_log
+
+
+def convert_test_results(junit_xml_file_path,
+                         output,
+                         qtest_test_cycle,
+                         output_format='json',
+                         stream=False,
+                         processes=None,
+                         aggregate=False,
+                         failure_details=None,
+                         shard_bytes=None):
+    """Convert JUnitXML results into qTest JSON without contacting qTest Manager. The output is either the exact body
+    'upload_test_results' would send or one line of JSON per test log.
+
+    The JSON is written in chunks as it is serialized. When streaming without aggregation every test log is also
+    written as soon as its testcase has been parsed, so memory usage stays flat regardless of the number of results.
+
+    Args:
+        junit_xml_file_path (str or list(str)): One or more file paths to JUnitXML files. (Results from multiple
+            files are combined)
+        output (file): A binary file object to write the JSON to.
+        qtest_test_cycle (str): The parent qTest test cycle for test results.
+        output_format (str): "json" for the 'AutomationRequest' qTest resource or "ndjson" for newline delimited
+            test logs.
+        stream (bool): Incrementally parse the JUnitXML files to keep memory usage flat for very large files.
+        processes (int): The number of worker processes used to parse multiple files or testsuites. (None for the
+            number of CPUs, ignored when streaming without aggregation)
+        aggregate (bool): Collapse the results of a parametrized test into a single test log.
+        failure_details (int): Record failure messages and tracebacks of at most this many characters in the notes
+            of the test logs. (None to only record statuses)
+        shard_bytes (int): Split JUnitXML files larger than twice this many bytes into shards of testcases that are
+            parsed in parallel. (None for the default, 0 to never shard)
+
+    Returns:
+        int: The number of test logs written.
+
+    Raises:
+        RuntimeError: invalid path or output format.
+    """
+
+    if output_format not in CONVERT_FORMATS:
+        raise RuntimeError('Unknown output format "{}"! (Choose from: {})'
+                           .format(output_format, ', '.join(CONVERT_FORMATS)))
+
+    if not isinstance(junit_xml_file_path, (list, tuple)):
+        junit_xml_file_path = [junit_xml_file_path]
+
+    counts = [0]
+
+    if stream and not aggregate:
+        timestamp = _utc_timestamp()
+        auto_req = swagger_client.AutomationRequest()
+        auto_req.test_cycle = qtest_test_cycle
+        auto_req.test_logs = _iter_streamed_test_logs(junit_xml_file_path, timestamp, counts, failure_details)
+        auto_req.execution_date = timestamp
+    else:
+        auto_req = _build_auto_request(junit_xml_file_path,
+                                       qtest_test_cycle,
+                                       stream,
+                                       processes,
+                                       aggregate,
+                                       failure_details=failure_details,
+                                       shard_bytes=shard_bytes)
+        counts[0] = len(auto_req.test_logs)
+
+    api_client = swagger_client.ApiClient()
+    if output_format == 'json':
+        chunks = iter_json_chunks(api_client, auto_req)
+    else:
+        chunks = iter_ndjson_chunks(api_client, auto_req.test_logs)
+
+    for chunk in chunks:
+        output.write(chunk)
+
+    return counts[0]
+
+
+def wait_for_queue_jobs(job_ids, qtest_api_token, timeout=DEFAULT_POLL_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES):
+    """Wait for qTest Manager to finish processing queued test result uploads. (Uses a single-use 'QTestUploader',
+    create one directly to reuse connections across uploads)
+
+    Args:
+        job_ids (list(int)): The queue processing IDs for the jobs.
+        qtest_api_token (str): Token to use for authorization to the qTest API.
+        timeout (float): The number of seconds to wait for all jobs to finish.
+        max_retries (int): The number of consecutive transient API failures (e.g. 429/503) retried for every job.
+
+    Returns:
+        list(JobReport): The final state and the time waited for every job in the order of the given job IDs.
+    """
+
+    with QTestUploader(qtest_api_token) as uploader:
+        return uploader.wait_for_queue_jobs(job_ids, timeout, max_retries)
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class QTestUploader(object):
+    """Upload JUnitXML results to qTest Manager through a reusable API client.
+
+    The uploader owns its API token, target host and a pool of keep-alive connections so that many uploads in the
+    same process share warm connections. It holds no per-upload state, so a single instance can be used from
+    concurrent threads, and instances for different tokens or hosts never interfere with each other.
+    """
+
+    def __init__(self, qtest_api_token, host=None, pool_size=DEFAULT_POOL_SIZE):
+        """
+        Args:
+            qtest_api_token (str): Token to use for authorization to the qTest API.
+            host (str): The base URL of the qTest API. (None for the swagger client default)
+            pool_size (int): The number of keep-alive connections to retain for concurrent requests.
+        """
+
+        self.api_client = client.QTestApiClient(qtest_api_token, host, pool_size)
+        self.auto_api = swagger_client.TestlogApi(self.api_client)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release all pooled connections."""
+
+        self.api_client.close()
+
+    def upload_test_results(self,
+                            junit_xml_file_path,
+                            qtest_project_id,
+                            qtest_test_cycle,
+                            stream=False,
+                            processes=None,
+                            max_retries=DEFAULT_MAX_RETRIES,
+                            chunked=False,
+                            compression=None,
+                            compress_level=DEFAULT_COMPRESS_LEVEL,
+                            on_compression=None,
+                            aggregate=False,
+                            snapshot=None,
+                            force_full=False,
+                            on_delta=None,
+                            metrics=None,
+                            failure_details=None,
+                            shard_bytes=None):
+        """Construct a 'AutomationRequest' qTest resource and upload the test results to the desired project in
+        qTest Manager.
+
+        Args:
+            junit_xml_file_path (str or list(str)): One or more file paths to JUnitXML files. (Results from multiple
+                files are combined into a single upload)
+            qtest_project_id (int): The target qTest project for the test results.
+            qtest_test_cycle (str): The parent qTest test cycle for test results.
+            stream (bool): Incrementally parse the JUnitXML file to keep memory usage flat for very large files.
+            processes (int): The number of worker processes used to parse multiple files or testsuites. (None for
+                the number of CPUs)
+            max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+            chunked (bool): Serialize the request body while it is being sent instead of building it in memory
+                first.
+            compression (str): The HTTP content encoding used to compress the request body. ('gzip', 'deflate' or
+                None for an uncompressed body)
+            compress_level (int): The zlib compression level from 1 (fastest) to 9 (smallest).
+            on_compression (callable): Called with the 'CompressionReport' of the upload when it is compressed.
+            aggregate (bool): Collapse the results of a parametrized test into a single test log.
+            snapshot (StatusSnapshot): Only send test logs that are new or changed since the last upload to the test
+                cycle and record the submitted statuses. (None to always send every test log)
+            force_full (bool): Send every test log even when a snapshot is given. (The snapshot is still updated)
+            on_delta (callable): Called with the 'DeltaReport' of the number of test logs sent and skipped.
+            metrics (UploadMetrics): Record the duration, size and peak memory of every phase of the upload.
+            failure_details (int): Record failure messages and tracebacks of at most this many characters in the
+                notes of the test logs. (None to only record statuses)
+            shard_bytes (int): Split JUnitXML files larger than twice this many bytes into shards of testcases that
+                are parsed in parallel. (None for the default, 0 to never shard)
+
+        Returns:
+            int: The queue processing ID for the job. (None if a delta upload found nothing to send)
+
+        Raises:
+            RuntimeError: Failed to upload test results to qTest Manager.
+        """
+
+        auto_req = _build_auto_request(junit_xml_file_path,
+                                       qtest_test_cycle,
+                                       stream,
+                                       processes,
+                                       aggregate,
+                                       metrics,
+                                       failure_details,
+                                       shard_bytes)
+        controller = SubmissionController(max_retries=max_retries)
+
+        if snapshot is not None:
+            _select_delta([auto_req], qtest_project_id, qtest_test_cycle, snapshot, force_full, on_delta)
+            if not auto_req.test_logs:
+                return None
+
+        response = _submit_auto_request(self.auto_api,
+                                        qtest_project_id,
+                                        auto_req,
+                                        controller,
+                                        chunked,
+                                        compression,
+                                        compress_level,
+                                        on_compression,
+                                        metrics)
+
+        if snapshot is not None:
+            snapshot.record(qtest_project_id, qtest_test_cycle, auto_req.test_logs)
+
+        return int(response.id)
+
+    def upload_test_results_in_batches(self,
+                                       junit_xml_file_path,
+                                       qtest_project_id,
+                                       qtest_test_cycle,
+                                       max_logs=DEFAULT_BATCH_MAX_LOGS,
+                                       max_bytes=DEFAULT_BATCH_MAX_BYTES,
+                                       workers=DEFAULT_BATCH_WORKERS,
+                                       max_workers=None,
+                                       stream=False,
+                                       processes=None,
+                                       max_retries=DEFAULT_MAX_RETRIES,
+                                       latency_target=None,
+                                       chunked=False,
+                                       compression=None,
+                                       compress_level=DEFAULT_COMPRESS_LEVEL,
+                                       on_compression=None,
+                                       aggregate=False,
+                                       snapshot=None,
+                                       force_full=False,
+                                       on_delta=None,
+                                       metrics=None,
+                                       per_suite=False,
+                                       failure_details=None,
+                                       shard_bytes=None):
+        """Construct a 'AutomationRequest' qTest resource, split its test logs into batches capped by test log count
+        and serialized size then concurrently upload each batch to the desired project in qTest Manager.
+
+        A failed batch does not abort the other batches. The outcome of every batch is reported so that the caller
+        can decide how to handle partial failures. The number of batches in flight starts at "workers" and adapts to
+        the push back from qTest Manager up to "max_workers". (Transient failures and responses slower than
+        "latency_target" lower it)
+
+        Args:
+            junit_xml_file_path (str or list(str)): One or more file paths to JUnitXML files. (Results from multiple
+                files are combined into a single upload)
+            qtest_project_id (int): The target qTest project for the test results.
+            qtest_test_cycle (str): The parent qTest test cycle for test results.
+            max_logs (int): The maximum number of test logs per batch. (None for no limit)
+            max_bytes (int): The maximum serialized size of a batch in bytes. (None for no limit)
+            workers (int): The number of batches uploaded concurrently at the start.
+            max_workers (int): The number of batches in flight may grow up to this many while qTest Manager keeps
+                up. (None for "workers", which makes it a hard ceiling, should not exceed the pool size)
+            stream (bool): Incrementally parse the JUnitXML file to keep memory usage flat for very large files.
+            processes (int): The number of worker processes used to parse multiple files or testsuites. (None for
+                the number of CPUs)
+            max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+            latency_target (float): Batch submissions slower than this many seconds lower the number of batches in
+                flight. (None to only react to errors)
+            chunked (bool): Serialize each batch while it is being sent instead of building it in memory first.
+            compression (str): The HTTP content encoding used to compress each batch. ('gzip', 'deflate' or None for
+                uncompressed batches)
+            compress_level (int): The zlib compression level from 1 (fastest) to 9 (smallest).
+            on_compression (callable): Called with the 'CompressionReport' of every compressed batch.
+            aggregate (bool): Collapse the results of a parametrized test into a single test log.
+            snapshot (StatusSnapshot): Only send test logs that are new or changed since the last upload to the test
+                cycle and record the submitted statuses. (None to always send every test log)
+            force_full (bool): Send every test log even when a snapshot is given. (The snapshot is still updated)
+            on_delta (callable): Called with the 'DeltaReport' of the number of test logs sent and skipped.
+            metrics (UploadMetrics): Record the duration, size and peak memory of every phase of the upload.
+            per_suite (bool): Submit the test logs of every testsuite in batches of their own instead of combining
+                them. (Parametrized tests are only aggregated within a testsuite)
+            failure_details (int): Record failure messages and tracebacks of at most this many characters in the
+                notes of the test logs. (None to only record statuses)
+            shard_bytes (int): Split JUnitXML files larger than twice this many bytes into shards of testcases that
+                are parsed in parallel. (None for the default, 0 to never shard)
+
+        Returns:
+            list(BatchReport): A report for each batch in submission order.
+
+        Raises:
+            RuntimeError: invalid path.
+        """
+
+        build = _build_testsuite_auto_requests if per_suite else _build_auto_request
+        auto_reqs = build(junit_xml_file_path,
+                          qtest_test_cycle,
+                          stream,
+                          processes,
+                          aggregate,
+                          metrics,
+                          failure_details,
+                          shard_bytes)
+        auto_reqs = auto_reqs if per_suite else [auto_reqs]
+        selected = None
+        submitted = []
+
+        if snapshot is not None:
+            selected = _select_delta(auto_reqs, qtest_project_id, qtest_test_cycle, snapshot, force_full, on_delta)
+
+        controller = _batch_controller(workers, max_workers, max_retries, latency_target)
+
+        batch_reports = _submit_in_batches(self.auto_api,
+                                           qtest_project_id,
+                                           auto_reqs,
+                                           max_logs,
+                                           max_bytes,
+                                           controller.max_limit,
+                                           controller,
+                                           chunked,
+                                           compression,
+                                           compress_level,
+                                           on_compression,
+                                           submitted.extend,
+                                           metrics)
+
+        if snapshot is not None:
+            snapshot.record(qtest_project_id, qtest_test_cycle, _fully_submitted(selected, submitted))
+
+        return batch_reports
+
+    def upload_test_results_spooled(self,
+                                    junit_xml_file_path,
+                                    qtest_project_id,
+                                    qtest_test_cycle,
+                                    spool_dir,
+                                    max_logs=DEFAULT_BATCH_MAX_LOGS,
+                                    max_bytes=DEFAULT_BATCH_MAX_BYTES,
+                                    workers=DEFAULT_BATCH_WORKERS,
+                                    max_workers=None,
+                                    stream=False,
+                                    processes=None,
+                                    max_retries=DEFAULT_MAX_RETRIES,
+                                    aggregate=False,
+                                    failure_details=None,
+                                    shard_bytes=None):
+        """Construct a 'AutomationRequest' qTest resource, seal its batches into a spool on disk then upload every
+        batch to the desired project in qTest Manager.
+
+        Every batch is serialized and durably written before anything is sent, and every batch acknowledged by
+        qTest Manager is checkpointed along with its queue processing ID. If the upload is interrupted the remaining
+        batches can be sent with 'resume_spooled_upload' without parsing the results again.
+
+        Args:
+            junit_xml_file_path (str or list(str)): One or more file paths to JUnitXML files. (Results from multiple
+                files are combined into a single upload)
+            qtest_project_id (int): The target qTest project for the test results.
+            qtest_test_cycle (str): The parent qTest test cycle for test results.
+            spool_dir (str): The directory to write the spool to. (Created if missing)
+            max_logs (int): The maximum number of test logs per batch. (None for no limit)
+            max_bytes (int): The maximum serialized size of a batch in bytes. (None for no limit)
+            workers (int): The number of batches uploaded concurrently at the start.
+            max_workers (int): The number of batches in flight may grow up to this many while qTest Manager keeps
+                up. (None for "workers", which makes it a hard ceiling, should not exceed the pool size)
+            stream (bool): Incrementally parse the JUnitXML file to keep memory usage flat for very large files.
+            processes (int): The number of worker processes used to parse multiple files or testsuites. (None for
+                the number of CPUs)
+            max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+            aggregate (bool): Collapse the results of a parametrized test into a single test log.
+            failure_details (int): Record failure messages and tracebacks of at most this many characters in the
+                notes of the test logs. (None to only record statuses)
+            shard_bytes (int): Split JUnitXML files larger than twice this many bytes into shards of testcases that
+                are parsed in parallel. (None for the default, 0 to never shard)
+
+        Returns:
+            tuple(UploadSpool, list(BatchReport)): The spool and a report for each batch in submission order. (The
+                spool is removed from disk once every batch has been acknowledged)
+
+        Raises:
+            RuntimeError: invalid path.
+        """
+
+        auto_req = _build_auto_request(junit_xml_file_path,
+                                       qtest_test_cycle,
+                                       stream,
+                                       processes,
+                                       aggregate,
+                                       failure_details=failure_details,
+                                       shard_bytes=shard_bytes)
+        overhead = len(serialize_auto_request(self.api_client, _make_batch_request(auto_req, [])))
+        batches = _split_test_logs(auto_req.test_logs, max_logs, max_bytes, overhead, self.api_client)
+
+        spool = UploadSpool.create(spool_dir,
+                                   qtest_project_id,
+                                   qtest_test_cycle,
+                                   ((serialize_auto_request(self.api_client, _make_batch_request(auto_req, test_logs)),
+                                     len(test_logs)) for test_logs, _ in batches))
+
+        return spool, self.resume_spooled_upload(spool,
+                                                 workers=workers,
+                                                 max_retries=max_retries,
+                                                 max_workers=max_workers)
+
+    def resume_spooled_upload(self,
+                              spool,
+                              workers=DEFAULT_BATCH_WORKERS,
+                              max_retries=DEFAULT_MAX_RETRIES,
+                              max_workers=None):
+        """Upload the batches of a spool that qTest Manager has not acknowledged yet. The spool is removed from disk
+        once every batch has been acknowledged.
+
+        Args:
+            spool (UploadSpool or str): The spool or the directory of the spool.
+            workers (int): The number of batches uploaded concurrently at the start.
+            max_workers (int): The number of batches in flight may grow up to this many while qTest Manager keeps
+                up. (None for "workers", which makes it a hard ceiling, should not exceed the pool size)
+            max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+
+        Returns:
+            list(BatchReport): A report for each batch that was pending in index order.
+
+        Raises:
+            RuntimeError: The spool is incomplete or corrupt.
+        """
+
+        if not isinstance(spool, UploadSpool):
+            spool = UploadSpool(spool)
+
+        controller = _batch_controller(workers, max_workers, max_retries)
+        reports = _submit_spool(self.api_client, spool, controller.max_limit, controller)
+
+        if spool.complete:
+            spool.remove()
+
+        return reports
+
+    def validate_target(self, qtest_project_id, qtest_test_cycle, cache=None, max_retries=DEFAULT_MAX_RETRIES):
+        """Check that the project and test cycle of an upload exist before any results are parsed or sent. (Otherwise
+        a wrong target is only reported by qTest once the whole upload has been processed)
+
+        A project found in the cache is not looked up again unless the test cycle is missing from it, in case the
+        test cycle was created after the project was cached.
+
+        Args:
+            qtest_project_id (int): The target qTest project for the test results.
+            qtest_test_cycle (str): The parent qTest test cycle for test results. (PID or numeric ID)
+            cache (MetadataCache): Remember the test cycles of the project for repeated uploads. (None to always
+                look them up)
+            max_retries (int): The number of times a transient API failure (e.g. 429/503) is retried.
+
+        Returns:
+            bool: True if the target was validated from the cache without contacting qTest.
+
+        Raises:
+            RuntimeError: The project or test cycle does not exist or the qTest API reported an error.
+        """
+
+        test_cycle_ids = cache.get(self.api_client.host, qtest_project_id) if cache is not None else None
+
+        if test_cycle_ids is not None and str(qtest_test_cycle) in test_cycle_ids:
+            return True
+
+        test_cycle_ids = _fetch_test_cycles(self.api_client,
+                                            qtest_project_id,
+                                            SubmissionController(max_retries=max_retries))
+        if cache is not None:
+            cache.put(self.api_client.host, qtest_project_id, test_cycle_ids)
+
+        if str(qtest_test_cycle) not in test_cycle_ids:
+            raise RuntimeError('The test cycle "{}" does not exist in qTest project "{}"!'
+                               .format(qtest_test_cycle, qtest_project_id))
+
+        return False
+
+    def wait_for_queue_jobs(self, job_ids, timeout=DEFAULT_POLL_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES):
+        """Wait for qTest Manager to finish processing queued test result uploads.
+
+        All jobs are polled concurrently on a single event loop with jittered exponential backoff.
+
+        Args:
+            job_ids (list(int)): The queue processing IDs for the jobs.
+            timeout (float): The number of seconds to wait for all jobs to finish.
+            max_retries (int): The number of consecutive transient API failures (e.g. 429/503) retried for every
+                job.
+
+        Returns:
+            list(JobReport): The final state and the time waited for every job in the order of the given job IDs.
+        """
 
-    return int(response.id)
+        return poll_jobs(lambda job_id: self.auto_api.track(id=job_id),
+                         job_ids,
+                         timeout,
+                         workers=self.api_client.pool_size,
+                         max_retries=max_retries)
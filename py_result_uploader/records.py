@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""Compact in-memory records for test results that are only converted into qTest swagger models on the wire."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from collections import OrderedDict
+from py_result_uploader.lazy import LazyModule
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+TEST_LOG_FIELDS = ('name', 'status', 'module_names', 'exe_start_date', 'exe_end_date', 'automation_content', 'note')
+
+swagger_client = LazyModule('swagger_client')
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class _ModelAttribute(object):
+    """A class attribute copied from the 'AutomationTestLogResource' swagger model (restricted to the fields of a
+    'CompactTestLog') the first time it is read, so that the swagger client is not imported along with this module.
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): The name of the attribute. ("swagger_types" or "attribute_map")
+        """
+
+        self.name = name
+
+    def __get__(self, instance, owner):
+        model = swagger_client.AutomationTestLogResource
+        value = OrderedDict((k, getattr(model, self.name)[k]) for k in model.swagger_types if k in TEST_LOG_FIELDS)
+        setattr(owner, self.name, value)     # Replace the descriptor so that later reads are plain lookups.
+
+        return value
+
+
+class CompactTestLog(object):
+    """A slotted stand-in for the 'AutomationTestLogResource' swagger model holding only the fields that are set for
+    a JUnitXML test result.
+
+    A swagger model carries an instance dictionary and an attribute for every field of the resource, most of which
+    are never set. This record stores just the populated fields in slots and shares the module name and timestamp
+    strings between records. It exposes the same "swagger_types" and "attribute_map" (in the same order) as the
+    swagger model so that 'ApiClient.sanitize_for_serialization' turns it straight into the identical wire format.
+    """
+
+    __slots__ = ('name', 'status', 'module_name', 'exe_start_date', 'exe_end_date', 'automation_content', 'note',
+                 'detail_digest')
+
+    swagger_types = _ModelAttribute('swagger_types')
+    attribute_map = _ModelAttribute('attribute_map')
+
+    def __init__(self,
+                 name,
+                 status,
+                 module_name,
+                 exe_start_date,
+                 exe_end_date,
+                 automation_content,
+                 note=None,
+                 detail_digest=None):
+        """
+        Args:
+            name (str): The name of the test.
+            status (str): The qTest status of the test. (PASSED, FAILED or SKIPPED)
+            module_name (str): The qTest module the test belongs to.
+            exe_start_date (str): The UTC time the test started.
+            exe_end_date (str): The UTC time the test ended.
+            automation_content (str): The unique qTest identifier for the automated test.
+            note (str): Free-form details about the test execution. (None to omit)
+            detail_digest (str): The digest of the traceback within the note. (Never sent to qTest, see
+                'FailureDetails')
+        """
+
+        self.name = name
+        self.status = status
+        self.module_name = module_name
+        self.exe_start_date = exe_start_date
+        self.exe_end_date = exe_end_date
+        self.automation_content = automation_content
+        self.note = note
+        self.detail_digest = detail_digest
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+    @property
+    def module_names(self):
+        """list(str): The qTest module names for the test log."""
+
+        return [self.module_name]
+
+    def to_model(self):
+        """Convert the record into a full qTest swagger model.
+
+        Returns:
+            AutomationTestLogResource: A qTest swagger model for a test log.
+        """
+
+        test_log = swagger_client.AutomationTestLogResource()
+
+        for field in self.swagger_types:
+            setattr(test_log, field, getattr(self, field))
+
+        return test_log
+
+    def to_dict(self):
+        """Return the properties of the equivalent qTest swagger model as a dict.
+
+        Returns:
+            dict: The swagger model properties.
+        """
+
+        return self.to_model().to_dict()
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+
+"""Incremental JSON serialization of qTest automation requests and chunked or compressed submission to the qTest
+API."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import re
+import json
+import zlib
+import types
+from collections import namedtuple
+from py_result_uploader.lazy import LazyModule
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_CHUNK_SIZE = 64 * 1024
+AUTO_TEST_LOGS_PATH = '/api/v3/projects/{}/auto-test-logs'
+JSON_PRIMITIVE_TYPES = (str, int, float, bool)
+CONTENT_ENCODING_WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+DEFAULT_COMPRESS_LEVEL = 6
+UNSUPPORTED_MEDIA_TYPE_STATUS = 415
+BAD_REQUEST_STATUS = 400
+ENCODING_ERROR_RGX = re.compile(r'encod|compress|gzip|deflate', re.IGNORECASE)
+
+rest = LazyModule('swagger_client.rest')     # Deferred until the first request is sent
+
+
+class CompressionReport(namedtuple('CompressionReport', ['content_encoding', 'raw_bytes', 'sent_bytes'])):
+    """The size of a request body before and after compression. (A "content_encoding" of None means the server
+    rejected the compressed body and it was sent uncompressed)"""
+
+    __slots__ = ()
+
+    @property
+    def ratio(self):
+        """float: The raw size divided by the sent size."""
+
+        return float(self.raw_bytes) / self.sent_bytes if self.sent_bytes else 1.0
+
+    @property
+    def saved_bytes(self):
+        """int: The number of bytes compression kept off the wire."""
+
+        return self.raw_bytes - self.sent_bytes
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _json_ready(api_client, obj):
+    """Convert a small swagger model into plain JSON types the same way 'ApiClient.sanitize_for_serialization' does,
+    without recursing into values that are already plain. (Fast path for test logs)
+
+    Args:
+        api_client (ApiClient): The swagger API client used for values that are not plain JSON types.
+        obj (object): A swagger model, a model stand-in exposing "swagger_types" or any other value.
+
+    Returns:
+        object: A value that "json.dumps" can encode.
+    """
+
+    if not hasattr(obj, 'swagger_types'):
+        return api_client.sanitize_for_serialization(obj)
+
+    result = {}
+    for attr in obj.swagger_types:
+        value = getattr(obj, attr)
+        if value is None:
+            continue
+        if not (isinstance(value, JSON_PRIMITIVE_TYPES) or
+                (isinstance(value, list) and all(isinstance(v, JSON_PRIMITIVE_TYPES) for v in value))):
+            value = api_client.sanitize_for_serialization(value)
+        result[obj.attribute_map[attr]] = value
+
+    return result
+
+
+def _iter_json(api_client, obj, top_level=True):
+    """Yield the JSON encoding of a swagger model graph piece by piece.
+
+    The output is identical to "json.dumps(api_client.sanitize_for_serialization(obj))", which is what the generated
+    client sends, but the top level model is walked field by field and lists item by item instead of being copied
+    into one large dict first. Everything else (e.g. a single test log) is small and encoded in one go. Generators
+    are encoded as lists so that the items can be produced while the document is being written.
+
+    Args:
+        api_client (ApiClient): The swagger API client whose serialization is reproduced.
+        obj (object): A swagger model, a model stand-in exposing "swagger_types" or any value the swagger client
+            can serialize.
+        top_level (bool): The object is the root of the document.
+
+    Returns:
+        generator: Yields str fragments of the JSON document.
+    """
+
+    if isinstance(obj, (list, tuple, types.GeneratorType)):
+        yield '['
+        for index, item in enumerate(obj):
+            if index:
+                yield ', '
+            for fragment in _iter_json(api_client, item, top_level=False):
+                yield fragment
+        yield ']'
+    elif top_level and hasattr(obj, 'swagger_types'):
+        yield '{'
+        first = True
+        for attr in obj.swagger_types:
+            value = getattr(obj, attr)
+            if value is None:
+                continue
+            yield '{}{}: '.format('' if first else ', ', json.dumps(obj.attribute_map[attr]))
+            for fragment in _iter_json(api_client, value, top_level=False):
+                yield fragment
+            first = False
+        yield '}'
+    else:
+        yield json.dumps(_json_ready(api_client, obj))
+
+
+def iter_json_chunks(api_client, auto_req, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Incrementally serialize an 'AutomationRequest' qTest resource into UTF-8 encoded chunks of JSON.
+
+    Args:
+        api_client (ApiClient): The swagger API client whose serialization is reproduced.
+        auto_req (AutomationRequest): A qTest swagger model for an automation request.
+        chunk_size (int): The approximate size in bytes of every chunk but the last.
+
+    Returns:
+        generator: Yields bytes chunks that concatenate into the JSON document.
+    """
+
+    buffered = []
+    buffered_size = 0
+
+    for fragment in _iter_json(api_client, auto_req):
+        buffered.append(fragment)
+        buffered_size += len(fragment)
+        if buffered_size >= chunk_size:
+            yield ''.join(buffered).encode('utf-8')
+            buffered = []
+            buffered_size = 0
+
+    if buffered:
+        yield ''.join(buffered).encode('utf-8')
+
+
+def iter_ndjson_chunks(api_client, test_logs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Incrementally serialize test logs into UTF-8 encoded chunks of newline delimited JSON. (Every line is identical
+    to the encoding of the test log within a serialized 'AutomationRequest')
+
+    Args:
+        api_client (ApiClient): The swagger API client whose serialization is reproduced.
+        test_logs (iterable(CompactTestLog)): The test logs to serialize.
+        chunk_size (int): The approximate size in bytes of every chunk but the last.
+
+    Returns:
+        generator: Yields bytes chunks that concatenate into the NDJSON document.
+    """
+
+    buffered = []
+    buffered_size = 0
+
+    for test_log in test_logs:
+        line = json.dumps(_json_ready(api_client, test_log)) + '\n'
+        buffered.append(line)
+        buffered_size += len(line)
+        if buffered_size >= chunk_size:
+            yield ''.join(buffered).encode('utf-8')
+            buffered = []
+            buffered_size = 0
+
+    if buffered:
+        yield ''.join(buffered).encode('utf-8')
+
+
+def serialize_auto_request(api_client, auto_req):
+    """Serialize an 'AutomationRequest' qTest resource into the exact JSON body sent by the swagger client.
+
+    Args:
+        api_client (ApiClient): The swagger API client whose serialization is reproduced.
+        auto_req (AutomationRequest): A qTest swagger model for an automation request.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+
+    return b''.join(iter_json_chunks(api_client, auto_req))
+
+
+def _iter_encoded(chunks, content_encoding, level, counts):
+    """Compress a stream of request body chunks while counting the bytes going in and out.
+
+    Args:
+        chunks (iterable(bytes)): The uncompressed request body.
+        content_encoding (str): The HTTP content encoding to apply. (None to pass the chunks through unchanged)
+        level (int): The zlib compression level from 1 (fastest) to 9 (smallest).
+        counts (list(int)): The raw and encoded byte counts, updated in place as the body is consumed.
+
+    Returns:
+        generator: Yields the encoded bytes chunks.
+    """
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, CONTENT_ENCODING_WBITS[content_encoding]) \
+        if content_encoding else None
+
+    for chunk in chunks:
+        counts[0] += len(chunk)
+        if compressor:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            counts[1] += len(chunk)
+            yield chunk
+
+    if compressor:
+        chunk = compressor.flush()
+        counts[1] += len(chunk)
+        yield chunk
+
+
+def _compression_rejected(exception):
+    """Determine whether a failed request was rejected because of its compressed body. (A 400 response only counts
+    when its body points to the encoding, so genuine validation errors are not sent a second time)
+
+    Args:
+        exception (ApiException): The exception raised by the request.
+
+    Returns:
+        bool: True if the server does not accept the content encoding of the request body.
+    """
+
+    if exception.status == UNSUPPORTED_MEDIA_TYPE_STATUS:
+        return True
+    if exception.status != BAD_REQUEST_STATUS:
+        return False
+
+    body = exception.body or ''
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'replace')
+
+    return bool(ENCODING_ERROR_RGX.search(body))
+
+
+def _post_auto_request(api_client, qtest_project_id, body, content_encoding=None, chunked=False):
+    """POST a serialized 'AutomationRequest' qTest resource to the qTest API through the client's connection pool.
+
+    Args:
+        api_client (ApiClient): The swagger API client providing the host, authorization and connection pool.
+        qtest_project_id (int): The target qTest project for the test results.
+        body (bytes or iterable(bytes)): The JSON request body.
+        content_encoding (str): The HTTP content encoding of the body. (None for an uncompressed body)
+        chunked (bool): Send the body with chunked transfer encoding.
+
+    Returns:
+        QueueProcessingResponse: The qTest swagger model for the queued job.
+
+    Raises:
+        ApiException: The qTest API reported an error.
+    """
+
+    headers = dict(api_client.default_headers)
+    headers.update({'Accept': 'application/json',
+                    'Content-Type': 'application/json',
+                    'User-Agent': api_client.user_agent})
+    if content_encoding:
+        headers['Content-Encoding'] = content_encoding
+    api_client.update_params_for_auth(headers, [], ['Authorization'])
+
+    url = '{}{}?type=automation'.format(api_client.host, AUTO_TEST_LOGS_PATH.format(qtest_project_id))
+    response = rest.RESTResponse(api_client.rest_client.pool_manager.urlopen('POST',
+                                                                             url,
+                                                                             body=body,
+                                                                             headers=headers,
+                                                                             chunked=chunked,
+                                                                             preload_content=True))
+
+    if not 200 <= response.status <= 299:
+        raise rest.ApiException(http_resp=response)
+
+    return api_client.deserialize(response, 'QueueProcessingResponse')
+
+
+def submit_serialized(api_client, qtest_project_id, body):
+    """Submit an already serialized 'AutomationRequest' qTest resource. (e.g. a batch read back from a spool)
+
+    Args:
+        api_client (ApiClient): The swagger API client providing the host, authorization and connection pool.
+        qtest_project_id (int): The target qTest project for the test results.
+        body (bytes): The UTF-8 encoded JSON request body.
+
+    Returns:
+        QueueProcessingResponse: The qTest swagger model for the queued job.
+
+    Raises:
+        ApiException: The qTest API reported an error.
+    """
+
+    return _post_auto_request(api_client, qtest_project_id, body)
+
+
+def submit_chunked(api_client, qtest_project_id, auto_req, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Submit an 'AutomationRequest' qTest resource with a chunked request body that is serialized while it is
+    being sent, bypassing the generated API's serialization of the whole object graph.
+
+    Args:
+        api_client (ApiClient): The swagger API client providing the host, authorization and connection pool.
+        qtest_project_id (int): The target qTest project for the test results.
+        auto_req (AutomationRequest): A qTest swagger model for an automation request.
+        chunk_size (int): The approximate size in bytes of every chunk of the request body.
+
+    Returns:
+        QueueProcessingResponse: The qTest swagger model for the queued job.
+
+    Raises:
+        ApiException: The qTest API reported an error.
+    """
+
+    return _post_auto_request(api_client,
+                              qtest_project_id,
+                              iter_json_chunks(api_client, auto_req, chunk_size),
+                              chunked=True)
+
+
+def submit_compressed(api_client,
+                      qtest_project_id,
+                      auto_req,
+                      content_encoding='gzip',
+                      level=DEFAULT_COMPRESS_LEVEL,
+                      chunked=False,
+                      chunk_size=DEFAULT_CHUNK_SIZE):
+    """Submit an 'AutomationRequest' qTest resource with a compressed request body.
+
+    If the server rejects the compressed body (HTTP 415 or a 400 that blames the encoding) the request is sent once
+    more uncompressed.
+
+    Args:
+        api_client (ApiClient): The swagger API client providing the host, authorization and connection pool.
+        qtest_project_id (int): The target qTest project for the test results.
+        auto_req (AutomationRequest): A qTest swagger model for an automation request.
+        content_encoding (str): The HTTP content encoding to apply. ('gzip' or 'deflate')
+        level (int): The zlib compression level from 1 (fastest) to 9 (smallest).
+        chunked (bool): Compress the body while it is being sent with chunked transfer encoding instead of
+            compressing it in memory first.
+        chunk_size (int): The approximate size in bytes of the uncompressed chunks fed to the compressor.
+
+    Returns:
+        tuple(QueueProcessingResponse, CompressionReport): The qTest swagger model for the queued job and the size
+            of the body before and after compression.
+
+    Raises:
+        ApiException: The qTest API reported an error.
+        RuntimeError: Unsupported content encoding.
+    """
+
+    if content_encoding not in CONTENT_ENCODING_WBITS:
+        raise RuntimeError("Unsupported content encoding: {}".format(content_encoding))
+
+    def send(encoding):
+        counts = [0, 0]
+        body = _iter_encoded(iter_json_chunks(api_client, auto_req, chunk_size), encoding, level, counts)
+        if not chunked:
+            body = b''.join(body)
+        response = _post_auto_request(api_client, qtest_project_id, body, encoding, chunked)
+
+        return response, CompressionReport(encoding, counts[0], counts[1])
+
+    try:
+        return send(content_encoding)
+    except rest.ApiException as e:
+        if not _compression_rejected(e):
+            raise
+
+    return send(None)
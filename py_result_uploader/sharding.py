@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+"""Locate the independent "testsuite" elements or runs of "testcase" elements of a JUnitXML file without parsing it so
+that they can be processed in parallel."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import re
+import mmap
+from collections import namedtuple
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+# Comments, CDATA sections and processing instructions are matched (and skipped) as a whole so that markup quoted
+# inside of them is never mistaken for a tag. Attribute values may legally contain ">" so they are matched quoted.
+# (Runs of unquoted characters are matched greedily, which is about twice as fast as a lazy match)
+TESTSUITE_TAG_RGX = re.compile(br'<(?:!--.*?-->|!\[CDATA\[.*?\]\]>|\?.*?\?>|'
+                               br'(/?)testsuite(s?)(?=[\s/>])(?:[^>"\'/]+|"[^"]*"|\'[^\']*\'|/(?!>))*(/?)>)',
+                               re.DOTALL)
+TESTCASE_TAG_RGX = re.compile(br'<(?:!--.*?-->|!\[CDATA\[.*?\]\]>|\?.*?\?>|'
+                              br'(/?)(testcase|testsuites?|properties)(?=[\s/>])'
+                              br'(?:[^>"\'/]+|"[^"]*"|\'[^\']*\'|/(?!>))*(/?)>)',
+                              re.DOTALL)
+PROLOG_MARKUP_RGX = re.compile(br'<[^?!]|<!DOCTYPE')
+DEFAULT_SHARD_BYTES = 32 * 1024 * 1024
+
+TestsuitesLayout = namedtuple('TestsuitesLayout', ['prolog', 'skeleton', 'ranges'])
+TestcasesLayout = namedtuple('TestcasesLayout', ['prolog', 'root_tag', 'skeleton', 'ranges'])
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _cut_out(data, start, end, ranges):
+    """Copy a span of a document with some byte ranges within it cut out.
+
+    Args:
+        data (bytes or mmap): The contents of the document.
+        start (int): The offset of the first byte of the span.
+        end (int): The offset just past the last byte of the span.
+        ranges (list(tuple(int, int))): The (start, end) byte ranges to cut out in document order.
+
+    Returns:
+        bytes: The span without the ranges.
+    """
+
+    cuts = [start] + [offset for cut_range in ranges for offset in cut_range] + [end]
+
+    return b''.join(data[cuts[i]:cuts[i + 1]] for i in range(0, len(cuts), 2))
+
+
+def _scan_testsuites(data):
+    """Scan a JUnitXML document for the byte ranges of the "testsuite" children of its "testsuites" root element.
+
+    Args:
+        data (bytes or mmap): The contents of the JUnitXML file.
+
+    Returns:
+        TestsuitesLayout: The layout of the document. (None if the root element is not "testsuites" or the document
+            is not laid out as expected)
+    """
+
+    root = None
+    depth = 0
+    start = None
+    ranges = []
+
+    for match in TESTSUITE_TAG_RGX.finditer(data):
+        closing, plural, self_closing = match.groups()
+        if closing is None:     # Comment, CDATA section or processing instruction.
+            continue
+
+        if root is None:
+            prolog = data[:match.start()]
+            # Only comments and processing instructions may precede the root element. (A DOCTYPE could declare
+            # entities that would be missing from the fragments)
+            if closing or not plural or self_closing or PROLOG_MARKUP_RGX.search(prolog):
+                return None
+            root = match
+        elif plural:
+            if not closing or depth:
+                return None
+            return TestsuitesLayout(prolog, _cut_out(data, root.start(), match.end(), ranges), ranges)
+        elif closing:
+            depth -= 1
+            if depth < 0:
+                return None
+            if not depth:
+                ranges.append((start, match.end()))
+        elif not self_closing:
+            if not depth:
+                start = match.start()
+            depth += 1
+        elif not depth:
+            ranges.append((match.start(), match.end()))
+
+    return None
+
+
+def _scan_testcases(data, shard_bytes):
+    """Scan a JUnitXML document for runs of consecutive "testcase" children of its "testsuite" root element that
+    span roughly "shard_bytes" each.
+
+    A run never spans a "properties" element so that every property of the testsuite remains in the skeleton.
+
+    Args:
+        data (bytes or mmap): The contents of the JUnitXML file.
+        shard_bytes (int): The size in bytes after which a run of testcases is ended at the next testcase boundary.
+
+    Returns:
+        TestcasesLayout: The layout of the document. (None if the root element is not "testsuite", it contains nested
+            testsuites or the document is not laid out as expected)
+    """
+
+    root = None
+    depth = 0
+    start = None
+    end = None
+    ranges = []
+
+    for match in TESTCASE_TAG_RGX.finditer(data):
+        closing, tag, self_closing = match.groups()
+        if tag is None:     # Comment, CDATA section or processing instruction.
+            continue
+
+        if root is None:
+            prolog = data[:match.start()]
+            if closing or tag != b'testsuite' or self_closing or PROLOG_MARKUP_RGX.search(prolog):
+                return None
+            root = match
+        elif tag == b'properties':
+            if not depth and not closing and start is not None:
+                ranges.append((start, end))
+                start = None
+        elif tag != b'testcase':
+            if depth or not closing or tag != b'testsuite':     # Nested testsuites are not supported.
+                return None
+            if start is not None:
+                ranges.append((start, end))
+            return TestcasesLayout(prolog,
+                                   data[root.start():root.end()],
+                                   _cut_out(data, root.start(), match.end(), ranges),
+                                   ranges)
+        elif closing or self_closing:
+            if closing:
+                depth -= 1
+                if depth < 0:
+                    return None
+            if not depth:
+                start = match.start() if start is None else start
+                end = match.end()
+                if end - start >= shard_bytes:
+                    ranges.append((start, end))
+                    start = None
+        else:
+            if not depth and start is None:
+                start = match.start()
+            depth += 1
+
+    return None
+
+
+def find_testsuites(file_path):
+    """Locate the "testsuite" elements of a JUnitXML file with a "testsuites" root element. The file is memory mapped
+    and only scanned for tags so that locating the suites costs a fraction of parsing the file.
+
+    Args:
+        file_path (str): A file path to a JUnitXML file.
+
+    Returns:
+        TestsuitesLayout: The bytes ahead of the root element ("prolog"), the root element with every top level
+            "testsuite" element cut out ("skeleton") and the (start, end) byte range of each of those "testsuite"
+            elements in document order ("ranges"). (None if the file cannot be read, does not have a "testsuites"
+            root element or cannot be split safely)
+    """
+
+    try:
+        with open(file_path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _scan_testsuites(data)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def read_testsuite(file_path, prolog, start, end):
+    """Read a single "testsuite" element located by 'find_testsuites' as a standalone XML document.
+
+    Args:
+        file_path (str): A file path to a JUnitXML file.
+        prolog (bytes): The bytes ahead of the root element. (Preserves the XML declaration and its encoding)
+        start (int): The offset of the first byte of the "testsuite" element.
+        end (int): The offset just past the last byte of the "testsuite" element.
+
+    Returns:
+        bytes: The XML document.
+    """
+
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return prolog + f.read(end - start)
+
+
+def find_testcases(file_path, shard_bytes=DEFAULT_SHARD_BYTES):
+    """Split the "testcase" elements of a JUnitXML file with a "testsuite" root element into shards of roughly
+    "shard_bytes" each. The file is memory mapped and only scanned for tags so that locating the shards costs a
+    fraction of parsing the file.
+
+    Args:
+        file_path (str): A file path to a JUnitXML file.
+        shard_bytes (int): The approximate size in bytes of every shard. (Files smaller than two shards are not split)
+
+    Returns:
+        TestcasesLayout: The bytes ahead of the root element ("prolog"), the start tag of the root element
+            ("root_tag"), the root element with every shard cut out ("skeleton") and the (start, end) byte range of
+            each shard in document order ("ranges"). (None if the file is too small, cannot be read, does not have a
+            "testsuite" root element or cannot be split safely)
+    """
+
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < 2 * shard_bytes:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                layout = _scan_testcases(data, shard_bytes)
+    except (IOError, OSError, ValueError):
+        return None
+
+    return layout if layout is not None and len(layout.ranges) > 1 else None
+
+
+def read_testcases(file_path, prolog, root_tag, start, end):
+    """Read a shard of "testcase" elements located by 'find_testcases' as a standalone XML document wrapped in a copy
+    of the root element.
+
+    Args:
+        file_path (str): A file path to a JUnitXML file.
+        prolog (bytes): The bytes ahead of the root element. (Preserves the XML declaration and its encoding)
+        root_tag (bytes): The start tag of the root element. (Preserves its attributes and namespace declarations)
+        start (int): The offset of the first byte of the shard.
+        end (int): The offset just past the last byte of the shard.
+
+    Returns:
+        bytes: The XML document.
+    """
+
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return b''.join((prolog, root_tag, f.read(end - start), b'</testsuite>'))
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""A crash-safe, write-ahead spool of serialized upload batches that can be resumed after a failure."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+MANIFEST_FILE_NAME = 'manifest.json'
+CHECKPOINT_FILE_NAME = 'checkpoints.jsonl'
+BATCH_FILE_NAME = 'batch-{:06d}.json'
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _write_sealed(path, data):
+    """Durably write a file so that it either exists with its complete contents or not at all.
+
+    Args:
+        path (str): The destination file path.
+        data (bytes): The file contents.
+    """
+
+    temp_path = '{}.tmp'.format(path)
+
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.rename(temp_path, path)
+
+
+def list_spools(spool_dir):
+    """Find every sealed spool in a directory, oldest first. (Spools that were never sealed are ignored)
+
+    Args:
+        spool_dir (str): The directory holding the spools.
+
+    Returns:
+        list(UploadSpool): The sealed spools.
+    """
+
+    if not os.path.isdir(spool_dir):
+        return []
+
+    return [UploadSpool(os.path.join(spool_dir, name))
+            for name in sorted(os.listdir(spool_dir))
+            if os.path.isfile(os.path.join(spool_dir, name, MANIFEST_FILE_NAME))]
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class UploadSpool(object):
+    """A directory of sealed, serialized upload batches along with a checkpoint of every batch that qTest Manager
+    acknowledged.
+
+    Every batch is written to its own file before anything is sent and the manifest is written last, which seals the
+    spool. Each acknowledged batch is appended to the checkpoint log and flushed to disk along with its queue
+    processing ID, so after a crash only the unacknowledged batches need to be sent again.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): The directory of a sealed spool.
+
+        Raises:
+            RuntimeError: The spool was never sealed or is corrupt.
+        """
+
+        self.path = path
+
+        try:
+            with open(os.path.join(path, MANIFEST_FILE_NAME)) as f:
+                manifest = json.load(f)
+        except (IOError, ValueError):
+            raise RuntimeError('The spool "{}" is incomplete or corrupt!'.format(path))
+
+        self.qtest_project_id = manifest['qtest_project_id']
+        self.qtest_test_cycle = manifest['qtest_test_cycle']
+        self.batches = manifest['batches']      # [{'test_log_count': int, 'byte_size': int}, ...]
+        self.created = manifest['created']
+        self.job_ids = {}
+
+        self._lock = threading.Lock()
+
+        try:
+            with open(os.path.join(path, CHECKPOINT_FILE_NAME)) as f:
+                for line in f:
+                    try:
+                        checkpoint = json.loads(line)
+                    except ValueError:      # A torn write from a crash, the batch was not acknowledged.
+                        continue
+                    self.job_ids[checkpoint['index']] = checkpoint['job_id']
+        except IOError:
+            pass
+
+    @classmethod
+    def create(cls, spool_dir, qtest_project_id, qtest_test_cycle, batches):
+        """Write serialized batches into a new sealed spool.
+
+        Args:
+            spool_dir (str): The directory holding the spools. (Created if missing)
+            qtest_project_id (int): The target qTest project for the test results.
+            qtest_test_cycle (str): The parent qTest test cycle for test results.
+            batches (iterable(tuple(bytes, int))): The serialized JSON body and test log count of every batch.
+
+        Returns:
+            UploadSpool: The sealed spool.
+        """
+
+        path = os.path.join(spool_dir, '{}-{}'.format(time.strftime('%Y%m%dT%H%M%S'), uuid.uuid4().hex[:8]))
+        os.makedirs(path)
+
+        batch_info = []
+        for index, (body, test_log_count) in enumerate(batches):
+            _write_sealed(os.path.join(path, BATCH_FILE_NAME.format(index)), body)
+            batch_info.append({'test_log_count': test_log_count, 'byte_size': len(body)})
+
+        manifest = {'qtest_project_id': qtest_project_id,
+                    'qtest_test_cycle': qtest_test_cycle,
+                    'batches': batch_info,
+                    'created': time.time()}
+        _write_sealed(os.path.join(path, MANIFEST_FILE_NAME), json.dumps(manifest).encode('utf-8'))
+
+        return cls(path)
+
+    @property
+    def pending(self):
+        """list(int): The indexes of the batches that have not been acknowledged."""
+
+        with self._lock:
+            return [index for index in range(len(self.batches)) if index not in self.job_ids]
+
+    @property
+    def complete(self):
+        """bool: Every batch has been acknowledged."""
+
+        return not self.pending
+
+    def read_batch(self, index):
+        """Read the serialized JSON body of a batch.
+
+        Args:
+            index (int): The index of the batch.
+
+        Returns:
+            bytes: The request body.
+        """
+
+        with open(os.path.join(self.path, BATCH_FILE_NAME.format(index)), 'rb') as f:
+            return f.read()
+
+    def acknowledge(self, index, job_id):
+        """Durably checkpoint a batch that qTest Manager accepted.
+
+        Args:
+            index (int): The index of the batch.
+            job_id (int): The queue processing ID for the batch.
+        """
+
+        with self._lock:
+            with open(os.path.join(self.path, CHECKPOINT_FILE_NAME), 'a') as f:
+                f.write(json.dumps({'index': index, 'job_id': job_id}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.job_ids[index] = job_id
+
+    def remove(self):
+        """Delete the spool from disk."""
+
+        shutil.rmtree(self.path)
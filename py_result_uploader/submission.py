@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""Adaptive, rate-limit-aware submission of requests to the qTest API."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import time
+import socket
+import random
+import threading
+from py_result_uploader.lazy import LazyModule
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+TRANSIENT_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_POOL_SIZE = 8   # Keep-alive connections per API client
+DEFAULT_INITIAL_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
+
+email_utils = LazyModule('email.utils')     # Only needed to parse a "Retry-After" date
+urllib3_exceptions = LazyModule('urllib3.exceptions')
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _retry_after(exception):
+    """Extract the number of seconds a server asked the client to wait from the "Retry-After" header of a failed
+    response. (Both the delay-seconds and HTTP-date forms are supported)
+
+    Args:
+        exception (Exception): An exception carrying the "headers" of the failed response. (e.g. ApiException)
+
+    Returns:
+        float: The number of seconds to wait or None if the server did not ask for a delay.
+    """
+
+    headers = getattr(exception, 'headers', None) or {}
+    value = next((v for k, v in headers.items() if k.lower() == 'retry-after'), None)
+
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email_utils.parsedate_tz(value)
+
+        return max(0.0, email_utils.mktime_tz(parsed) - time.time()) if parsed else None
+
+
+def is_transient(exception):
+    """Determine whether a failed request is worth retrying.
+
+    Args:
+        exception (Exception): The exception raised by the request. (e.g. ApiException)
+
+    Returns:
+        bool: True if the HTTP status of the failure is transient or the connection to the server failed. (e.g. A
+            refused, reset or timed out connection)
+    """
+
+    if getattr(exception, 'status', None) in TRANSIENT_STATUS_CODES:
+        return True
+
+    return isinstance(exception, (urllib3_exceptions.MaxRetryError,
+                                  urllib3_exceptions.ProtocolError,
+                                  urllib3_exceptions.TimeoutError,
+                                  socket.error))
+
+
+def retry_delay(attempt, exception, initial_backoff=DEFAULT_INITIAL_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF):
+    """Calculate how long to wait before retrying a transient failure. The server's "Retry-After" is honored when
+    present, otherwise the delay is a jittered exponential backoff. ("Equal jitter": half of the capped exponential
+    delay is fixed and the other half is random)
+
+    Args:
+        attempt (int): The zero based number of retries already made.
+        exception (Exception): The exception raised by the failed request. (e.g. ApiException)
+        initial_backoff (float): The backoff in seconds before the first retry. (Without "Retry-After")
+        max_backoff (float): The upper bound in seconds for the delay.
+
+    Returns:
+        float: The number of seconds to wait before retrying.
+    """
+
+    retry_after = _retry_after(exception)
+    if retry_after is not None:
+        return min(max_backoff, retry_after)
+
+    delay = min(max_backoff, initial_backoff * (2 ** attempt))
+
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class SubmissionController(object):
+    """Execute requests against the qTest API while adapting the number of requests in flight.
+
+    The in-flight limit follows an AIMD (additive increase, multiplicative decrease) policy: every successful request
+    grows the limit by one request per round trip, while a transient failure (e.g. 429/503) or a response slower than
+    the latency target shrinks it by the decrease factor. Transient failures are retried after the delay requested by
+    the server through "Retry-After" or, failing that, a jittered exponential backoff.
+
+    Instances are safe to share between threads.
+    """
+
+    def __init__(self,
+                 initial_limit=1,
+                 min_limit=1,
+                 max_limit=1,
+                 latency_target=None,
+                 decrease_factor=0.5,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 initial_backoff=DEFAULT_INITIAL_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF,
+                 sleep=None):
+        """
+        Args:
+            initial_limit (int): The number of requests allowed in flight at the start.
+            min_limit (int): The lower bound for the in-flight limit.
+            max_limit (int): The upper bound for the in-flight limit.
+            latency_target (float): Responses slower than this many seconds shrink the limit. (None to disable)
+            decrease_factor (float): The factor the limit is multiplied by when the server pushes back.
+            max_retries (int): The number of times a transient failure is retried before giving up.
+            initial_backoff (float): The backoff in seconds before the first retry. (Without "Retry-After")
+            max_backoff (float): The upper bound in seconds for any single wait between retries.
+            sleep (callable): The function used to wait between retries. (None for "time.sleep")
+        """
+
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.retries = 0
+        self.throttled = 0
+
+        self._sleep = sleep or time.sleep
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """int: The number of requests currently allowed in flight."""
+
+        return int(self._limit)
+
+    def _acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def _release(self, latency, pushed_back=False, adjust=True):
+        with self._condition:
+            self._in_flight -= 1
+            if adjust:
+                self._adjust_limit(latency, pushed_back)
+            self._condition.notify_all()
+
+    def _adjust_limit(self, latency, pushed_back):
+        # Must be called while holding the condition lock.
+        now = time.time()
+        slow = self.latency_target is not None and latency > self.latency_target
+
+        if pushed_back or slow:
+            # Only back off once per round trip so that a burst of concurrent failures does not collapse the limit
+            # all the way down to the minimum.
+            if now - self._last_decrease > latency:
+                self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                self._last_decrease = now
+        else:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def submit(self, func, *args, **kwargs):
+        """Execute a request once a slot is available, retrying transient failures.
+
+        Args:
+            func (callable): The function that performs the request.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            object: The return value of the function.
+
+        Raises:
+            Exception: The request failed with a non-transient error or ran out of retries.
+        """
+
+        attempt = 0
+
+        while True:
+            self._acquire()
+            start = time.time()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                transient = is_transient(e)
+                self._release(time.time() - start, pushed_back=transient, adjust=transient)
+                if not transient or attempt >= self.max_retries:
+                    raise
+                with self._condition:
+                    self.retries += 1
+                    self.throttled += 1 if getattr(e, 'status', None) == 429 else 0
+                self._sleep(retry_delay(attempt, e, self.initial_backoff, self.max_backoff))
+                attempt += 1
+                continue
+
+            self._release(time.time() - start)
+
+            return result
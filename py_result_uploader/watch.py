@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+"""Watch a directory for JUnitXML files and upload each one exactly once."""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import time
+import fnmatch
+import threading
+from py_result_uploader.lazy import LazyModule, is_installed
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+DEFAULT_WATCH_PATTERN = '*.xml'
+DEFAULT_SETTLE_TIME = 2.0
+DEFAULT_POLL_INTERVAL = 1.0
+LEDGER_FILE_NAME = '.py_result_uploader.sqlite'
+DEFAULT_RETRY_BACKOFF = 30.0
+DEFAULT_MAX_RETRY_BACKOFF = 3600.0
+
+sqlite3 = LazyModule('sqlite3')
+# The optional "watchdog" package is only imported once a directory is actually watched. (None when not installed)
+observers = LazyModule('watchdog.observers') if is_installed('watchdog') else None
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def _file_signature(path):
+    """Identify the current contents of a file by its size and modification time.
+
+    Args:
+        path (str): A file path.
+
+    Returns:
+        tuple(int, int): The size and modification time in nanoseconds or None if the file does not exist.
+    """
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_size, stat.st_mtime_ns
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class UploadLedger(object):
+    """A persistent record of every file the watcher has processed, used to upload each file exactly once.
+
+    A file that was uploaded is never sent again. A file that failed to upload is retried as soon as its contents
+    change and otherwise after a delay that doubles with every failed attempt, so files that failed during a qTest
+    outage are still sent once the API recovers.
+    """
+
+    def __init__(self, path, retry_backoff=DEFAULT_RETRY_BACKOFF, max_retry_backoff=DEFAULT_MAX_RETRY_BACKOFF):
+        """
+        Args:
+            path (str): The file path of the SQLite database.
+            retry_backoff (float): The number of seconds to wait before retrying an unchanged file after its first
+                failed attempt.
+            max_retry_backoff (float): The maximum number of seconds to wait before retrying an unchanged file.
+        """
+
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS uploads ('
+                           'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, state TEXT, job_id INTEGER, '
+                           'error TEXT, updated REAL, attempts INTEGER, retry_at REAL)')
+        # Ledgers written before failed uploads were retried lack the retry columns.
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(uploads)')]
+        for column, column_type in (('attempts', 'INTEGER'), ('retry_at', 'REAL')):
+            if column not in columns:
+                self._conn.execute('ALTER TABLE uploads ADD COLUMN {} {}'.format(column, column_type))
+        self._conn.commit()
+
+    def close(self):
+        """Close the database."""
+
+        with self._lock:
+            self._conn.close()
+
+    def should_upload(self, path, signature):
+        """Determine whether a file still needs to be uploaded.
+
+        Args:
+            path (str): The absolute path of the file.
+            signature (tuple(int, int)): The size and modification time of the file.
+
+        Returns:
+            bool: True if the file has never been uploaded and has either changed since a failed attempt or is due to
+                be retried.
+        """
+
+        with self._lock:
+            row = self._conn.execute('SELECT size, mtime_ns, state, retry_at FROM uploads WHERE path = ?',
+                                     (path,)).fetchone()
+
+        if row is None:
+            return True
+        if row[2] != 'failed':
+            return False
+
+        return tuple(row[:2]) != tuple(signature) or (row[3] or 0) <= time.time()
+
+    def due_retries(self):
+        """List the files whose failed upload is due to be retried.
+
+        Returns:
+            list(str): The absolute paths of the files.
+        """
+
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM uploads WHERE state = 'failed' AND "
+                                      "COALESCE(retry_at, 0) <= ?", (time.time(),)).fetchall()
+
+        return [row[0] for row in rows]
+
+    def record(self, path, signature, job_id=None, error=None):
+        """Record the outcome of an upload attempt.
+
+        Args:
+            path (str): The absolute path of the file.
+            signature (tuple(int, int)): The size and modification time of the file that was attempted.
+            job_id (int): The queue processing ID of a successful upload.
+            error (str): The reason a failed upload did not succeed.
+        """
+
+        now = time.time()
+
+        with self._lock:
+            attempts, retry_at = 0, None
+            if error:
+                row = self._conn.execute('SELECT size, mtime_ns, attempts FROM uploads WHERE path = ? AND '
+                                         "state = 'failed'", (path,)).fetchone()
+                # Back off further for every failure of the same file contents.
+                attempts = (row[2] or 0) + 1 if row and tuple(row[:2]) == tuple(signature) else 1
+                retry_at = now + min(self.max_retry_backoff, self.retry_backoff * 2 ** (attempts - 1))
+
+            self._conn.execute('INSERT OR REPLACE INTO uploads '
+                               '(path, size, mtime_ns, state, job_id, error, updated, attempts, retry_at) '
+                               'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                               (path, signature[0], signature[1], 'failed' if error else 'uploaded', job_id, error,
+                                now, attempts, retry_at))
+            self._conn.commit()
+
+
+class _ChangeHandler(object):
+    """Forward file system notifications for matching files to the watcher. (Implements the "dispatch" interface of a
+    watchdog event handler)"""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def dispatch(self, event):
+        if event.is_directory:
+            return
+
+        self.watcher.notify(getattr(event, 'dest_path', None) or event.src_path)
+
+
+class DirectoryWatcher(object):
+    """Watch a directory for new or completed JUnitXML files and upload each one exactly once.
+
+    Change notifications come from the operating system (inotify on Linux) through the optional "watchdog" package.
+    Without it the directory is rescanned every poll interval instead. A file is only uploaded once its size and
+    modification time have stopped changing for the settle time, so partially written files are never picked up.
+    """
+
+    def __init__(self,
+                 directory,
+                 upload,
+                 ledger,
+                 pattern=DEFAULT_WATCH_PATTERN,
+                 settle=DEFAULT_SETTLE_TIME,
+                 poll_interval=DEFAULT_POLL_INTERVAL,
+                 recursive=False,
+                 on_result=None,
+                 use_notifications=True):
+        """
+        Args:
+            directory (str): The directory to watch.
+            upload (callable): Accepts a file path, uploads it and returns the queue processing ID.
+            ledger (UploadLedger): The record of files that have already been processed.
+            pattern (str): A glob pattern the file names must match.
+            settle (float): The number of seconds a file must remain unchanged before it is uploaded.
+            poll_interval (float): The number of seconds between checks for settled files.
+            recursive (bool): Also watch subdirectories.
+            on_result (callable): Called with the file path, queue processing ID and error of every upload attempt.
+            use_notifications (bool): Use file system notifications when "watchdog" is installed.
+        """
+
+        self.directory = os.path.abspath(directory)
+        self.upload = upload
+        self.ledger = ledger
+        self.pattern = pattern
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.recursive = recursive
+        self.on_result = on_result
+        self.use_notifications = use_notifications and observers is not None
+
+        self._lock = threading.Lock()
+        self._pending = {}      # path -> (signature, time the signature was last seen to change)
+
+    def _matches(self, path):
+        return fnmatch.fnmatch(os.path.basename(path), self.pattern)
+
+    def notify(self, path):
+        """Mark a file as changed so that it is considered for upload once it settles.
+
+        Args:
+            path (str): The path of the changed file.
+        """
+
+        path = os.path.abspath(path)
+        if not self._matches(path):
+            return
+
+        with self._lock:
+            signature = self._pending.get(path, (None, None))[0]
+            self._pending[path] = (signature, time.time())
+
+    def scan(self):
+        """Mark every matching file in the directory that still needs to be uploaded as changed."""
+
+        for dir_path, dir_names, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                signature = _file_signature(path)
+                if signature and self._matches(path) and self.ledger.should_upload(path, signature):
+                    with self._lock:
+                        if path not in self._pending:
+                            self._pending[path] = (None, time.time())
+            if not self.recursive:
+                break
+
+    def requeue_failed(self):
+        """Mark every file in the directory whose failed upload is due to be retried as changed. (Files that do not
+        change again produce no notifications, so failed uploads are picked up from the ledger instead)"""
+
+        for path in self.ledger.due_retries():
+            in_directory = os.path.dirname(path) == self.directory or \
+                (self.recursive and path.startswith(os.path.join(self.directory, '')))
+            if in_directory and self._matches(path) and os.path.isfile(path):
+                with self._lock:
+                    if path not in self._pending:
+                        self._pending[path] = (None, time.time())
+
+    def process_settled(self):
+        """Upload every pending file that has stopped changing for the settle time. Any error raised while uploading a
+        file is recorded as a failed attempt in the ledger, so the file is retried once its contents change or its
+        retry delay has passed.
+
+        Returns:
+            int: The number of files an upload was attempted for.
+        """
+
+        now = time.time()
+        settled = []
+
+        with self._lock:
+            for path, (last_signature, changed_at) in list(self._pending.items()):
+                signature = _file_signature(path)
+                if signature is None:
+                    del self._pending[path]
+                elif signature != last_signature:
+                    self._pending[path] = (signature, now)
+                elif now - changed_at >= self.settle:
+                    del self._pending[path]
+                    settled.append((path, signature))
+
+        for path, signature in settled:
+            if not self.ledger.should_upload(path, signature):
+                continue
+
+            job_id, error = None, None
+            try:
+                job_id = self.upload(path)
+            except RuntimeError as e:
+                error = str(e)
+            except Exception as e:     # Neither a malformed file nor an unreachable API may stop the watcher.
+                error = 'Unexpected {}: {}'.format(type(e).__name__, e)
+
+            self.ledger.record(path, signature, job_id, error)
+            if self.on_result:
+                self.on_result(path, job_id, error)
+
+        return len(settled)
+
+    def run(self, stop_event=None):
+        """Watch the directory until the stop event is set.
+
+        Args:
+            stop_event (threading.Event): Set to stop watching. (None to watch forever)
+        """
+
+        stop_event = stop_event or threading.Event()
+        observer = None
+
+        if self.use_notifications:
+            observer = observers.Observer()
+            observer.schedule(_ChangeHandler(self), self.directory, recursive=self.recursive)
+            observer.start()
+
+        try:
+            self.scan()
+            while not stop_event.wait(self.poll_interval):
+                if observer is None:
+                    self.scan()
+                self.requeue_failed()
+                self.process_settled()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
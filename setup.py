@@ -13,6 +13,7 @@ with open('HISTORY.rst') as history_file:
 
 dependency_links = ['http://github.com/ryan-rs/qtest-swagger-client/tarball/master#egg=swagger-client-1.0.0']
 requirements = ['Click>=6.0', 'swagger-client']
+extras_requirements = {'watch': ['watchdog']}
 setup_requirements = ['pytest-runner']
 test_requirements = ['pytest']
 
@@ -24,10 +25,7 @@ setup(
         'Intended Audience :: Developers',
         'License :: OSI Approved :: Apache Software License',
         'Natural Language :: English',
-        "Programming Language :: Python :: 2",
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
         'Programming Language :: Python :: 3.6',
     ],
@@ -38,6 +36,7 @@ setup(
             'py_result_uploader=py_result_uploader.cli:main',
         ],
     },
+    extras_require=extras_requirements,
     install_requires=requirements,
     license="Apache Software License 2.0",
     long_description=readme + '\n\n' + history,
@@ -45,6 +44,7 @@ setup(
     keywords='py_result_uploader',
     name='py_result_uploader',
     packages=find_packages(include=['py_result_uploader']),
+    python_requires='>=3.5',
     setup_requires=setup_requirements,
     test_suite='tests',
     tests_require=test_requirements,
@@ -332,3 +332,212 @@ def bad_junit_root(tmpdir_factory):
         f.write(junit_xml)
 
     return filename
+
+
+@pytest.fixture(scope='session')
+def trailing_properties_xml(tmpdir_factory):
+    """JUnitXML sample representing passing tests with the "properties" element following the testcases."""
+
+    filename = tmpdir_factory.mktemp('data').join('trailing_properties.xml').strpath
+    junit_xml = \
+        """<?xml version="1.0" encoding="utf-8"?>
+        <testsuite errors="0" failures="0" name="pytest" skips="0" tests="2" time="0.007">
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+            name="test_pass1[ansible://localhost]" time="0.00372695922852"/>
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="12"
+            name="test_pass2[ansible://localhost]" time="0.00341415405273"/>
+            <properties>
+                <property name="GIT_REPO" value="Unknown"/>
+                <property name="GIT_BRANCH" value="Unknown"/>
+            </properties>
+        </testsuite>
+        """
+
+    with open(filename, 'w') as f:
+        f.write(junit_xml)
+
+    return filename
+
+
+@pytest.fixture(scope='session')
+def parametrized_mix_status_xml(tmpdir_factory):
+    """JUnitXML sample representing a parametrized test executed against several hosts with mixed results."""
+
+    filename = tmpdir_factory.mktemp('data').join('parametrized_mix_status.xml').strpath
+    junit_xml = \
+        """<?xml version="1.0" encoding="utf-8"?>
+        <testsuite errors="0" failures="1" name="pytest" skips="1" tests="5" time="0.019">
+            <properties>
+                <property name="GIT_REPO" value="Unknown"/>
+                <property name="GIT_BRANCH" value="Unknown"/>
+            </properties>
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+            name="test_host[ansible://host1]" time="0.00372695922852"/>
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+            name="test_host[ansible://host2]" time="0.00341415405273">
+                <failure message="assert False">assert False</failure>
+            </testcase>
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+            name="test_host[ansible://host3]" time="0.00335693359375">
+                <skipped message="unconditional skip" type="pytest.skip">skipped</skipped>
+            </testcase>
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="12"
+            name="test_skip[ansible://host1]" time="0.00197100639343">
+                <skipped message="unconditional skip" type="pytest.skip">skipped</skipped>
+            </testcase>
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="12"
+            name="test_skip[ansible://host2]" time="0.00208067893982"/>
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="16"
+            name="test_once[ansible://host1]" time="0.00208067893982"/>
+        </testsuite>
+        """
+
+    with open(filename, 'w') as f:
+        f.write(junit_xml)
+
+    return filename
+
+
+@pytest.fixture(scope='session')
+def multi_suite_xml(tmpdir_factory):
+    """JUnitXML sample representing three testsuites wrapped in a "testsuites" root element, each with its own
+    properties."""
+
+    filename = tmpdir_factory.mktemp('data').join('multi_suite.xml').strpath
+    junit_xml = \
+        """<?xml version="1.0" encoding="utf-8"?>
+        <!-- Merged by the test runner -->
+        <testsuites name="merged" tests="7">
+            <properties>
+                <property name="GIT_REPO" value="Unknown"/>
+                <property name="GIT_BRANCH" value="master"/>
+            </properties>
+            <testsuite errors="0" failures="1" name="pike" skips="0" tests="2" time="0.007">
+                <properties>
+                    <property name="GIT_BRANCH" value="pike"/>
+                </properties>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_pass[ansible://localhost]" time="0.00372695922852"/>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="12"
+                name="test_fail[ansible://localhost]" time="0.00341415405273">
+                    <failure message="assert False"><![CDATA[</testsuite><testsuite name="not a suite">]]></failure>
+                </testcase>
+            </testsuite>
+            <testsuite errors="0" failures="0" name="queens" skips="1" tests="3" time="0.005">
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_host[ansible://host1]" time="0.00372695922852"/>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_host[ansible://host2]" time="0.00341415405273">
+                    <skipped message="unconditional skip" type="pytest.skip">skipped</skipped>
+                </testcase>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="12"
+                name="test_pass[ansible://localhost]" time="0.00341415405273"/>
+                <properties>
+                    <property name="GIT_BRANCH" value="queens"/>
+                </properties>
+            </testsuite>
+            <testsuite errors="0" failures="0" name="empty" skips="0" tests="0" time="0.0"/>
+            <testsuite errors="0" failures="0" name="inherited" skips="0" tests="2" time="0.003">
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_host[ansible://host1]" time="0.00372695922852"/>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_host[ansible://host2]" time="0.00341415405273"/>
+            </testsuite>
+        </testsuites>
+        """
+
+    with open(filename, 'w') as f:
+        f.write(junit_xml)
+
+    return filename
+
+
+@pytest.fixture(scope='session')
+def repeated_failure_xml(tmpdir_factory):
+    """JUnitXML sample representing a parametrized test failing with the same traceback in two testsuites, next to a
+    test failing with a very long traceback."""
+
+    filename = tmpdir_factory.mktemp('data').join('repeated_failure.xml').strpath
+    traceback = 'def test_host(host):\n&gt;       assert host.run_test()\nE       AssertionError\n\n' \
+                'tests/test_default.py:8: AssertionError'
+    junit_xml = \
+        """<?xml version="1.0" encoding="utf-8"?>
+        <testsuites name="merged" tests="5">
+            <properties>
+                <property name="GIT_REPO" value="Unknown"/>
+                <property name="GIT_BRANCH" value="master"/>
+            </properties>
+            <testsuite errors="0" failures="3" name="pike" skips="0" tests="3" time="0.007">
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_host[ansible://host1]" time="0.00372695922852">
+                    <failure message="AssertionError" type="AssertionError">{0}</failure>
+                </testcase>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_host[ansible://host2]" time="0.00341415405273">
+                    <failure message="AssertionError" type="AssertionError">{0}</failure>
+                </testcase>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="12"
+                name="test_long[ansible://host1]" time="0.00341415405273">
+                    <error message="setup failure">{1}</error>
+                </testcase>
+            </testsuite>
+            <testsuite errors="0" failures="1" name="queens" skips="0" tests="2" time="0.005">
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_host[ansible://host3]" time="0.00372695922852">
+                    <failure message="AssertionError" type="AssertionError">{0}</failure>
+                </testcase>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="16"
+                name="test_pass[ansible://host1]" time="0.00341415405273"/>
+            </testsuite>
+        </testsuites>
+        """.format(traceback, 'start of traceback\n' + 'x' * 10000 + '\nend of traceback')
+
+    with open(filename, 'w') as f:
+        f.write(junit_xml)
+
+    return filename
+
+
+@pytest.fixture(scope='session')
+def large_suite_xml(tmpdir_factory):
+    """JUnitXML sample representing a single testsuite with many testcases, properties before, between and after the
+    testcases and markup quoted inside of comments and CDATA sections."""
+
+    filename = tmpdir_factory.mktemp('data').join('large_suite.xml').strpath
+    testcases = []
+    for i in range(40):
+        name = 'test_host[ansible://host{}]'.format(i % 4) if i % 2 else 'test_case{}[ansible://localhost]'.format(i)
+        if i % 5 == 1:
+            body = '<failure message="assert False"><![CDATA[</testcase></testsuite>]]></failure>'
+        elif i % 5 == 2:
+            body = '<error message="setup failure">def test_x():\n&gt;   raise RuntimeError</error>'
+        elif i % 5 == 3:
+            body = '<skipped message="unconditional skip" type="pytest.skip"/>' \
+                   '<properties><property name="GIT_BRANCH" value="not a suite property"/></properties>'
+        else:
+            body = ''
+        attributes = ' xsi:type="parametrized"' if i == 7 else ''     # Relies on the namespace of the root
+        testcases.append('<testcase classname="tests.test_default" name="{}" time="0.001"{}{}'
+                         .format(name, attributes, '>{}</testcase>'.format(body) if body else '/>'))
+        if i == 20:
+            testcases.append('<properties>\n<property name="GIT_REPO" value="Unknown"/>\n</properties>')
+        if i == 30:
+            testcases.append('<!-- <testcase name="test_commented[ansible://localhost]"/> -->')
+    junit_xml = \
+        """<?xml version="1.0" encoding="utf-8"?>
+        <testsuite xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" errors="8" failures="8" name="pytest"
+        skips="8" tests="40" time="0.04">
+            <properties>
+                <property name="GIT_BRANCH" value="master"/>
+            </properties>
+            {}
+            <properties>
+                <property name="TRAILING" value="true"/>
+            </properties>
+        </testsuite>
+        """.format('\n            '.join(testcases))
+
+    with open(filename, 'w') as f:
+        f.write(junit_xml)
+
+    return filename
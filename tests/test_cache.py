@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+from py_result_uploader import cache
+
+
+@pytest.fixture()
+def upload_cache(tmpdir):
+    upload_cache = cache.UploadCache(tmpdir.join('cache').strpath)
+    yield upload_cache
+    upload_cache.close()
+
+
+class TestHashFiles(object):
+    """Test cases for the 'hash_files' function"""
+
+    def test_content_addressed(self, tmpdir):
+        """Verify that files with identical contents produce the same digest regardless of their paths"""
+
+        # Setup
+        tmpdir.join('a.xml').write('<testsuite/>')
+        tmpdir.join('b.xml').write('<testsuite/>')
+        tmpdir.join('c.xml').write('<testsuite></testsuite>')
+
+        # Test
+        assert cache.hash_files([tmpdir.join('a.xml').strpath]) == cache.hash_files([tmpdir.join('b.xml').strpath])
+        assert cache.hash_files([tmpdir.join('a.xml').strpath]) != cache.hash_files([tmpdir.join('c.xml').strpath])
+
+    def test_order(self, tmpdir):
+        """Verify that the order of multiple files is significant"""
+
+        # Setup
+        tmpdir.join('a.xml').write('a')
+        tmpdir.join('b.xml').write('b')
+        paths = [tmpdir.join('a.xml').strpath, tmpdir.join('b.xml').strpath]
+
+        # Test
+        assert cache.hash_files(paths) != cache.hash_files(list(reversed(paths)))
+
+    def test_options(self, tmpdir):
+        """Verify that options which change the payload change the digest regardless of their order"""
+
+        # Setup
+        tmpdir.join('a.xml').write('a')
+        paths = [tmpdir.join('a.xml').strpath]
+
+        # Test
+        assert cache.hash_files(paths) != cache.hash_files(paths, {'aggregate': False})
+        assert cache.hash_files(paths, {'aggregate': False}) != cache.hash_files(paths, {'aggregate': True})
+        assert (cache.hash_files(paths, {'aggregate': True, 'delta': False}) ==
+                cache.hash_files(paths, {'delta': False, 'aggregate': True}))
+
+    def test_invalid_path(self):
+        """Verify that a missing file raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            cache.hash_files(['/path/does/not/exist'])
+
+
+class TestUploadCache(object):
+    """Test cases for the 'UploadCache' class"""
+
+    def test_round_trip(self, upload_cache):
+        """Verify that the job IDs of an upload are found again only for the same project and test cycle"""
+
+        # Setup
+        upload_cache.put('digest', 12345, 'CL-1', [101, 102])
+
+        # Test
+        assert [101, 102] == upload_cache.get('digest', 12345, 'CL-1')
+        assert upload_cache.get('digest', 12345, 'CL-2') is None
+        assert upload_cache.get('digest', 54321, 'CL-1') is None
+        assert upload_cache.get('other', 12345, 'CL-1') is None
+
+    def test_persistence(self, tmpdir):
+        """Verify that uploads are remembered across instances"""
+
+        # Setup
+        directory = tmpdir.join('cache').strpath
+        with cache.UploadCache(directory) as upload_cache:
+            upload_cache.put('digest', 12345, 'CL-1', [101])
+
+        # Test
+        with cache.UploadCache(directory) as upload_cache:
+            assert [101] == upload_cache.get('digest', 12345, 'CL-1')
+
+    def test_age_eviction(self, tmpdir, mocker):
+        """Verify that uploads older than the maximum age are forgotten and evicted"""
+
+        # Setup
+        mock_time = mocker.patch('py_result_uploader.cache.time.time', return_value=1000.0)
+        upload_cache = cache.UploadCache(tmpdir.strpath, max_age=60)
+        upload_cache.put('old', 12345, 'CL-1', [101])
+
+        # Test
+        mock_time.return_value = 1061.0
+        assert upload_cache.get('old', 12345, 'CL-1') is None
+        upload_cache.put('new', 12345, 'CL-1', [102])
+        assert 1 == len(upload_cache)
+        assert [102] == upload_cache.get('new', 12345, 'CL-1')
+
+    def test_size_eviction(self, tmpdir, mocker):
+        """Verify that the least recently used uploads are evicted once the cache is full"""
+
+        # Setup
+        mock_time = mocker.patch('py_result_uploader.cache.time.time', return_value=1000.0)
+        upload_cache = cache.UploadCache(tmpdir.strpath, max_entries=2)
+        upload_cache.put('first', 12345, 'CL-1', [101])
+        mock_time.return_value = 1001.0
+        upload_cache.put('second', 12345, 'CL-1', [102])
+        mock_time.return_value = 1002.0
+        upload_cache.get('first', 12345, 'CL-1')
+
+        # Test
+        mock_time.return_value = 1003.0
+        upload_cache.put('third', 12345, 'CL-1', [103])
+        assert 2 == len(upload_cache)
+        assert upload_cache.get('second', 12345, 'CL-1') is None
+        assert [101] == upload_cache.get('first', 12345, 'CL-1')
+        assert [103] == upload_cache.get('third', 12345, 'CL-1')
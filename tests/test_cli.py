@@ -4,8 +4,16 @@
 # ======================================================================================================================
 # Imports
 # ======================================================================================================================
+import os
+import sys
+import gzip
+import json
+import pytest
+import subprocess
 from click.testing import CliRunner
+from swagger_client.rest import ApiException
 from py_result_uploader import cli
+from py_result_uploader import serializer as ptu_serializer
 
 
 def test_cli_happy_path(single_passing_xml, mocker):
@@ -56,3 +64,641 @@ def test_cli_missing_api_token(single_passing_xml, mocker):
     assert 1 == result.exit_code
     assert 'The "QTEST_API_TOKEN" environment variable is not defined!' in result.output
     assert 'Failed!' in result.output
+
+
+def test_cli_stream(flat_mix_status_xml, mocker):
+    """Verify that the CLI will incrementally parse the input file when requested. (All uploading of test
+    results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--stream', flat_mix_status_xml, project_id, test_cycle]
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    mock_queue_resp = mocker.Mock(state='IN_WAITING', id=job_id)
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Queue Job ID: {}'.format(job_id) in result.output
+    assert 'Success!' in result.output
+
+
+def test_cli_batches(flat_all_passing_xml, mocker):
+    """Verify that the CLI will split the upload into batches and report every queue job ID. (All uploading of test
+    results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--batch-size', '2', '--workers', '1', flat_all_passing_xml, project_id, test_cycle]
+
+    # Expectation
+    job_ids = ['101', '102', '103']
+
+    # Mock
+    mock_queue_resps = [mocker.Mock(state='IN_WAITING', id=job_id) for job_id in job_ids]
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', side_effect=mock_queue_resps)
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    for index, job_id in enumerate(job_ids):
+        assert 'Batch {}/3'.format(index + 1) in result.output
+        assert 'Queue Job ID: {}'.format(job_id) in result.output
+    assert 'Success!' in result.output
+
+
+def test_cli_per_suite(multi_suite_xml, mocker):
+    """Verify that the CLI will upload the results of every testsuite in batches of their own. (All uploading of test
+    results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--per-suite', '--workers', '1', multi_suite_xml, project_id, test_cycle]
+
+    # Expectation
+    job_ids = ['101', '102', '103']
+
+    # Mock
+    mock_queue_resps = [mocker.Mock(state='IN_WAITING', id=job_id) for job_id in job_ids]
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', side_effect=mock_queue_resps)
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    for index, job_id in enumerate(job_ids):
+        assert 'Batch {}/3'.format(index + 1) in result.output
+        assert 'Queue Job ID: {}'.format(job_id) in result.output
+    assert 'Success!' in result.output
+
+
+def test_cli_multiple_files(flat_all_passing_xml, flat_mix_status_xml, mocker):
+    """Verify that the CLI will combine the results of multiple input files into a single upload. (All uploading of
+    test results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = [flat_all_passing_xml, flat_mix_status_xml, project_id, test_cycle]
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    mock_queue_resp = mocker.Mock(state='IN_WAITING', id=job_id)
+    mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                               return_value=mock_queue_resp)
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Input Files: 2' in result.output
+    assert 'Queue Job ID: {}'.format(job_id) in result.output
+    assert 'Success!' in result.output
+    assert 1 == mock_submit.call_count
+    assert 9 == len(mock_submit.call_args[1]['body'].test_logs)
+
+
+def test_cli_no_matching_files(mocker):
+    """Verify that the CLI will gracefully fail if an input path does not match any files."""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['/path/does/not/exist/*.xml', project_id, test_cycle]
+
+    # Mock
+    mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0')
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 1 == result.exit_code
+    assert 'does not match any JUnitXML results files!' in result.output
+    assert 'Failed!' in result.output
+    assert not mock_submit.called
+
+
+def test_cli_wait(single_passing_xml, mocker):
+    """Verify that the CLI will wait for qTest to finish processing the upload when requested. (All uploading of
+    test results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--wait', single_passing_xml, project_id, test_cycle]
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    mock_queue_resp = mocker.Mock(state='IN_WAITING', id=job_id)
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS', id=job_id))
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Queue Job ID {}: SUCCESS'.format(job_id) in result.output
+    assert 'Success!' in result.output
+
+
+def test_cli_wait_job_failure(single_passing_xml, mocker):
+    """Verify that the CLI will gracefully fail if qTest fails to process the upload while waiting. (All uploading
+    of test results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--wait', single_passing_xml, project_id, test_cycle]
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    mock_queue_resp = mocker.Mock(state='IN_WAITING', id=job_id)
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='FAILED', id=job_id))
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 1 == result.exit_code
+    assert 'The qTest API failed to process the job!' in result.output
+    assert 'Failed!' in result.output
+
+
+def test_cli_watch_missing_api_token(tmpdir):
+    """Verify that the watch command will gracefully fail if the expected API token env var is not set."""
+
+    # Setup
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['watch', tmpdir.strpath, project_id, test_cycle]
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments)
+    assert 1 == result.exit_code
+    assert 'The "QTEST_API_TOKEN" environment variable is not defined!' in result.output
+    assert 'Failed!' in result.output
+
+
+def test_cli_chunked(single_passing_xml, mocker):
+    """Verify that the CLI will send the upload with a chunked request body. (All uploading of test results has been
+    mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--chunked', single_passing_xml, project_id, test_cycle]
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    mock_submit = mocker.patch('py_result_uploader.py_result_uploader.submit_chunked',
+                               return_value=mocker.Mock(state='IN_WAITING', id=job_id))
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Queue Job ID: {}'.format(job_id) in result.output
+    assert 'Success!' in result.output
+    assert 1 == mock_submit.call_count
+
+
+def test_cli_compress(single_passing_xml, mocker):
+    """Verify that the CLI will compress the upload and report the compression ratio. (All uploading of test results
+    has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--compress', 'gzip', '--compress-level', '9', single_passing_xml, project_id, test_cycle]
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    mock_report = ptu_serializer.CompressionReport('gzip', 1000, 100)
+    mock_submit = mocker.patch('py_result_uploader.py_result_uploader.submit_compressed',
+                               return_value=(mocker.Mock(state='IN_WAITING', id=job_id), mock_report))
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Compression: gzip 1000 -> 100 bytes (10.0x, 900 bytes saved)' in result.output
+    assert 'Queue Job ID: {}'.format(job_id) in result.output
+    assert ('gzip', 9, False) == mock_submit.call_args[0][3:]
+
+
+def test_cli_aggregate(parametrized_mix_status_xml, mocker):
+    """Verify that the CLI will collapse parametrized test results into a single test log. (All uploading of test
+    results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--aggregate', parametrized_mix_status_xml, project_id, test_cycle]
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                               return_value=mocker.Mock(state='IN_WAITING', id=job_id))
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Success!' in result.output
+    assert 3 == len(mock_submit.call_args[1]['body'].test_logs)
+
+
+def test_cli_upload_cache(single_passing_xml, tmpdir, mocker):
+    """Verify that the CLI will skip uploading results that were already uploaded to the same test cycle. (All
+    uploading of test results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--cache-dir', tmpdir.join('cache').strpath, single_passing_xml, project_id, test_cycle]
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                               return_value=mocker.Mock(state='IN_WAITING', id=job_id))
+    mock_parse = mocker.spy(cli.ptu, '_build_auto_request')
+
+    # Test
+    first = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    second = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    third = runner.invoke(cli.main, args=cli_arguments[:-1] + ['CL-2'], env=env_vars)
+    fourth = runner.invoke(cli.main, args=['--aggregate'] + cli_arguments, env=env_vars)
+    assert 0 == first.exit_code == second.exit_code == third.exit_code == fourth.exit_code
+    assert 'already uploaded' not in first.output
+    assert 'already uploaded' in second.output
+    assert 'Queue Job ID: {}'.format(job_id) in second.output
+    assert 'already uploaded' not in fourth.output
+    assert 3 == mock_submit.call_count
+    assert 3 == mock_parse.call_count
+
+
+def test_cli_delta(flat_mix_status_xml, tmpdir, mocker):
+    """Verify that the CLI will only send changed test logs in delta mode and report what was skipped. (All
+    uploading of test results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--delta', '--snapshot-dir', tmpdir.strpath, flat_mix_status_xml, project_id, test_cycle]
+
+    # Mock
+    mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                               return_value=mocker.Mock(state='IN_WAITING', id='54321'))
+
+    # Test
+    first = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    second = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    third = runner.invoke(cli.main, args=['--force-full'] + cli_arguments, env=env_vars)
+    assert 0 == first.exit_code == second.exit_code == third.exit_code
+    assert 'Delta: 4 new or changed test logs sent, 0 unchanged test logs skipped' in first.output
+    assert 'Delta: 0 new or changed test logs sent, 4 unchanged test logs skipped' in second.output
+    assert 'nothing was uploaded' in second.output
+    assert 'Delta: 4 new or changed test logs sent, 0 unchanged test logs skipped' in third.output
+    assert 2 == mock_submit.call_count
+
+
+def test_cli_delta_job_failure(flat_mix_status_xml, tmpdir, mocker):
+    """Verify that the CLI will forget the submitted statuses in delta mode when qTest fails to process the job so
+    that the next upload sends every test log again. (All uploading of test results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+
+    runner = CliRunner()
+    cli_arguments = ['--delta', '--wait', '--snapshot-dir', tmpdir.strpath, flat_mix_status_xml, project_id,
+                     test_cycle]
+
+    # Mock
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                 return_value=mocker.Mock(state='IN_WAITING', id='54321'))
+    mocker.patch('swagger_client.TestlogApi.track', side_effect=[mocker.Mock(state='FAILED', id='54321'),
+                                                                 mocker.Mock(state='SUCCESS', id='54321')])
+
+    # Test
+    first = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    second = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 1 == first.exit_code
+    assert 0 == second.exit_code
+    assert 'Delta: 4 new or changed test logs sent, 0 unchanged test logs skipped' in second.output
+
+
+@pytest.mark.parametrize('option', [['--delta'],
+                                    ['--force-full'],
+                                    ['--chunked'],
+                                    ['--compress', 'gzip'],
+                                    ['--per-suite'],
+                                    ['--latency-target', '0'],
+                                    ['--metrics-json', 'metrics.json'],
+                                    ['--metrics-prom', 'metrics.prom']])
+def test_cli_spool_unsupported_options(option, flat_all_passing_xml, tmpdir, mocker):
+    """Verify that the CLI rejects options a spooled upload does not support instead of silently ignoring them.
+    (All uploading of test results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    runner = CliRunner()
+    option = [tmpdir.join(o).strpath if o.startswith('metrics.') else o for o in option]
+    cli_arguments = ['--spool-dir', tmpdir.join('spool').strpath] + option + [flat_all_passing_xml, '12345', 'CL-1']
+
+    # Mock
+    mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0')
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 2 == result.exit_code
+    assert not os.path.exists(option[-1])
+    assert '"--spool-dir" cannot be combined with {}'.format(option[0]) in result.output
+    assert not mock_submit.called
+
+
+def test_cli_spool_and_resume(flat_all_passing_xml, tmpdir, mocker):
+    """Verify that an interrupted spooled upload can be finished with the resume command. (All uploading of test
+    results has been mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+    spool_dir = tmpdir.join('spool').strpath
+
+    runner = CliRunner()
+    cli_arguments = ['--spool-dir', spool_dir, '--batch-size', '2', '--workers', '1', '--max-retries', '0',
+                     flat_all_passing_xml, project_id, test_cycle]
+
+    # Mock
+    mocker.patch('py_result_uploader.py_result_uploader.submit_serialized',
+                 side_effect=[mocker.Mock(state='IN_WAITING', id='101'),
+                              mocker.Mock(state='IN_WAITING', id='102'),
+                              ApiException('Super duper failure!'),
+                              mocker.Mock(state='IN_WAITING', id='103')])
+
+    # Test
+    interrupted = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 1 == interrupted.exit_code
+    assert 'run "resume {}"'.format(spool_dir) in interrupted.output
+
+    resumed = runner.invoke(cli.main, args=['resume', spool_dir], env=env_vars)
+    assert 0 == resumed.exit_code
+    assert 'Pending Batches: 1/3' in resumed.output
+    assert 'Batch 3/3: 1 test logs' in resumed.output
+    assert 'Queue Job ID: 103' in resumed.output
+
+    nothing_left = runner.invoke(cli.main, args=['resume', spool_dir], env=env_vars)
+    assert 0 == nothing_left.exit_code
+    assert 'No spooled uploads to resume.' in nothing_left.output
+
+
+def test_cli_metrics(flat_mix_status_xml, tmpdir, mocker):
+    """Verify that the CLI will export the metrics of every upload phase. (All uploading of test results has been
+    mocked)"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    project_id = '12345'
+    test_cycle = 'CL-1'
+    metrics_json = tmpdir.join('metrics.json').strpath
+    metrics_prom = tmpdir.join('metrics.prom').strpath
+
+    runner = CliRunner()
+    cli_arguments = ['--metrics-json', metrics_json, '--metrics-prom', metrics_prom, '--wait',
+                     flat_mix_status_xml, project_id, test_cycle]
+
+    # Mock
+    mocker.patch('py_result_uploader.py_result_uploader.submit_serialized',
+                 return_value=mocker.Mock(state='IN_WAITING', id='54321'))
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS'))
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+
+    with open(metrics_json) as f:
+        spans = json.load(f)['spans']
+    assert ['parse', 'build', 'serialize', 'submit', 'queue'] == [span['name'] for span in spans]
+    assert 4 == spans[1]['cases']
+
+    with open(metrics_prom) as f:
+        assert 'py_result_uploader_phase_cases{phase="queue"} 1' in f.read().splitlines()
+
+
+def test_cli_convert(flat_mix_status_xml, tmpdir):
+    """Verify that the CLI will convert results to JSON or NDJSON without contacting qTest"""
+
+    # Setup
+    runner = CliRunner()
+    output = tmpdir.join('results.json')
+
+    # Test
+    result = runner.invoke(cli.main, args=['convert', '--output', output.strpath, flat_mix_status_xml, 'CL-1'])
+    assert 0 == result.exit_code
+    assert 4 == len(json.loads(output.read())['test_logs'])
+
+    result = runner.invoke(cli.main, args=['convert', '--format', 'ndjson', '--stream', flat_mix_status_xml, 'CL-1'])
+    assert 0 == result.exit_code
+    assert 4 == len([line for line in result.output.splitlines() if line.startswith('{')])
+    assert 'Converted 4 test logs from 1 input files.' in result.output
+
+
+def test_cli_convert_output_mode(flat_mix_status_xml, tmpdir):
+    """Verify that the output file gets the mode of the file it replaces or the default mode for new files"""
+
+    # Setup
+    runner = CliRunner()
+    output = tmpdir.join('results.json')
+    args = ['convert', '--output', output.strpath, flat_mix_status_xml, 'CL-1']
+    umask = os.umask(0o022)
+
+    # Test
+    try:
+        assert 0 == runner.invoke(cli.main, args=args).exit_code
+        assert 0o644 == output.stat().mode & 0o777
+
+        output.chmod(0o640)
+        assert 0 == runner.invoke(cli.main, args=args).exit_code
+        assert 0o640 == output.stat().mode & 0o777
+    finally:
+        os.umask(umask)
+
+
+def test_cli_convert_shard_bytes(large_suite_xml):
+    """Verify that the CLI produces the same test logs whether a large file is sharded or not"""
+
+    # Setup
+    runner = CliRunner()
+    args = ['convert', '--format', 'ndjson', '--processes', '2', large_suite_xml, 'CL-1']
+
+    # Test
+    sharded = runner.invoke(cli.main, args=args[:1] + ['--shard-bytes', '500'] + args[1:])
+    whole = runner.invoke(cli.main, args=args[:1] + ['--shard-bytes', '0'] + args[1:])
+    assert 0 == sharded.exit_code == whole.exit_code
+    assert ([json.loads(line)['name'] for line in whole.output.splitlines() if line.startswith('{')] ==
+            [json.loads(line)['name'] for line in sharded.output.splitlines() if line.startswith('{')])
+    assert 'Converted 40 test logs from 1 input files.' in sharded.output
+
+
+def test_cli_convert_failure_details(repeated_failure_xml):
+    """Verify that the CLI records failure details in the test log notes when requested"""
+
+    # Setup
+    runner = CliRunner()
+    args = ['convert', '--format', 'ndjson', repeated_failure_xml, 'CL-1']
+
+    # Test
+    result = runner.invoke(cli.main, args=args)
+    assert 0 == result.exit_code
+    assert 'traceback' not in result.output
+
+    result = runner.invoke(cli.main, args=args[:1] + ['--failure-details', '--failure-details-size', '100'] + args[1:])
+    notes = [json.loads(line).get('note') for line in result.output.splitlines() if line.startswith('{')]
+    assert 0 == result.exit_code
+    assert 4 == len([note for note in notes if note])
+    assert '[9936 characters truncated]' in notes[2]
+
+
+def test_cli_convert_failure(bad_xml, tmpdir):
+    """Verify that a failed conversion does not leave a partial output file behind"""
+
+    # Setup
+    runner = CliRunner()
+    output = tmpdir.join('results.json')
+
+    # Test
+    result = runner.invoke(cli.main, args=['convert', '--stream', '--output', output.strpath, bad_xml, 'CL-1'])
+    assert 1 == result.exit_code
+    assert 'Failed!' in result.output
+    assert [] == tmpdir.listdir()
+
+
+def test_cli_convert_stdin(flat_mix_status_xml, tmpdir):
+    """Verify that the CLI reads compressed results piped in on stdin and refuses to cache them"""
+
+    # Setup
+    runner = CliRunner()
+    with open(flat_mix_status_xml, 'rb') as f:
+        data = gzip.compress(f.read())
+
+    # Test
+    result = runner.invoke(cli.main, args=['convert', '--format', 'ndjson', '-', 'CL-1'], input=data)
+    assert 0 == result.exit_code
+    assert 'Converted 4 test logs from 1 input files.' in result.output
+
+    result = runner.invoke(cli.main,
+                           args=['upload', '--cache-dir', tmpdir.strpath, '-', '12345', 'CL-1'],
+                           input=data,
+                           env={cli.API_TOKEN_ENV_VAR: 'token'})
+    assert 1 == result.exit_code
+    assert '--cache-dir' in result.output
+
+
+def test_cli_preflight(single_passing_xml, tmpdir, mocker):
+    """Verify that the CLI fails before uploading anything when the test cycle does not exist"""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    runner = CliRunner()
+    args = ['upload', '--preflight', '--cache-dir', tmpdir.strpath, single_passing_xml, '12345']
+
+    # Mock
+    mocker.patch('swagger_client.ProjectApi.get_project')
+    mock_test_cycles = mocker.patch('swagger_client.TestcycleApi.get_test_cycles',
+                                    return_value=[mocker.Mock(pid='CL-1', id=1, test_cycles=None)])
+    mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                               return_value=mocker.Mock(state='IN_WAITING', id='54321'))
+
+    # Test
+    result = runner.invoke(cli.main, args=args + ['CL-2'], env=env_vars)
+    assert 1 == result.exit_code
+    assert 'The test cycle "CL-2" does not exist' in result.output
+    assert not mock_submit.called
+
+    result = runner.invoke(cli.main, args=args + ['CL-1'], env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Pre-flight: test cycle CL-1 found in project 12345 (cached).' in result.output
+    assert 1 == mock_test_cycles.call_count
+    assert mock_submit.called
+
+
+def test_cli_startup_imports(tmpdir):
+    """Verify that showing help or failing validation never imports the swagger client or other heavy modules"""
+
+    # Setup
+    code = '\n'.join(['import sys',
+                      'from py_result_uploader.cli import main',
+                      'for args in (["--help"], ["upload", "--help"], ["{}", "12345", "CL-1"]):',
+                      '    try:',
+                      '        main(args)',
+                      '    except SystemExit:',
+                      '        pass',
+                      'heavy = ("swagger_client", "urllib3", "asyncio", "multiprocessing", "sqlite3", "lxml")',
+                      'sys.stderr.write(",".join(m for m in heavy if m in sys.modules))'])
+
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(cli.__file__)))
+    env = {k: v for k, v in os.environ.items() if k != cli.API_TOKEN_ENV_VAR}
+    env['PYTHONPATH'] = os.pathsep.join([package_root] + [p for p in [os.environ.get('PYTHONPATH')] if p])
+
+    # Test
+    process = subprocess.run([sys.executable, '-c', code.format(tmpdir.join('missing.xml').strpath)],
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE,
+                             env=env)
+    assert b'Usage' in process.stdout
+    assert b'' == process.stderr
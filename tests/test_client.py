@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import swagger_client
+from py_result_uploader import client
+
+
+class TestQTestApiClient(object):
+    """Test cases for the 'QTestApiClient' class"""
+
+    def test_authorization(self):
+        """Verify that requests are authorized with the token owned by the client rather than the global config"""
+
+        # Setup
+        swagger_client.configuration.api_key['Authorization'] = 'global_token'
+        api_client = client.QTestApiClient('client_token')
+        headers = {}
+
+        # Test
+        try:
+            api_client.update_params_for_auth(headers, [], ['Authorization'])
+            assert {'Authorization': 'client_token'} == headers
+        finally:
+            swagger_client.configuration.api_key.pop('Authorization')
+
+    def test_unauthenticated_request(self):
+        """Verify that requests without authentication settings are not given a token"""
+
+        # Setup
+        api_client = client.QTestApiClient('client_token')
+        headers = {}
+
+        # Test
+        api_client.update_params_for_auth(headers, [], [])
+        assert {} == headers
+
+    def test_independent_clients(self):
+        """Verify that clients for different tokens and hosts do not share configuration or connection pools"""
+
+        # Setup
+        client_a = client.QTestApiClient('token_a', host='https://a.qtestnet.com/', pool_size=2)
+        client_b = client.QTestApiClient('token_b', host='https://b.qtestnet.com', pool_size=16)
+
+        # Test
+        assert 'https://a.qtestnet.com' == client_a.host
+        assert 'https://b.qtestnet.com' == client_b.host
+        assert 'token_a' == client_a.api_token
+        assert 'token_b' == client_b.api_token
+        assert client_a.rest_client.pool_manager is not client_b.rest_client.pool_manager
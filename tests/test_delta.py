@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+from collections import namedtuple
+from py_result_uploader import delta
+
+FakeTestLog = namedtuple('FakeTestLog', ['automation_content', 'status'])
+
+
+@pytest.fixture()
+def snapshot(tmpdir):
+    snapshot = delta.StatusSnapshot(tmpdir.join('state').strpath)
+    yield snapshot
+    snapshot.close()
+
+
+class TestStatusSnapshot(object):
+    """Test cases for the 'StatusSnapshot' class"""
+
+    def test_empty(self, snapshot):
+        """Verify that every test log is considered changed before anything was recorded"""
+
+        # Setup
+        test_logs = [FakeTestLog('BRANCH#test_a', 'PASSED'), FakeTestLog('BRANCH#test_b', 'FAILED')]
+
+        # Test
+        assert test_logs == snapshot.changed(12345, 'CL-1', test_logs)
+
+    def test_changed(self, snapshot):
+        """Verify that only new test logs and test logs with a different status are selected"""
+
+        # Setup
+        snapshot.record(12345, 'CL-1', [FakeTestLog('BRANCH#test_a', 'PASSED'), FakeTestLog('BRANCH#test_b', 'PASSED')])
+        test_logs = [FakeTestLog('BRANCH#test_a', 'PASSED'),
+                     FakeTestLog('BRANCH#test_b', 'FAILED'),
+                     FakeTestLog('BRANCH#test_c', 'PASSED')]
+
+        # Test
+        assert test_logs[1:] == snapshot.changed(12345, 'CL-1', test_logs)
+
+    def test_shared_automation_content(self, snapshot):
+        """Verify that test logs sharing an automation content are compared and selected as a group so that an
+        unchanged failing parameter is never dropped while a passing one is sent"""
+
+        # Setup
+        test_logs = [FakeTestLog('BRANCH#test_x', 'PASSED'),
+                     FakeTestLog('BRANCH#test_x', 'FAILED'),
+                     FakeTestLog('BRANCH#test_y', 'PASSED')]
+        snapshot.record(12345, 'CL-1', test_logs)
+        flipped = [FakeTestLog('BRANCH#test_x', 'PASSED'),
+                   FakeTestLog('BRANCH#test_x', 'PASSED'),
+                   FakeTestLog('BRANCH#test_y', 'PASSED')]
+
+        # Test
+        assert [] == snapshot.changed(12345, 'CL-1', test_logs)
+        assert flipped[:2] == snapshot.changed(12345, 'CL-1', flipped)
+
+    def test_forget(self, snapshot):
+        """Verify that forgetting a test cycle selects every test log again without affecting other test cycles"""
+
+        # Setup
+        test_logs = [FakeTestLog('BRANCH#test_a', 'PASSED')]
+        snapshot.record(12345, 'CL-1', test_logs)
+        snapshot.record(12345, 'CL-2', test_logs)
+
+        # Test
+        snapshot.forget(12345, 'CL-1')
+        assert test_logs == snapshot.changed(12345, 'CL-1', test_logs)
+        assert [] == snapshot.changed(12345, 'CL-2', test_logs)
+
+    def test_scoped_by_cycle(self, snapshot):
+        """Verify that statuses recorded for one project and test cycle do not affect another"""
+
+        # Setup
+        test_logs = [FakeTestLog('BRANCH#test_a', 'PASSED')]
+        snapshot.record(12345, 'CL-1', test_logs)
+
+        # Test
+        assert [] == snapshot.changed(12345, 'CL-1', test_logs)
+        assert test_logs == snapshot.changed(12345, 'CL-2', test_logs)
+        assert test_logs == snapshot.changed(54321, 'CL-1', test_logs)
+
+    def test_persistence(self, tmpdir):
+        """Verify that recorded statuses survive across instances"""
+
+        # Setup
+        directory = tmpdir.join('state').strpath
+        test_logs = [FakeTestLog('BRANCH#test_a', 'PASSED')]
+        with delta.StatusSnapshot(directory) as snapshot:
+            snapshot.record(12345, 'CL-1', test_logs)
+
+        # Test
+        with delta.StatusSnapshot(directory) as snapshot:
+            assert [] == snapshot.changed(12345, 'CL-1', test_logs)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import xml.etree.ElementTree as Etree
+from py_result_uploader import failures
+from py_result_uploader.records import CompactTestLog
+
+
+def _test_log(note, detail_digest, name='test_host'):
+    return CompactTestLog(name, 'FAILED', 'master', 'now', 'now', 'master#{}'.format(name), note, detail_digest)
+
+
+class TestTruncateDetail(object):
+    """Test cases for the 'truncate_detail' function"""
+
+    def test_short(self):
+        """Verify that details within the limit are left untouched"""
+
+        # Test
+        assert 'assert False' == failures.truncate_detail('assert False', 12)
+
+    def test_long(self):
+        """Verify that the middle of a long detail is cut out while the start and end are kept"""
+
+        # Setup
+        truncated = failures.truncate_detail('start' + 'x' * 1000 + 'end', 10)
+
+        # Test
+        assert truncated.startswith('start')
+        assert truncated.endswith('xxend')
+        assert '[998 characters truncated]' in truncated
+
+
+class TestFailureDetails(object):
+    """Test cases for the 'FailureDetails' class"""
+
+    def test_describe(self):
+        """Verify that the message, type and traceback of a failure are described along with the traceback digest"""
+
+        # Setup
+        details = failures.FailureDetails()
+        tc_xml = Etree.fromstring('<testcase name="test_x"><failure message="assert False" type="AssertionError">'
+                                  '\ntests/test_default.py:18: AssertionError\n</failure></testcase>')
+
+        # Test
+        note, digest = details.describe(tc_xml)
+        assert failures.DIGEST_LENGTH == len(digest)
+        assert ['Failure (AssertionError): assert False',
+                '[traceback {}]'.format(digest),
+                'tests/test_default.py:18: AssertionError'] == note.splitlines()
+
+    def test_describe_without_traceback(self):
+        """Verify that skipped and passing tests without a traceback are described without a digest"""
+
+        # Setup
+        details = failures.FailureDetails()
+
+        # Test
+        assert ('Skipped: unconditional skip', None) == \
+            details.describe(Etree.fromstring('<testcase><skipped message="unconditional skip"/></testcase>'))
+        assert (None, None) == details.describe(Etree.fromstring('<testcase/>'))
+
+    def test_describe_truncated(self):
+        """Verify that long messages and tracebacks are truncated"""
+
+        # Setup
+        details = failures.FailureDetails(max_size=100)
+        tc_xml = Etree.fromstring('<testcase><error message="{0}">{0}</error></testcase>'.format('x' * 1000))
+
+        # Test
+        note, digest = details.describe(tc_xml)
+        assert 2 == note.count('[900 characters truncated]')
+        assert len(note) < 400
+
+    def test_dedupe(self):
+        """Verify that only the first test log with a traceback records it and later ones reference it"""
+
+        # Setup
+        details = failures.FailureDetails()
+        tc_xml = Etree.fromstring('<testcase><failure message="assert False">Traceback</failure></testcase>')
+        first = _test_log(*details.describe(tc_xml), name='test_first')
+        second = _test_log(*details.describe(tc_xml), name='test_second')
+        unrelated = _test_log('Skipped', None)
+
+        # Test
+        assert first is details.dedupe(first)
+        assert first.note.endswith('Traceback')
+        details.dedupe(second)
+        assert ['Failure: assert False',
+                '[traceback {} is recorded in full with the first failure of "master#test_first"]'
+                .format(second.detail_digest)] == second.note.splitlines()
+        assert 'Skipped' == details.dedupe(unrelated).note
+
+    def test_dedupe_separately_built(self):
+        """Verify that references made by another instance are pointed at the first test log seen by this one"""
+
+        # Setup
+        tc_xml = Etree.fromstring('<testcase><failure message="assert False">Traceback</failure></testcase>')
+        first_details = failures.FailureDetails()
+        second_details = failures.FailureDetails()
+        first = first_details.dedupe(_test_log(*first_details.describe(tc_xml), name='test_first'))
+        second = second_details.dedupe(_test_log(*second_details.describe(tc_xml), name='test_second'))
+        third = second_details.dedupe(_test_log(*second_details.describe(tc_xml), name='test_third'))
+        merged_details = failures.FailureDetails()
+
+        # Test
+        for test_log in (first, second, third):
+            merged_details.dedupe(test_log)
+        assert first.note.endswith('Traceback')
+        assert second.note == third.note
+        assert second.note.endswith('"master#test_first"]')
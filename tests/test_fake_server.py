@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import json
+import pytest
+from py_result_uploader.py_result_uploader import QTestUploader
+from py_result_uploader.polling import poll_jobs
+from py_result_uploader.fake_server import FakeQTestServer, DROP_CONNECTION
+
+
+@pytest.fixture()
+def fake_server():
+    with FakeQTestServer(retry_after=0) as server:
+        yield server
+
+
+class TestFakeQTestServer(object):
+    """End-to-end test cases for uploads through the real HTTP path against the 'FakeQTestServer'"""
+
+    def test_upload(self, fake_server, flat_mix_status_xml):
+        """Verify that an upload is captured with its decoded body and authorization"""
+
+        # Test
+        with QTestUploader('valid_token', fake_server.url) as uploader:
+            job_id = uploader.upload_test_results(flat_mix_status_xml, 12345, 'CL-1')
+
+        assert 1 == job_id
+        assert 1 == len(fake_server.submissions)
+
+        submission = fake_server.submissions[0]
+        assert '/api/v3/projects/12345/auto-test-logs' == submission.path
+        assert 'valid_token' == submission.headers['Authorization']
+        assert 4 == len(json.loads(submission.body.decode('utf-8'))['test_logs'])
+        assert 4 == fake_server.jobs[job_id].test_log_count
+
+    @pytest.mark.parametrize('compression', ['gzip', 'deflate'])
+    @pytest.mark.parametrize('chunked', [False, True])
+    def test_encoded_upload(self, fake_server, flat_mix_status_xml, compression, chunked):
+        """Verify that compressed and chunked request bodies are decoded"""
+
+        # Test
+        with QTestUploader('valid_token', fake_server.url) as uploader:
+            uploader.upload_test_results(flat_mix_status_xml, 12345, 'CL-1', chunked=chunked, compression=compression)
+
+        assert compression == fake_server.submissions[0].headers['Content-Encoding']
+        assert 4 == fake_server.jobs[1].test_log_count
+
+    def test_rejected_compression(self, flat_mix_status_xml):
+        """Verify that an upload falls back to an uncompressed body when compression is rejected"""
+
+        # Setup
+        reports = []
+
+        # Test
+        with FakeQTestServer(reject_compression=True) as server:
+            with QTestUploader('valid_token', server.url) as uploader:
+                uploader.upload_test_results(flat_mix_status_xml, 12345, 'CL-1', compression='gzip',
+                                             on_compression=reports.append)
+
+            assert [415, 201] == [r.status for r in server.requests]
+            assert 'Content-Encoding' not in server.submissions[0].headers
+            assert reports[0].content_encoding is None
+
+    def test_injected_errors_are_retried(self, fake_server, flat_mix_status_xml):
+        """Verify that transient failures are retried until the upload is accepted"""
+
+        # Setup
+        fake_server.inject_errors(429, 503)
+
+        # Test
+        with QTestUploader('valid_token', fake_server.url) as uploader:
+            job_id = uploader.upload_test_results(flat_mix_status_xml, 12345, 'CL-1')
+
+        assert 1 == job_id
+        assert [429, 503, 201] == [r.status for r in fake_server.requests]
+
+    def test_dropped_connection_is_retried(self, fake_server, flat_mix_status_xml):
+        """Verify that a connection dropped without a response is retried until the upload is accepted"""
+
+        # Setup
+        fake_server.inject_errors(DROP_CONNECTION)
+
+        # Test
+        with QTestUploader('valid_token', fake_server.url) as uploader:
+            job_id = uploader.upload_test_results(flat_mix_status_xml, 12345, 'CL-1')
+
+        assert 1 == job_id
+        assert [DROP_CONNECTION, 201] == [r.status for r in fake_server.requests]
+
+    def test_retry_after(self, flat_mix_status_xml, mocker):
+        """Verify that the "Retry-After" header sent with injected failures is honored between retries"""
+
+        # Mock
+        mock_sleep = mocker.patch('py_result_uploader.submission.time.sleep')
+
+        # Test
+        with FakeQTestServer(retry_after=7) as server:
+            server.inject_errors(429, 503)
+            with QTestUploader('valid_token', server.url) as uploader:
+                uploader.upload_test_results(flat_mix_status_xml, 12345, 'CL-1')
+
+            assert [429, 503, 201] == [r.status for r in server.requests]
+
+        assert [mocker.call(7.0), mocker.call(7.0)] == mock_sleep.call_args_list
+
+    def test_injected_errors_exhaust_retries(self, fake_server, flat_mix_status_xml):
+        """Verify that an upload fails once the transient failures outlast the retries"""
+
+        # Setup
+        fake_server.inject_errors(503, 503, 503)
+
+        # Test
+        with QTestUploader('valid_token', fake_server.url) as uploader:
+            with pytest.raises(RuntimeError):
+                uploader.upload_test_results(flat_mix_status_xml, 12345, 'CL-1', max_retries=2)
+
+        assert not fake_server.jobs
+
+    def test_concurrent_batches(self, flat_mix_status_xml):
+        """Verify that concurrent batches survive randomly injected failures"""
+
+        # Test
+        with FakeQTestServer(latency=0.01, error_rate=0.3, retry_after=0, seed=0) as server:
+            with QTestUploader('valid_token', server.url) as uploader:
+                reports = uploader.upload_test_results_in_batches(flat_mix_status_xml, 12345, 'CL-1',
+                                                                  max_logs=1, workers=4, max_retries=20)
+
+            assert [None] * 4 == [r.error for r in reports]
+            assert 4 == len(server.submissions)
+            assert 4 == sum(job.test_log_count for job in server.jobs.values())
+
+    def test_queue_processing(self, flat_mix_status_xml):
+        """Verify that submitted jobs move through the queue to a terminal state"""
+
+        # Test
+        with FakeQTestServer(processing_time=0.2, failed_job_rate=1.0) as server:
+            with QTestUploader('valid_token', server.url) as uploader:
+                job_id = uploader.upload_test_results(flat_mix_status_xml, 12345, 'CL-1')
+                assert 'IN_WAITING' == uploader.auto_api.track(id=job_id).state
+
+                reports = poll_jobs(lambda j: uploader.auto_api.track(id=j), [job_id], 5, initial_delay=0.05)
+
+            assert 'FAILED' == reports[0].state
+            assert reports[0].polls > 1
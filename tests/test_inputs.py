@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import io
+import bz2
+import sys
+import gzip
+import lzma
+import pytest
+from py_result_uploader import inputs
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+CONTENTS = b'<?xml version="1.0" encoding="utf-8"?><testsuite/>'
+COMPRESSORS = {'gzip': gzip.compress, 'bzip2': bz2.compress, 'xz': lzma.compress}
+
+
+class TestDetectCompression(object):
+    """Test cases for the 'detect_compression' and 'is_compressed' functions"""
+
+    @pytest.mark.parametrize('compression', sorted(COMPRESSORS))
+    def test_compressed(self, compression, tmpdir):
+        """Verify that every supported format is recognized by its magic bytes regardless of the file name"""
+
+        # Setup
+        data = COMPRESSORS[compression](CONTENTS)
+        file_path = tmpdir.join('results.xml')
+        file_path.write_binary(data)
+
+        # Test
+        assert compression == inputs.detect_compression(data[:inputs.MAGIC_LENGTH])
+        assert inputs.is_compressed(file_path.strpath)
+
+    def test_uncompressed(self, tmpdir):
+        """Verify that plain XML, stdin and unreadable paths are not reported as compressed"""
+
+        # Setup
+        file_path = tmpdir.join('results.xml.gz')
+        file_path.write_binary(CONTENTS)
+
+        # Test
+        assert inputs.detect_compression(CONTENTS) is None
+        assert not inputs.is_compressed(file_path.strpath)
+        assert not inputs.is_compressed(inputs.STDIN_PATH)
+        assert not inputs.is_compressed(tmpdir.join('missing.xml').strpath)
+
+
+class TestOpenInput(object):
+    """Test cases for the 'open_input' function"""
+
+    @pytest.mark.parametrize('compression', [None] + sorted(COMPRESSORS))
+    def test_file(self, compression, tmpdir):
+        """Verify that plain and compressed files are read as their uncompressed contents"""
+
+        # Setup
+        file_path = tmpdir.join('results.xml')
+        file_path.write_binary(COMPRESSORS[compression](CONTENTS) if compression else CONTENTS)
+
+        # Test
+        with inputs.open_input(file_path.strpath) as f:
+            assert CONTENTS == f.read()
+
+    @pytest.mark.parametrize('compression', [None, 'gzip'])
+    def test_stdin(self, compression, monkeypatch):
+        """Verify that "-" reads stdin, which is left open, even when it does not support peeking"""
+
+        # Setup
+        stdin = io.BytesIO(COMPRESSORS[compression](CONTENTS) if compression else CONTENTS)
+        monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(stdin))
+
+        # Test
+        with inputs.open_input(inputs.STDIN_PATH) as f:
+            assert CONTENTS == f.read()
+        assert not stdin.closed
+        assert 0 == inputs.input_size(inputs.STDIN_PATH)
+
+    def test_invalid_path(self, tmpdir):
+        """Verify that an invalid path raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            with inputs.open_input(tmpdir.join('missing.xml').strpath):
+                pass
+
+    @pytest.mark.parametrize('compression', sorted(COMPRESSORS))
+    def test_corrupt(self, compression, tmpdir):
+        """Verify that truncated compressed files fail with one of the documented errors"""
+
+        # Setup
+        file_path = tmpdir.join('results.xml')
+        file_path.write_binary(COMPRESSORS[compression](CONTENTS * 100)[:40])
+
+        # Test
+        with pytest.raises(inputs.corrupt_input_errors()):
+            with inputs.open_input(file_path.strpath) as f:
+                f.read()
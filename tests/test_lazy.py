@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import sys
+import pytest
+from py_result_uploader import lazy
+
+
+class TestLazyModule(object):
+    """Test cases for the 'LazyModule' class"""
+
+    def test_deferred_import(self, monkeypatch):
+        """Verify that the module is only imported once an attribute is accessed"""
+
+        # Setup
+        monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+        module = lazy.LazyModule('colorsys')
+
+        # Test
+        assert 'colorsys' not in sys.modules
+        assert (0.0, 0.0, 1.0) == module.rgb_to_hsv(1.0, 1.0, 1.0)
+        assert sys.modules['colorsys'] is module._module
+
+    def test_missing_module(self):
+        """Verify that a missing module is only reported once an attribute is accessed"""
+
+        # Setup
+        module = lazy.LazyModule('module_does_not_exist')
+
+        # Test
+        with pytest.raises(ImportError):
+            module.attribute
+
+    def test_is_installed(self):
+        """Verify that installed packages are detected without importing them"""
+
+        # Test
+        assert lazy.is_installed('json')
+        assert not lazy.is_installed('module_does_not_exist')
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+from py_result_uploader import metadata
+
+
+@pytest.fixture()
+def metadata_cache(tmpdir):
+    metadata_cache = metadata.MetadataCache(tmpdir.join('cache').strpath, ttl=60)
+    yield metadata_cache
+    metadata_cache.close()
+
+
+class TestCollectTestCycleIds(object):
+    """Test cases for the 'collect_test_cycle_ids' function"""
+
+    def test_nested(self, mocker):
+        """Verify that the PID and ID of every test cycle are collected including nested test cycles"""
+
+        # Setup
+        nested = mocker.Mock(pid='CL-3', id=3, test_cycles=None)
+        test_cycles = [mocker.Mock(pid='CL-1', id=1, test_cycles=[nested]),
+                       mocker.Mock(pid='CL-2', id=2, test_cycles=[])]
+
+        # Test
+        assert {'CL-1', '1', 'CL-2', '2', 'CL-3', '3'} == metadata.collect_test_cycle_ids(test_cycles)
+        assert set() == metadata.collect_test_cycle_ids(None)
+
+
+class TestMetadataCache(object):
+    """Test cases for the 'MetadataCache' class"""
+
+    def test_round_trip(self, metadata_cache):
+        """Verify that the test cycles of a project are keyed by host and project"""
+
+        # Setup
+        metadata_cache.put('https://a.qtestnet.com', 12345, {'CL-1', '1'})
+
+        # Test
+        assert {'CL-1', '1'} == metadata_cache.get('https://a.qtestnet.com', 12345)
+        assert metadata_cache.get('https://b.qtestnet.com', 12345) is None
+        assert metadata_cache.get('https://a.qtestnet.com', 54321) is None
+
+    def test_persisted(self, metadata_cache, tmpdir):
+        """Verify that entries are available to later invocations"""
+
+        # Setup
+        metadata_cache.put('https://a.qtestnet.com', 12345, {'CL-1'})
+
+        # Test
+        with metadata.MetadataCache(tmpdir.join('cache').strpath) as reopened:
+            assert {'CL-1'} == reopened.get('https://a.qtestnet.com', 12345)
+
+    def test_expired(self, metadata_cache, mocker):
+        """Verify that entries older than the time to live are ignored and evicted"""
+
+        # Mock
+        mock_time = mocker.patch('py_result_uploader.metadata.time.time', return_value=1000.0)
+
+        # Setup
+        metadata_cache.put('https://a.qtestnet.com', 12345, {'CL-1'})
+        mock_time.return_value = 1061.0
+
+        # Test
+        assert metadata_cache.get('https://a.qtestnet.com', 12345) is None
+        metadata_cache.put('https://a.qtestnet.com', 54321, {'CL-2'})
+        assert 1 == len(metadata_cache)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import json
+from py_result_uploader import metrics
+
+
+class TestUploadMetrics(object):
+    """Test cases for the 'UploadMetrics' class"""
+
+    def test_span(self):
+        """Verify that a span records its counters and is passed to the callback"""
+
+        # Setup
+        spans = []
+        upload_metrics = metrics.UploadMetrics(on_span=spans.append)
+
+        # Test
+        with upload_metrics.span('parse', cases=3) as span:
+            span.bytes = 1024
+
+        assert 1 == len(spans)
+        assert ('parse', 3, 1024) == (spans[0].name, spans[0].cases, spans[0].bytes)
+        assert spans[0].duration >= 0
+        assert spans == upload_metrics.spans
+
+    def test_repeated_spans_are_merged(self):
+        """Verify that a phase measured more than once is reported as the sum of its measurements"""
+
+        # Setup
+        upload_metrics = metrics.UploadMetrics()
+
+        # Test
+        upload_metrics.record(metrics.Span('parse', 1.0, 2, 100, 10))
+        upload_metrics.record(metrics.Span('build', 0.5, 2, None, 30))
+        upload_metrics.record(metrics.Span('parse', 2.0, 3, None, 20))
+
+        assert [metrics.Span('parse', 3.0, 5, 100, 20), metrics.Span('build', 0.5, 2, None, 30)] == \
+            upload_metrics.spans
+
+    def test_failed_span_is_not_recorded(self):
+        """Verify that a phase that raised an exception is not recorded"""
+
+        # Setup
+        upload_metrics = metrics.UploadMetrics()
+
+        # Test
+        try:
+            with upload_metrics.span('parse'):
+                raise RuntimeError('Super duper failure!')
+        except RuntimeError:
+            pass
+
+        assert [] == upload_metrics.spans
+
+    def test_write_json(self, tmpdir):
+        """Verify that the measurements are written as JSON"""
+
+        # Setup
+        file_path = tmpdir.join('metrics.json').strpath
+        upload_metrics = metrics.UploadMetrics()
+        upload_metrics.record(metrics.Span('submit', 0.25, 5, 2048, 4096))
+
+        # Test
+        upload_metrics.write_json(file_path)
+        with open(file_path) as f:
+            data = json.load(f)
+
+        assert upload_metrics.started == data['started']
+        assert [{'name': 'submit', 'duration': 0.25, 'cases': 5, 'bytes': 2048, 'peak_memory': 4096}] == data['spans']
+
+    def test_write_prometheus(self, tmpdir):
+        """Verify that the measurements are written as a Prometheus textfile without unknown values"""
+
+        # Setup
+        file_path = tmpdir.join('metrics.prom').strpath
+        upload_metrics = metrics.UploadMetrics()
+        upload_metrics.record(metrics.Span('submit', 0.25, 5, None, 4096))
+
+        # Test
+        upload_metrics.write_prometheus(file_path)
+        with open(file_path) as f:
+            lines = f.read().splitlines()
+
+        assert 'py_result_uploader_phase_duration_seconds{phase="submit"} 0.25' in lines
+        assert 'py_result_uploader_phase_cases{phase="submit"} 5' in lines
+        assert 'py_result_uploader_phase_peak_memory_bytes{phase="submit"} 4096' in lines
+        assert '# TYPE py_result_uploader_phase_bytes gauge' in lines
+        assert not [line for line in lines if line.startswith('py_result_uploader_phase_bytes')]
+        assert [tmpdir.join('metrics.prom')] == tmpdir.listdir()
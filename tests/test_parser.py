@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+from py_result_uploader import parser
+from py_result_uploader import py_result_uploader
+
+TIMESTAMP = '2018-01-01T00:00:00Z'
+
+
+@pytest.fixture(params=parser.PARSER_BACKENDS)
+def backend_name(request):
+    if request.param not in parser.available_backends():
+        pytest.skip('The "{}" XML parser is not installed'.format(request.param))
+
+    return request.param
+
+
+def _loaded_test_logs(file_path, backend_name):
+    junit_xml = py_result_uploader._load_input_file(file_path, backend_name)
+
+    return [py_result_uploader._generate_test_log(tc, props, TIMESTAMP).to_dict()
+            for _, props, tc in py_result_uploader._iter_testcases(junit_xml)]
+
+
+def _streamed_test_logs(file_path, backend_name):
+    return [py_result_uploader._generate_test_log(tc, props, TIMESTAMP).to_dict()
+            for _, props, tc in py_result_uploader._iter_input_testcases(file_path, backend_name)]
+
+
+class TestGetBackend(object):
+    """Test cases for the 'get_backend' function"""
+
+    def test_default(self, monkeypatch):
+        """Verify that the fastest available backend is selected by default"""
+
+        # Setup
+        monkeypatch.delenv(parser.PARSER_ENV_VAR, raising=False)
+
+        # Test
+        assert parser.available_backends()[0] == parser.get_backend().name
+        assert 'stdlib' in parser.available_backends()
+
+    def test_environment_variable(self, monkeypatch):
+        """Verify that the environment variable overrides the default backend"""
+
+        # Setup
+        monkeypatch.setenv(parser.PARSER_ENV_VAR, 'stdlib')
+
+        # Test
+        assert 'stdlib' == parser.get_backend().name
+
+    def test_unknown(self):
+        """Verify that an unknown backend is rejected"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            parser.get_backend('expat')
+
+    def test_not_installed(self, monkeypatch):
+        """Verify that lxml is rejected when it is not installed"""
+
+        # Setup
+        monkeypatch.setattr(parser, 'LxmlEtree', None)
+
+        # Test
+        assert ['stdlib'] == parser.available_backends()
+        with pytest.raises(RuntimeError):
+            parser.get_backend('lxml')
+
+
+class TestParserBackends(object):
+    """Test cases verifying that every parser backend produces identical results"""
+
+    @pytest.mark.parametrize('fixture_name', ['single_passing_xml',
+                                              'single_fail_xml',
+                                              'single_error_xml',
+                                              'single_skip_xml',
+                                              'flat_mix_status_xml',
+                                              'trailing_properties_xml',
+                                              'parametrized_mix_status_xml',
+                                              'multi_suite_xml',
+                                              'large_suite_xml'])
+    def test_identical_test_logs(self, backend_name, fixture_name, request):
+        """Verify that loading and streaming produce the same test logs as the stdlib parser"""
+
+        # Setup
+        file_path = request.getfixturevalue(fixture_name)
+
+        # Expectation
+        expected = _streamed_test_logs(file_path, 'stdlib')
+
+        # Test
+        assert expected == _streamed_test_logs(file_path, backend_name)
+        assert expected == _loaded_test_logs(file_path, backend_name)
+
+    def test_invalid_xml_content(self, backend_name, bad_xml):
+        """Verify that invalid XML is reported the same way by every backend"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            py_result_uploader._load_input_file(bad_xml, backend_name)
+        with pytest.raises(RuntimeError):
+            list(py_result_uploader._iter_input_testcases(bad_xml, backend_name))
+
+    def test_invalid_file_path(self, backend_name):
+        """Verify that a missing file is reported the same way by every backend"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            py_result_uploader._load_input_file('/path/does/not/exist', backend_name)
+        with pytest.raises(RuntimeError):
+            list(py_result_uploader._iter_input_testcases('/path/does/not/exist', backend_name))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import time
+import threading
+from py_result_uploader import polling
+
+
+class FakeJobQueue(object):
+    """A fake qTest queue that reports a job as finished after a given number of polls."""
+
+    def __init__(self, polls_until_done, final_state='SUCCESS'):
+        self.polls_until_done = polls_until_done
+        self.final_state = final_state
+        self.polls = {}
+        self.lock = threading.Lock()
+
+    def track(self, job_id):
+        with self.lock:
+            self.polls[job_id] = self.polls.get(job_id, 0) + 1
+            polls = self.polls[job_id]
+
+        return FakeResponse(self.final_state if polls >= self.polls_until_done[job_id] else 'IN_PROCESSING')
+
+
+class FakeResponse(object):
+    def __init__(self, state):
+        self.state = state
+
+
+class FakeApiError(Exception):
+    def __init__(self, status):
+        super(FakeApiError, self).__init__('HTTP {}'.format(status))
+        self.status = status
+
+
+class TestBackoffDelay(object):
+    """Test cases for the '_backoff_delay' function"""
+
+    def test_bounds(self):
+        """Verify that the jittered delay grows exponentially and never exceeds the maximum delay"""
+
+        # Test
+        for attempt in range(10):
+            capped = min(8.0, 0.5 * (2 ** attempt))
+            for _ in range(20):
+                delay = polling._backoff_delay(attempt, 0.5, 8.0)
+                assert capped / 2 <= delay <= capped
+
+
+class TestPollJobs(object):
+    """Test cases for the 'poll_jobs' function"""
+
+    def test_success(self):
+        """Verify that jobs are polled until they reach a terminal state"""
+
+        # Setup
+        queue = FakeJobQueue({101: 3, 102: 1})
+
+        # Test
+        reports = polling.poll_jobs(queue.track, [101, 102], timeout=5, initial_delay=0.01, max_delay=0.02)
+        assert [101, 102] == [r.job_id for r in reports]
+        assert ['SUCCESS', 'SUCCESS'] == [r.state for r in reports]
+        assert [3, 1] == [r.polls for r in reports]
+        assert [None, None] == [r.error for r in reports]
+
+    def test_failed_job(self):
+        """Verify that a failed job is reported as a terminal state"""
+
+        # Setup
+        queue = FakeJobQueue({101: 2}, final_state='FAILED')
+
+        # Test
+        report = polling.poll_jobs(queue.track, [101], timeout=5, initial_delay=0.01, max_delay=0.02)[0]
+        assert 'FAILED' == report.state
+        assert report.error is None
+
+    def test_timeout(self):
+        """Verify that a job that never finishes is reported with its last known state once the timeout passes"""
+
+        # Setup
+        queue = FakeJobQueue({101: 1000})
+
+        # Test
+        report = polling.poll_jobs(queue.track, [101], timeout=0.1, initial_delay=0.01, max_delay=0.02)[0]
+        assert 'IN_PROCESSING' == report.state
+        assert 'Timed out' in report.error
+
+    def test_track_exception(self):
+        """Verify that an error while polling is reported without affecting the other jobs"""
+
+        # Setup
+        queue = FakeJobQueue({102: 1})
+
+        def track(job_id):
+            if job_id == 101:
+                raise RuntimeError('Super duper failure!')
+            return queue.track(job_id)
+
+        # Test
+        reports = polling.poll_jobs(track, [101, 102], timeout=5, initial_delay=0.01, max_delay=0.02)
+        assert 'Super duper failure!' in reports[0].error
+        assert 'SUCCESS' == reports[1].state
+
+    def test_transient_track_exception(self):
+        """Verify that transient failures while polling are retried until the retries run out"""
+
+        # Setup
+        queue = FakeJobQueue({101: 1, 102: 1})
+        failures = {101: [FakeApiError(429), FakeApiError(503)], 102: [FakeApiError(503)] * 3}
+
+        def track(job_id):
+            if failures[job_id]:
+                raise failures[job_id].pop()
+            return queue.track(job_id)
+
+        # Test
+        reports = polling.poll_jobs(track, [101, 102], timeout=5, initial_delay=0.01, max_delay=0.02, max_retries=2)
+        assert ['SUCCESS', 3, None] == [reports[0].state, reports[0].polls, reports[0].error]
+        assert 'HTTP 503' in reports[1].error
+        assert 3 == reports[1].polls
+
+    def test_concurrent_polling(self):
+        """Verify that many jobs are waited on concurrently rather than one after another"""
+
+        # Setup
+        job_ids = list(range(50))
+        queue = FakeJobQueue({job_id: 3 for job_id in job_ids})
+
+        # Test
+        start = time.time()
+        reports = polling.poll_jobs(queue.track, job_ids, timeout=5, initial_delay=0.05, max_delay=0.05)
+        assert ['SUCCESS'] * 50 == [r.state for r in reports]
+        assert time.time() - start < 1
@@ -4,9 +4,22 @@
 # ======================================================================================================================
 # Imports
 # ======================================================================================================================
+import io
+import os
+import bz2
+import sys
+import gzip
+import json
+import lzma
 import pytest
+import threading
+import swagger_client
 from swagger_client.rest import ApiException
+from urllib3.exceptions import MaxRetryError
 from py_result_uploader import py_result_uploader
+from py_result_uploader.delta import StatusSnapshot, DeltaReport
+from py_result_uploader.metrics import UploadMetrics
+from py_result_uploader.metadata import MetadataCache
 
 
 class TestLoadingInputJunitXMLFile(object):
@@ -51,6 +64,95 @@ class TestLoadingInputJunitXMLFile(object):
             py_result_uploader._load_input_file(bad_junit_root)
 
 
+class TestIterInputTestcases(object):
+    """Test cases for the '_iter_input_testcases' function"""
+
+    def test_iter_file_happy_path(self, flat_mix_status_xml):
+        """Verify that every testcase of a valid JUnitXML file is yielded along with the testsuite properties"""
+
+        # Setup
+        testcases = [(props, tc_xml.attrib['name'])
+                     for _, props, tc_xml in py_result_uploader._iter_input_testcases(flat_mix_status_xml)]
+
+        # Expectations
+        names_exp = ['test_pass[ansible://localhost]',
+                     'test_fail[ansible://localhost]',
+                     'test_error[ansible://localhost]',
+                     'test_skip[ansible://localhost]']
+
+        # Test
+        assert names_exp == [name for _, name in testcases]
+        for props, _ in testcases:
+            assert 'Unknown' == props['GIT_BRANCH']
+
+    def test_trailing_properties(self, trailing_properties_xml):
+        """Verify that testcases preceding the "properties" element are yielded with the testsuite properties"""
+
+        # Setup
+        testcases = list(py_result_uploader._iter_input_testcases(trailing_properties_xml))
+
+        # Test
+        assert 2 == len(testcases)
+        for _, props, _ in testcases:
+            assert 'Unknown' == props['GIT_BRANCH']
+
+    def test_multiple_properties(self, tmpdir):
+        """Verify that every "properties" element adds to the properties read before it instead of replacing them"""
+
+        # Setup
+        file_path = tmpdir.join('properties.xml')
+        file_path.write('<testsuites>'
+                        '<properties><property name="GIT_REPO" value="repo"/></properties>'
+                        '<properties><property name="SCENARIO" value="ironic"/></properties>'
+                        '<testsuite>'
+                        '<properties><property name="GIT_BRANCH" value="master"/></properties>'
+                        '<testcase name="test_a"/>'
+                        '<properties><property name="ACTION" value="deploy"/></properties>'
+                        '<testcase name="test_b"/>'
+                        '</testsuite>'
+                        '</testsuites>')
+        testcases = list(py_result_uploader._iter_input_testcases(file_path.strpath))
+
+        # Expectation
+        props_exp = {'GIT_REPO': 'repo', 'SCENARIO': 'ironic', 'GIT_BRANCH': 'master'}
+
+        # Test
+        assert props_exp == testcases[0][1]
+        assert dict(props_exp, ACTION='deploy') == testcases[1][1]
+
+    def test_consumed_elements_are_cleared(self, flat_mix_status_xml):
+        """Verify that testcase elements are cleared once the consumer has moved on"""
+
+        # Setup
+        testcase_xmls = [tc_xml for _, _, tc_xml in py_result_uploader._iter_input_testcases(flat_mix_status_xml)]
+
+        # Test
+        for tc_xml in testcase_xmls:
+            assert {} == tc_xml.attrib
+            assert 0 == len(tc_xml)
+
+    def test_invalid_file_path(self):
+        """Verify that an invalid file path raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            list(py_result_uploader._iter_input_testcases('/path/does/not/exist'))
+
+    def test_invalid_xml_content(self, bad_xml):
+        """Verify that invalid XML file content raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            list(py_result_uploader._iter_input_testcases(bad_xml))
+
+    def test_missing_junit_xml_root(self, bad_junit_root):
+        """Verify that XML files missing the expected JUnitXML root element raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            list(py_result_uploader._iter_input_testcases(bad_junit_root))
+
+
 class TestGenerateTestLog(object):
     """Test cases for the '_generate_test_log' function"""
 
@@ -153,8 +255,125 @@ class TestGenerateTestLog(object):
             assert test_log_exp[exp] == test_log_dict[exp]
 
 
-class TestGenerateAutoRequest(object):
-    """Test cases for the '_generate_auto_request' function"""
+class TestAggregateTestLogs(object):
+    """Test cases for aggregating parametrized test results into a single test log"""
+
+    @pytest.mark.parametrize('stream', [False, True])
+    def test_worst_status(self, parametrized_mix_status_xml, stream):
+        """Verify that parametrized test results collapse into one test log per test with the most severe status"""
+
+        # Setup
+        test_cycle = 'CL-1'
+        auto_req = py_result_uploader._build_auto_request([parametrized_mix_status_xml],
+                                                          test_cycle,
+                                                          stream=stream,
+                                                          aggregate=True)
+
+        # Expectation
+        test_logs_exp = [('test_host', 'FAILED'), ('test_skip', 'SKIPPED'), ('test_once', 'PASSED')]
+
+        # Test
+        assert test_logs_exp == [(test_log.name, test_log.status) for test_log in auto_req.test_logs]
+        assert 'Unknown#test_host' == auto_req.test_logs[0].automation_content
+
+    def test_note(self, parametrized_mix_status_xml):
+        """Verify that the note of an aggregated test log records the status counts of the group and every
+        parameter while a test that ran once is left untouched"""
+
+        # Setup
+        auto_req = py_result_uploader._build_auto_request([parametrized_mix_status_xml], 'CL-1', aggregate=True)
+        test_logs = auto_req.test_logs
+
+        # Expectation
+        note_exp = ('Aggregated 3 parametrized runs: 1 FAILED, 1 SKIPPED, 1 PASSED\n'
+                    '[ansible://host1]: 1 PASSED\n'
+                    '[ansible://host2]: 1 FAILED\n'
+                    '[ansible://host3]: 1 SKIPPED')
+
+        # Test
+        assert note_exp == test_logs[0].note
+        assert test_logs[2].note is None
+
+    def test_multiple_files(self, parametrized_mix_status_xml):
+        """Verify that parametrized test results are aggregated across files"""
+
+        # Setup
+        input_files = [parametrized_mix_status_xml, parametrized_mix_status_xml]
+        auto_req = py_result_uploader._build_auto_request(input_files, 'CL-1', processes=2, aggregate=True)
+
+        # Test
+        assert ['test_host', 'test_skip', 'test_once'] == [test_log.name for test_log in auto_req.test_logs]
+        assert auto_req.test_logs[0].note.startswith('Aggregated 6 parametrized runs: 2 FAILED, 2 SKIPPED, 2 PASSED')
+        assert '[ansible://host2]: 2 FAILED' in auto_req.test_logs[0].note
+        assert 'Aggregated 2 parametrized runs: 2 PASSED\n[ansible://host1]: 2 PASSED' == auto_req.test_logs[2].note
+
+
+class TestExpandInputPaths(object):
+    """Test cases for the 'expand_input_paths' function"""
+
+    @pytest.fixture()
+    def results_dir(self, tmpdir, flat_all_passing_xml):
+        shard_dir = tmpdir.mkdir('shards')
+        for name in ['shard_2.xml', 'shard_1.xml', 'notes.txt']:
+            shard_dir.join(name).write(open(flat_all_passing_xml).read())
+        shard_dir.mkdir('nested').join('shard_3.xml').write(open(flat_all_passing_xml).read())
+
+        return shard_dir
+
+    def test_file(self, flat_all_passing_xml):
+        """Verify that a plain file path is passed through"""
+
+        # Test
+        assert [flat_all_passing_xml] == py_result_uploader.expand_input_paths([flat_all_passing_xml])
+
+    def test_directory(self, results_dir):
+        """Verify that directories are recursively searched for XML files"""
+
+        # Expectation
+        paths_exp = [results_dir.join('nested', 'shard_3.xml').strpath,
+                     results_dir.join('shard_1.xml').strpath,
+                     results_dir.join('shard_2.xml').strpath]
+
+        # Test
+        assert paths_exp == py_result_uploader.expand_input_paths([results_dir.strpath])
+
+    def test_compressed_and_stdin(self, results_dir):
+        """Verify that directories include compressed XML files and that "-" for stdin is passed through"""
+
+        # Setup
+        results_dir.join('shard_0.xml.gz').write_binary(gzip.compress(results_dir.join('shard_1.xml').read_binary()))
+
+        # Expectation
+        paths_exp = ['-', results_dir.join('nested', 'shard_3.xml').strpath, results_dir.join('shard_0.xml.gz').strpath]
+
+        # Test
+        assert paths_exp == py_result_uploader.expand_input_paths(['-', results_dir.strpath])[:3]
+
+    def test_glob_and_duplicates(self, results_dir):
+        """Verify that glob patterns are expanded and duplicate paths are only included once"""
+
+        # Setup
+        shard_2 = results_dir.join('shard_2.xml').strpath
+        pattern = results_dir.join('shard_*.xml').strpath
+
+        # Expectation
+        paths_exp = [shard_2, results_dir.join('shard_1.xml').strpath]
+
+        # Test
+        assert paths_exp == py_result_uploader.expand_input_paths([shard_2, pattern])
+
+    def test_no_matches(self, results_dir):
+        """Verify that a path or pattern that matches no files raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            py_result_uploader.expand_input_paths([results_dir.join('*.json').strpath])
+        with pytest.raises(RuntimeError):
+            py_result_uploader.expand_input_paths(['/path/does/not/exist'])
+
+
+class TestBuildAutoRequest(object):
+    """Test cases for the '_build_auto_request' function"""
 
     def test_mix_status(self, flat_mix_status_xml):
         """Verify that a valid qTest 'AutomationRequest' swagger model is generated from a JUnitXML file
@@ -163,9 +382,8 @@ class TestGenerateAutoRequest(object):
 
         # Setup
         test_cycle = 'CL-1'
-        junit_xml = py_result_uploader._load_input_file(flat_mix_status_xml)
         # noinspection PyUnresolvedReferences
-        auto_req_dict = py_result_uploader._generate_auto_request(junit_xml, test_cycle).to_dict()
+        auto_req_dict = py_result_uploader._build_auto_request([flat_mix_status_xml], test_cycle).to_dict()
 
         # Expectation
         prop_value = 'Unknown'
@@ -191,6 +409,407 @@ class TestGenerateAutoRequest(object):
             for key in test_logs_exp[x]:
                 assert test_logs_exp[x][key] == auto_req_dict['test_logs'][x][key]
 
+    def test_stream_matches_tree_parsing(self, flat_mix_status_xml):
+        """Verify that streaming the input file produces the same test logs as parsing the full XML tree"""
+
+        # Setup
+        test_cycle = 'CL-1'
+        keys = ['name', 'status', 'module_names', 'automation_content']
+        # noinspection PyUnresolvedReferences
+        tree_dict = py_result_uploader._build_auto_request([flat_mix_status_xml], test_cycle).to_dict()
+        # noinspection PyUnresolvedReferences
+        stream_dict = py_result_uploader._build_auto_request([flat_mix_status_xml], test_cycle, stream=True).to_dict()
+
+        # Test
+        assert test_cycle == stream_dict['test_cycle']
+        assert len(tree_dict['test_logs']) == len(stream_dict['test_logs'])
+        for tree_log, stream_log in zip(tree_dict['test_logs'], stream_dict['test_logs']):
+            for key in keys:
+                assert tree_log[key] == stream_log[key]
+
+    def test_multiple_files(self, flat_all_passing_xml, flat_mix_status_xml):
+        """Verify that the test logs of multiple files are combined in input order using a process pool"""
+
+        # Setup
+        test_cycle = 'CL-1'
+        input_files = [flat_mix_status_xml, flat_all_passing_xml]
+        auto_req = py_result_uploader._build_auto_request(input_files, test_cycle, processes=2)
+
+        # Expectation
+        names_exp = ['test_pass', 'test_fail', 'test_error', 'test_skip',
+                     'test_pass1', 'test_pass2', 'test_pass3', 'test_pass4', 'test_pass5']
+
+        # Test
+        assert test_cycle == auto_req.test_cycle
+        assert names_exp == [test_log.name for test_log in auto_req.test_logs]
+
+    def test_invalid_file(self, flat_all_passing_xml, bad_xml):
+        """Verify that a parse failure in a worker process raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            py_result_uploader._build_auto_request([flat_all_passing_xml, bad_xml], 'CL-1', processes=2)
+
+
+class TestTestsuitesRoot(object):
+    """Test cases for JUnitXML files with a "testsuites" root element"""
+
+    @staticmethod
+    def _summary(test_logs):
+        return [(test_log.automation_content, test_log.status) for test_log in test_logs]
+
+    def test_property_scoping(self, multi_suite_xml):
+        """Verify that the properties of every testsuite only apply to its own testcases"""
+
+        # Setup
+        test_logs = py_result_uploader._build_auto_request([multi_suite_xml], 'CL-1').test_logs
+
+        # Expectation
+        summary_exp = [('pike#test_pass', 'PASSED'),
+                       ('pike#test_fail', 'FAILED'),
+                       ('queens#test_host', 'PASSED'),
+                       ('queens#test_host', 'SKIPPED'),
+                       ('queens#test_pass', 'PASSED'),
+                       ('master#test_host', 'PASSED'),
+                       ('master#test_host', 'PASSED')]
+
+        # Test
+        assert summary_exp == self._summary(test_logs)
+
+    def test_streamed_and_parallel_match_loaded(self, multi_suite_xml, flat_mix_status_xml):
+        """Verify that streaming and parsing the testsuites in parallel produce the same test logs as loading"""
+
+        # Setup
+        input_files = [multi_suite_xml, flat_mix_status_xml]
+        loaded = py_result_uploader._build_auto_request(input_files, 'CL-1', processes=1)
+        streamed = py_result_uploader._build_auto_request(input_files, 'CL-1', stream=True, processes=1)
+        split = py_result_uploader._build_auto_request(multi_suite_xml, 'CL-1', processes=2)
+        parallel = py_result_uploader._build_auto_request(input_files, 'CL-1', processes=2)
+
+        # Test
+        assert 11 == len(loaded.test_logs)
+        assert self._summary(loaded.test_logs) == self._summary(streamed.test_logs)
+        assert self._summary(loaded.test_logs[:7]) == self._summary(split.test_logs)
+        assert self._summary(loaded.test_logs) == self._summary(parallel.test_logs)
+
+    def test_unsplittable_testsuite(self, tmpdir):
+        """Verify that a file is parsed whole when one of its testsuites is not valid XML on its own"""
+
+        # Setup
+        file_path = tmpdir.join('namespaced.xml').strpath
+        with open(file_path, 'w') as f:
+            f.write('<testsuites xmlns:ci="urn:ci">'
+                    '<properties><property name="GIT_BRANCH" value="master"/></properties>'
+                    '<testsuite><ci:build number="1"/><testcase name="test_one[local]"/></testsuite>'
+                    '<testsuite><testcase name="test_two[local]"/></testsuite>'
+                    '</testsuites>')
+
+        # Test
+        units = py_result_uploader._split_into_units([file_path])
+        assert 2 == len(units)
+        with pytest.raises(RuntimeError):
+            py_result_uploader._build_fragment(units[0])
+
+        auto_req = py_result_uploader._build_auto_request(file_path, 'CL-1', processes=2)
+        assert [('master#test_one', 'PASSED'), ('master#test_two', 'PASSED')] == self._summary(auto_req.test_logs)
+
+    def test_per_suite_batches(self, multi_suite_xml, mocker):
+        """Verify that the test logs of every testsuite are submitted in batches of their own"""
+
+        # Mock
+        mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                                   return_value=mocker.Mock(state='IN_WAITING', id='101'))
+
+        # Test
+        reports = py_result_uploader.upload_test_results_in_batches(multi_suite_xml,
+                                                                    'valid_token',
+                                                                    12345,
+                                                                    'CL-1',
+                                                                    max_logs=None,
+                                                                    max_bytes=None,
+                                                                    workers=1,
+                                                                    aggregate=True,
+                                                                    per_suite=True)
+        assert [0, 1, 2] == [r.index for r in reports]
+        assert [2, 2, 1] == [r.test_log_count for r in reports]
+        assert [{'pike'}, {'queens'}, {'master'}] == [{test_log.module_name for test_log in call[1]['body'].test_logs}
+                                                      for call in mock_submit.call_args_list]
+
+
+class TestTestcaseShards(object):
+    """Test cases for parsing shards of the testcases of a single large testsuite in parallel"""
+
+    @staticmethod
+    def _test_logs(input_files, aggregate=False, **kwargs):
+        results = py_result_uploader._build_testsuites(input_files, aggregate=aggregate, failure_details=100, **kwargs)
+        if aggregate:
+            results = [py_result_uploader._aggregate_test_logs(result) for result in results]
+
+        return [[test_log.to_dict() for test_log in result] for result in results]
+
+    def test_split(self, large_suite_xml):
+        """Verify that the properties of the testsuite are parsed once and handed to every shard"""
+
+        # Setup
+        units = py_result_uploader._split_into_units([large_suite_xml], shard_bytes=500)
+
+        # Test
+        assert 2 < len(units)
+        assert list(range(len(units))) == [unit.index for unit in units]
+        assert {'GIT_BRANCH': 'master', 'GIT_REPO': 'Unknown', 'TRAILING': 'true'} == units[-1].testsuite_props
+        assert all(unit.testsuite_props is units[0].testsuite_props for unit in units)
+        assert [large_suite_xml] == py_result_uploader._split_into_units([large_suite_xml])
+        assert [large_suite_xml] == py_result_uploader._split_into_units([large_suite_xml], shard_bytes=0)
+
+    @pytest.mark.parametrize('aggregate', [False, True])
+    def test_parallel_matches_sequential(self, large_suite_xml, flat_mix_status_xml, mocker, aggregate):
+        """Verify that parsing shards in parallel produces exactly the test logs of the sequential path"""
+
+        # Mock
+        mocker.patch('py_result_uploader.py_result_uploader._utc_timestamp', return_value='2018-01-01T00:00:00Z')
+
+        # Setup
+        input_files = [flat_mix_status_xml, large_suite_xml]
+        sequential = self._test_logs(input_files, aggregate, processes=1)
+        parallel = self._test_logs(input_files, aggregate, processes=2, shard_bytes=500)
+
+        # Test
+        assert 2 == len(sequential)
+        assert (21 if aggregate else 40) == len(sequential[1])
+        assert sequential == parallel
+
+    def test_shared_timestamp(self, large_suite_xml, flat_mix_status_xml):
+        """Verify that every shard and file records the execution time of the request instead of its own"""
+
+        # Setup
+        timestamp = '2018-01-01T00:00:00Z'
+        input_files = [flat_mix_status_xml, large_suite_xml]
+        auto_req = py_result_uploader._build_auto_request(input_files, 'CL-1', processes=2, shard_bytes=500)
+        results = py_result_uploader._build_testsuites(input_files, processes=2, shard_bytes=500, timestamp=timestamp)
+
+        # Test
+        assert {auto_req.execution_date} == {t.exe_start_date for t in auto_req.test_logs}
+        assert {timestamp} == {t.exe_start_date for result in results for t in result}
+
+    def test_unsplittable_shard(self, large_suite_xml, tmpdir):
+        """Verify that an invalid shard makes the whole file be parsed to report the actual error"""
+
+        # Setup
+        file_path = tmpdir.join('entities.xml').strpath
+        with open(file_path, 'w') as f:
+            f.write('<testsuite><properties><property name="GIT_BRANCH" value="master"/></properties>{}</testsuite>'
+                    .format('<testcase name="test_x[local]"><ci:build/></testcase>' * 50))
+
+        # Test
+        units = py_result_uploader._split_into_units([file_path], shard_bytes=100)
+        assert 2 < len(units)
+        with pytest.raises(RuntimeError):
+            py_result_uploader._build_shard(units[0])
+        with pytest.raises(RuntimeError):
+            py_result_uploader._build_testsuites(file_path, processes=2, shard_bytes=100)
+
+
+class TestCompressedInput(object):
+    """Test cases for reading gzip, bzip2 or xz compressed results files and results piped in on stdin"""
+
+    @pytest.fixture(params=['gz', 'bz2', 'xz'])
+    def compressed_xml(self, request, multi_suite_xml, tmpdir):
+        compress = {'gz': gzip.compress, 'bz2': bz2.compress, 'xz': lzma.compress}[request.param]
+        file_path = tmpdir.join('results.xml.{}'.format(request.param))
+        with open(multi_suite_xml, 'rb') as f:
+            file_path.write_binary(compress(f.read()))
+
+        return file_path.strpath
+
+    @staticmethod
+    def _test_logs(input_files, **kwargs):
+        return [[test_log.to_dict() for test_log in result]
+                for result in py_result_uploader._build_testsuites(input_files, **kwargs)]
+
+    def test_matches_uncompressed(self, compressed_xml, multi_suite_xml, mocker):
+        """Verify that compressed files produce the same test logs as the uncompressed file however they are parsed"""
+
+        # Mock
+        mocker.patch('py_result_uploader.py_result_uploader._utc_timestamp', return_value='2018-01-01T00:00:00Z')
+
+        # Setup
+        test_logs_exp = self._test_logs(multi_suite_xml, processes=1)
+
+        # Test
+        assert [compressed_xml] == py_result_uploader._split_into_units([compressed_xml])
+        assert test_logs_exp == self._test_logs(compressed_xml, processes=1)
+        assert test_logs_exp == self._test_logs(compressed_xml, stream=True)
+        assert test_logs_exp + test_logs_exp == self._test_logs([compressed_xml, multi_suite_xml], processes=2)
+
+    def test_stdin(self, compressed_xml, multi_suite_xml, monkeypatch, mocker):
+        """Verify that results piped in on stdin are parsed in this process along with the other files"""
+
+        # Mock
+        mocker.patch('py_result_uploader.py_result_uploader._utc_timestamp', return_value='2018-01-01T00:00:00Z')
+        executor = mocker.patch('py_result_uploader.py_result_uploader.futures.ProcessPoolExecutor')
+
+        # Setup
+        test_logs_exp = self._test_logs(multi_suite_xml, processes=1)
+        with open(compressed_xml, 'rb') as f:
+            monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(f.read())))
+
+        # Test
+        assert test_logs_exp + test_logs_exp == self._test_logs(['-', multi_suite_xml], processes=2)
+        assert not executor.called
+
+    @pytest.mark.parametrize('stream', [False, True])
+    def test_corrupt(self, compressed_xml, tmpdir, stream):
+        """Verify that a truncated compressed file raises an exception"""
+
+        # Setup
+        file_path = tmpdir.join('truncated.xml.gz').strpath
+        with open(compressed_xml, 'rb') as src, open(file_path, 'wb') as dst:
+            dst.write(src.read()[:-20])
+
+        # Test
+        with pytest.raises(RuntimeError) as e:
+            py_result_uploader._build_testsuites(file_path, stream=stream, processes=1)
+        assert 'corrupt or truncated' in str(e.value)
+
+
+class TestFailureDetails(object):
+    """Test cases for recording failure details in the notes of test logs"""
+
+    @staticmethod
+    def _notes(test_logs):
+        return [test_log.note for test_log in test_logs]
+
+    def test_disabled(self, repeated_failure_xml):
+        """Verify that failure details are only recorded when requested"""
+
+        # Test
+        assert [None] * 5 == self._notes(py_result_uploader._build_auto_request(repeated_failure_xml, 'CL-1').test_logs)
+
+    def test_recorded_once(self, repeated_failure_xml):
+        """Verify that an identical traceback is recorded by the first failure only and referenced by the others"""
+
+        # Setup
+        notes = self._notes(py_result_uploader._build_auto_request(repeated_failure_xml,
+                                                                   'CL-1',
+                                                                   processes=1,
+                                                                   failure_details=1000).test_logs)
+
+        # Test
+        assert notes[0].startswith('Failure (AssertionError): AssertionError\n[traceback ')
+        assert notes[0].endswith('tests/test_default.py:8: AssertionError')
+        assert notes[1] == notes[3]
+        assert notes[1].endswith('is recorded in full with the first failure of "master#test_host"]')
+        assert 2 == len(notes[1].splitlines())
+        assert notes[2].startswith('Error: setup failure\n[traceback ')
+        assert '[9036 characters truncated]' in notes[2]
+        assert notes[2].endswith('x\nend of traceback')
+        assert notes[4] is None
+
+    @pytest.mark.parametrize('stream', [False, True])
+    def test_deduped_across_workers(self, repeated_failure_xml, stream):
+        """Verify that testsuites built by separate worker processes are deduped into the same notes"""
+
+        # Setup
+        serial = py_result_uploader._build_auto_request(repeated_failure_xml, 'CL-1', processes=1, failure_details=100)
+        parallel = py_result_uploader._build_testsuite_auto_requests(repeated_failure_xml,
+                                                                     'CL-1',
+                                                                     stream=stream,
+                                                                     processes=2,
+                                                                     failure_details=100)
+
+        # Test
+        assert self._notes(serial.test_logs) == \
+            self._notes(test_log for auto_req in parallel for test_log in auto_req.test_logs)
+
+    def test_aggregate(self, repeated_failure_xml, parametrized_mix_status_xml):
+        """Verify that an aggregated test log records the failure details of its first failed test result"""
+
+        # Setup
+        test_logs = py_result_uploader._build_auto_request([parametrized_mix_status_xml, repeated_failure_xml],
+                                                           'CL-1',
+                                                           processes=2,
+                                                           aggregate=True,
+                                                           failure_details=1000).test_logs
+        notes = dict((test_log.automation_content, test_log.note) for test_log in test_logs)
+
+        # Test
+        assert notes['Unknown#test_host'].endswith('ansible://host3]: 1 SKIPPED\n\nFailure: assert False\n'
+                                                   '[traceback {}]\nassert False'
+                                                   .format(test_logs[0].detail_digest))
+        assert notes['Unknown#test_skip'].endswith('\n\nSkipped (pytest.skip): unconditional skip\n'
+                                                   '[traceback {}]\nskipped'.format(test_logs[1].detail_digest))
+        assert notes['master#test_host'].startswith('Aggregated 3 parametrized runs: 3 FAILED\n')
+        assert notes['master#test_host'].endswith('tests/test_default.py:8: AssertionError')
+
+    def test_convert_stream(self, repeated_failure_xml):
+        """Verify that streamed test logs are deduped as they are written"""
+
+        # Setup
+        output = io.BytesIO()
+        py_result_uploader.convert_test_results(repeated_failure_xml,
+                                                output,
+                                                'CL-1',
+                                                output_format='ndjson',
+                                                stream=True,
+                                                failure_details=1000)
+        notes = [json.loads(line).get('note') for line in output.getvalue().decode('utf-8').splitlines()]
+
+        # Test
+        assert self._notes(py_result_uploader._build_auto_request(repeated_failure_xml,
+                                                                  'CL-1',
+                                                                  processes=1,
+                                                                  failure_details=1000).test_logs) == notes
+
+
+class TestSplitTestLogs(object):
+    """Test cases for the '_split_test_logs' function"""
+
+    @pytest.fixture()
+    def test_logs(self, flat_all_passing_xml):
+        return py_result_uploader._build_auto_request([flat_all_passing_xml], 'CL-1').test_logs
+
+    def test_no_limits(self, test_logs):
+        """Verify that all test logs are placed into a single batch when no limits are given"""
+
+        # Setup
+        batches = py_result_uploader._split_test_logs(test_logs)
+
+        # Test
+        assert 1 == len(batches)
+        assert test_logs == batches[0][0]
+
+    def test_max_logs(self, test_logs):
+        """Verify that batches are capped by the number of test logs"""
+
+        # Setup
+        batches = py_result_uploader._split_test_logs(test_logs, max_logs=2)
+
+        # Test
+        assert [2, 2, 1] == [len(logs) for logs, _ in batches]
+        assert test_logs == [log for logs, _ in batches for log in logs]
+
+    def test_max_bytes(self, test_logs):
+        """Verify that batches are capped by serialized size"""
+
+        # Setup
+        overhead = 100
+        single_batch_bytes = py_result_uploader._split_test_logs(test_logs[:1], overhead=overhead)[0][1]
+        batches = py_result_uploader._split_test_logs(test_logs, max_bytes=single_batch_bytes, overhead=overhead)
+
+        # Test
+        assert 5 == len(batches)
+        for logs, byte_size in batches:
+            assert byte_size <= single_batch_bytes
+
+    def test_oversized_test_log(self, test_logs):
+        """Verify that a test log larger than the byte cap is placed into a batch by itself"""
+
+        # Setup
+        batches = py_result_uploader._split_test_logs(test_logs, max_bytes=1)
+
+        # Test
+        assert [1, 1, 1, 1, 1] == [len(logs) for logs, _ in batches]
+
 
 class TestUploadTestResults(object):
     """Test cases for the 'upload_test_results' function"""
@@ -214,6 +833,31 @@ class TestUploadTestResults(object):
         response = py_result_uploader.upload_test_results(single_passing_xml, api_token, project_id, test_cycle)
         assert int(job_id) == response
 
+    def test_stream(self, flat_mix_status_xml, mocker):
+        """Verify that the function can upload results while incrementally parsing the JUnitXML file"""
+
+        # Setup
+        api_token = 'valid_token'
+        project_id = 12345
+        test_cycle = 'CL-1'
+
+        # Expectation
+        job_id = '54321'
+
+        # Mock
+        mock_queue_resp = mocker.Mock(state='IN_WAITING', id=job_id)
+        mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                                   return_value=mock_queue_resp)
+
+        # Test
+        response = py_result_uploader.upload_test_results(flat_mix_status_xml,
+                                                          api_token,
+                                                          project_id,
+                                                          test_cycle,
+                                                          stream=True)
+        assert int(job_id) == response
+        assert 4 == len(mock_submit.call_args[1]['body'].test_logs)
+
     def test_api_exception(self, single_passing_xml, mocker):
         """Verify that the function fails gracefully if the API endpoint reports an API exception"""
 
@@ -230,6 +874,30 @@ class TestUploadTestResults(object):
         with pytest.raises(RuntimeError):
             py_result_uploader.upload_test_results(single_passing_xml, api_token, project_id, test_cycle)
 
+    def test_transient_api_exception(self, single_passing_xml, mocker):
+        """Verify that the function retries the upload if the API endpoint reports a transient API exception"""
+
+        # Setup
+        api_token = 'valid_token'
+        project_id = 12345
+        test_cycle = 'CL-1'
+
+        # Expectation
+        job_id = '54321'
+
+        # Mock
+        mocker.patch('time.sleep')
+        side_effects = [ApiException(status=429, reason='Too Many Requests'),
+                        ApiException(status=503, reason='Service Unavailable'),
+                        mocker.Mock(state='IN_WAITING', id=job_id)]
+        mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                                   side_effect=side_effects)
+
+        # Test
+        response = py_result_uploader.upload_test_results(single_passing_xml, api_token, project_id, test_cycle)
+        assert int(job_id) == response
+        assert 3 == mock_submit.call_count
+
     def test_job_queue_failure(self, single_passing_xml, mocker):
         """Verify that the function fails gracefully if the job queue reports a failure"""
 
@@ -245,3 +913,574 @@ class TestUploadTestResults(object):
         # Test
         with pytest.raises(RuntimeError):
             py_result_uploader.upload_test_results(single_passing_xml, api_token, project_id, test_cycle)
+
+
+class TestValidateTarget(object):
+    """Test cases for the 'QTestUploader.validate_target' method"""
+
+    @pytest.fixture()
+    def mock_api(self, mocker):
+        test_cycles = [mocker.Mock(pid='CL-1', id=11, test_cycles=[mocker.Mock(pid='CL-2', id=12, test_cycles=None)])]
+        mock_project = mocker.patch('swagger_client.ProjectApi.get_project')
+        mock_test_cycles = mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=test_cycles)
+
+        return mock_project, mock_test_cycles
+
+    def test_found(self, mock_api):
+        """Verify that nested test cycles are found by PID or numeric ID"""
+
+        # Setup
+        uploader = py_result_uploader.QTestUploader('valid_token')
+
+        # Test
+        assert uploader.validate_target(12345, 'CL-2') is False
+        assert uploader.validate_target(12345, '11') is False
+        assert 2 == mock_api[1].call_count
+        mock_api[0].assert_called_with(12345)
+
+    def test_missing_test_cycle(self, mock_api):
+        """Verify that a test cycle missing from the project raises an exception"""
+
+        # Setup
+        uploader = py_result_uploader.QTestUploader('valid_token')
+
+        # Test
+        with pytest.raises(RuntimeError) as e:
+            uploader.validate_target(12345, 'CL-3')
+        assert 'CL-3' in str(e.value)
+
+    @pytest.mark.parametrize('status', [403, 404])
+    def test_missing_project(self, mock_api, status):
+        """Verify that a project that does not exist or cannot be accessed raises an exception"""
+
+        # Setup
+        uploader = py_result_uploader.QTestUploader('valid_token')
+        mock_api[0].side_effect = ApiException(status=status, reason='Not Found')
+
+        # Test
+        with pytest.raises(RuntimeError) as e:
+            uploader.validate_target(12345, 'CL-1')
+        assert 'project "12345"' in str(e.value)
+        assert not mock_api[1].called
+
+    def test_cached(self, mock_api, tmpdir):
+        """Verify that cached test cycles are used until a test cycle is missing from them"""
+
+        # Setup
+        uploader = py_result_uploader.QTestUploader('valid_token')
+        cache = MetadataCache(tmpdir.strpath)
+
+        # Test
+        assert uploader.validate_target(12345, 'CL-1', cache) is False
+        assert uploader.validate_target(12345, 'CL-2', cache) is True
+        assert 1 == mock_api[1].call_count
+        with pytest.raises(RuntimeError):
+            uploader.validate_target(12345, 'CL-3', cache)
+        assert 2 == mock_api[1].call_count
+        cache.close()
+
+
+class TestUploadTestResultsInBatches(object):
+    """Test cases for the 'upload_test_results_in_batches' function"""
+
+    def test_max_workers(self):
+        """Verify that the number of batches in flight grows past "workers" up to "max_workers" only"""
+
+        # Setup
+        controller = py_result_uploader._batch_controller(2, max_workers=4)
+
+        # Test
+        assert 2 == controller.limit
+        for _ in range(20):
+            controller.submit(lambda: None)
+        assert 4 == controller.limit
+        assert 2 == py_result_uploader._batch_controller(2).max_limit
+
+    def test_happy_path(self, flat_all_passing_xml, mocker):
+        """Verify that the function uploads every batch and reports the queue job IDs in submission order"""
+
+        # Setup
+        api_token = 'valid_token'
+        project_id = 12345
+        test_cycle = 'CL-1'
+
+        # Expectation
+        job_ids = ['101', '102', '103']
+
+        # Mock
+        mock_queue_resps = [mocker.Mock(state='IN_WAITING', id=job_id) for job_id in job_ids]
+        mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                                   side_effect=mock_queue_resps)
+
+        # Test
+        reports = py_result_uploader.upload_test_results_in_batches(flat_all_passing_xml,
+                                                                    api_token,
+                                                                    project_id,
+                                                                    test_cycle,
+                                                                    max_logs=2,
+                                                                    max_bytes=None,
+                                                                    workers=1)
+        assert [int(job_id) for job_id in job_ids] == [r.job_id for r in reports]
+        assert [2, 2, 1] == [r.test_log_count for r in reports]
+        assert [None, None, None] == [r.error for r in reports]
+        assert 3 == mock_submit.call_count
+        for call in mock_submit.call_args_list:
+            assert test_cycle == call[1]['body'].test_cycle
+
+    def test_partial_failure(self, flat_all_passing_xml, mocker):
+        """Verify that a failed batch is reported without aborting the remaining batches"""
+
+        # Setup
+        api_token = 'valid_token'
+        project_id = 12345
+        test_cycle = 'CL-1'
+
+        # Mock
+        side_effects = [mocker.Mock(state='IN_WAITING', id='101'),
+                        ApiException('Super duper failure!'),
+                        mocker.Mock(state='IN_WAITING', id='103')]
+        mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', side_effect=side_effects)
+
+        # Test
+        reports = py_result_uploader.upload_test_results_in_batches(flat_all_passing_xml,
+                                                                    api_token,
+                                                                    project_id,
+                                                                    test_cycle,
+                                                                    max_logs=2,
+                                                                    workers=1)
+        assert [101, None, 103] == [r.job_id for r in reports]
+        assert reports[0].error is None
+        assert 'The qTest API reported an error!' in reports[1].error
+
+    def test_transport_failure(self, flat_all_passing_xml, mocker):
+        """Verify that a batch that cannot reach qTest is reported without aborting the remaining batches"""
+
+        # Mock
+        side_effects = [mocker.Mock(state='IN_WAITING', id='101'),
+                        MaxRetryError(None, '/api/v3/projects/12345/auto-test-logs', 'Connection refused'),
+                        ConnectionResetError('Connection reset by peer')]
+        mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', side_effect=side_effects)
+
+        # Test
+        reports = py_result_uploader.upload_test_results_in_batches(flat_all_passing_xml,
+                                                                    'valid_token',
+                                                                    12345,
+                                                                    'CL-1',
+                                                                    max_logs=2,
+                                                                    workers=1,
+                                                                    max_retries=0)
+        assert [101, None, None] == [r.job_id for r in reports]
+        assert 'The qTest API could not be reached!' in reports[1].error
+        assert 'Connection reset by peer' in reports[2].error
+
+
+class TestDeltaUploads(object):
+    """Test cases for uploading only the test logs whose status changed since the last upload"""
+
+    def test_delta(self, flat_mix_status_xml, flat_all_passing_xml, tmpdir, mocker):
+        """Verify that unchanged test logs are skipped, reported and that nothing is sent when nothing changed"""
+
+        # Setup
+        project_id = 12345
+        test_cycle = 'CL-1'
+        delta_reports = []
+
+        # Mock
+        mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                                   return_value=mocker.Mock(state='IN_WAITING', id='101'))
+
+        # Test
+        with StatusSnapshot(tmpdir.strpath) as snapshot, py_result_uploader.QTestUploader('valid_token') as uploader:
+            def upload(path, force_full=False):
+                return uploader.upload_test_results(path,
+                                                    project_id,
+                                                    test_cycle,
+                                                    snapshot=snapshot,
+                                                    force_full=force_full,
+                                                    on_delta=delta_reports.append)
+
+            assert 101 == upload(flat_mix_status_xml)
+            assert upload(flat_mix_status_xml) is None
+            assert 101 == upload(flat_mix_status_xml, force_full=True)
+            assert 101 == upload(flat_all_passing_xml)
+
+        assert [DeltaReport(4, 0), DeltaReport(0, 4), DeltaReport(4, 0), DeltaReport(5, 0)] == delta_reports
+        assert 3 == mock_submit.call_count
+
+    def test_changed_status(self, flat_mix_status_xml, tmpdir, mocker):
+        """Verify that a test log is sent again once its status changes"""
+
+        # Setup
+        project_id = 12345
+        test_cycle = 'CL-1'
+        test_logs = py_result_uploader._build_auto_request([flat_mix_status_xml], test_cycle).test_logs
+        test_logs[0].status = 'FAILED'
+
+        # Mock
+        mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                                   return_value=mocker.Mock(state='IN_WAITING', id='101'))
+
+        # Test
+        with StatusSnapshot(tmpdir.strpath) as snapshot:
+            snapshot.record(project_id, test_cycle, test_logs)
+            with py_result_uploader.QTestUploader('valid_token') as uploader:
+                uploader.upload_test_results(flat_mix_status_xml, project_id, test_cycle, snapshot=snapshot)
+        assert ['test_pass'] == [t.name for t in mock_submit.call_args[1]['body'].test_logs]
+
+    def test_batches_record_successful_batches(self, flat_all_passing_xml, tmpdir, mocker):
+        """Verify that only the test logs of successfully submitted batches are recorded in the snapshot"""
+
+        # Setup
+        project_id = 12345
+        test_cycle = 'CL-1'
+
+        # Mock
+        side_effects = [mocker.Mock(state='IN_WAITING', id='101'),
+                        ApiException('Super duper failure!'),
+                        mocker.Mock(state='IN_WAITING', id='103'),
+                        mocker.Mock(state='IN_WAITING', id='104')]
+        mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                                   side_effect=side_effects)
+
+        # Test
+        with StatusSnapshot(tmpdir.strpath) as snapshot, py_result_uploader.QTestUploader('valid_token') as uploader:
+            for _ in range(2):
+                uploader.upload_test_results_in_batches(flat_all_passing_xml,
+                                                        project_id,
+                                                        test_cycle,
+                                                        max_logs=2,
+                                                        workers=1,
+                                                        max_retries=0,
+                                                        snapshot=snapshot)
+        assert ['test_pass3', 'test_pass4'] == [t.name for t in mock_submit.call_args[1]['body'].test_logs]
+
+    def test_parametrized(self, parametrized_mix_status_xml, tmpdir, mocker):
+        """Verify that unchanged parameters of a parametrized test are skipped together and that parameters split
+        across a failed batch are sent again"""
+
+        # Setup
+        project_id = 12345
+        test_cycle = 'CL-1'
+        delta_reports = []
+
+        # Mock
+        side_effects = [mocker.Mock(state='IN_WAITING', id='101'),
+                        ApiException('Super duper failure!'),
+                        mocker.Mock(state='IN_WAITING', id='103'),
+                        mocker.Mock(state='IN_WAITING', id='104'),
+                        mocker.Mock(state='IN_WAITING', id='105'),
+                        mocker.Mock(state='IN_WAITING', id='106')]
+        mock_submit = mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                                   side_effect=side_effects)
+
+        # Test
+        with StatusSnapshot(tmpdir.strpath) as snapshot, py_result_uploader.QTestUploader('valid_token') as uploader:
+            for _ in range(2):
+                uploader.upload_test_results_in_batches(parametrized_mix_status_xml,
+                                                        project_id,
+                                                        test_cycle,
+                                                        max_logs=2,
+                                                        workers=1,
+                                                        max_retries=0,
+                                                        snapshot=snapshot,
+                                                        on_delta=delta_reports.append)
+            assert uploader.upload_test_results(parametrized_mix_status_xml,
+                                                project_id,
+                                                test_cycle,
+                                                snapshot=snapshot,
+                                                on_delta=delta_reports.append) is None
+
+        assert [DeltaReport(6, 0), DeltaReport(5, 1), DeltaReport(0, 6)] == delta_reports
+        assert 6 == mock_submit.call_count
+        assert (['test_host', 'test_host', 'test_host', 'test_skip', 'test_skip'] ==
+                [t.name for c in mock_submit.call_args_list[3:] for t in c[1]['body'].test_logs])
+
+
+class TestSpooledUploads(object):
+    """Test cases for uploading through a crash-safe spool"""
+
+    def test_resume(self, flat_all_passing_xml, tmpdir, mocker):
+        """Verify that an interrupted spooled upload resumes with only the unacknowledged batches"""
+
+        # Setup
+        project_id = 12345
+        test_cycle = 'CL-1'
+        spool_dir = tmpdir.join('spool').strpath
+
+        # Mock
+        mock_submit = mocker.patch('py_result_uploader.py_result_uploader.submit_serialized',
+                                   side_effect=[mocker.Mock(state='IN_WAITING', id='101'),
+                                                ApiException('Super duper failure!'),
+                                                mocker.Mock(state='IN_WAITING', id='103'),
+                                                mocker.Mock(state='IN_WAITING', id='104')])
+
+        # Test
+        spool, reports = py_result_uploader.upload_test_results_spooled(flat_all_passing_xml,
+                                                                        'valid_token',
+                                                                        project_id,
+                                                                        test_cycle,
+                                                                        spool_dir,
+                                                                        max_logs=2,
+                                                                        workers=1,
+                                                                        max_retries=0)
+        assert [101, None, 103] == [r.job_id for r in reports]
+        assert [1] == spool.pending
+
+        resumed = py_result_uploader.resume_spooled_upload(spool.path, 'valid_token', workers=1)
+        assert [(1, 2, 104)] == [(r.index, r.test_log_count, r.job_id) for r in resumed]
+        assert 4 == mock_submit.call_count
+
+        body = json.loads(mock_submit.call_args[0][2].decode('utf-8'))
+        assert test_cycle == body['test_cycle']
+        assert ['test_pass3', 'test_pass4'] == [t['name'] for t in body['test_logs']]
+        assert not os.path.exists(spool.path)
+
+    def test_transport_failure(self, flat_all_passing_xml, tmpdir, mocker):
+        """Verify that batches that cannot reach qTest are reported and left in the spool for a later resume"""
+
+        # Mock
+        mocker.patch('py_result_uploader.py_result_uploader.submit_serialized',
+                     side_effect=[mocker.Mock(state='IN_WAITING', id='101'),
+                                  MaxRetryError(None, '/api/v3/projects/12345/auto-test-logs', 'Connection refused'),
+                                  ConnectionResetError('Connection reset by peer')])
+
+        # Test
+        spool, reports = py_result_uploader.upload_test_results_spooled(flat_all_passing_xml,
+                                                                        'valid_token',
+                                                                        12345,
+                                                                        'CL-1',
+                                                                        tmpdir.join('spool').strpath,
+                                                                        max_logs=2,
+                                                                        workers=1,
+                                                                        max_retries=0)
+        assert [101, None, None] == [r.job_id for r in reports]
+        assert 'The qTest API could not be reached!' in reports[1].error
+        assert [1, 2] == spool.pending
+        assert os.path.exists(spool.path)
+
+    def test_batches_match_direct_upload(self, flat_all_passing_xml, tmpdir, mocker):
+        """Verify that a spooled batch is sent exactly as it was sealed, encoded like the swagger client would"""
+
+        # Mock
+        mock_submit = mocker.patch('py_result_uploader.py_result_uploader.submit_serialized',
+                                   return_value=mocker.Mock(state='IN_WAITING', id='101'))
+
+        # Test
+        with py_result_uploader.QTestUploader('valid_token') as uploader:
+            spool, reports = uploader.upload_test_results_spooled(flat_all_passing_xml,
+                                                                  12345,
+                                                                  'CL-1',
+                                                                  tmpdir.strpath,
+                                                                  max_logs=None)
+        body = mock_submit.call_args[0][2]
+        assert [len(body)] == [r.byte_size for r in reports]
+        assert 5 == len(json.loads(body.decode('utf-8'))['test_logs'])
+        assert spool.complete
+        assert body.decode('utf-8') == json.dumps(json.loads(body.decode('utf-8')))
+
+
+class TestUploadMetrics(object):
+    """Test cases for measuring the phases of an upload"""
+
+    def test_single_upload(self, flat_mix_status_xml, mocker):
+        """Verify that every phase of a single upload is measured and the request body is sent pre-serialized"""
+
+        # Setup
+        upload_metrics = UploadMetrics()
+
+        # Mock
+        mock_submit = mocker.patch('py_result_uploader.py_result_uploader.submit_serialized',
+                                   return_value=mocker.Mock(state='IN_WAITING', id='54321'))
+
+        # Test
+        response = py_result_uploader.upload_test_results(flat_mix_status_xml,
+                                                          'valid_token',
+                                                          12345,
+                                                          'CL-1',
+                                                          metrics=upload_metrics)
+        assert 54321 == response
+
+        body = mock_submit.call_args[0][2]
+        spans = {span.name: span for span in upload_metrics.spans}
+        assert ['parse', 'build', 'serialize', 'submit'] == [span.name for span in upload_metrics.spans]
+        assert os.path.getsize(flat_mix_status_xml) == spans['parse'].bytes
+        assert 4 == spans['build'].cases
+        assert len(body) == spans['serialize'].bytes == spans['submit'].bytes
+        assert 4 == len(json.loads(body.decode('utf-8'))['test_logs'])
+
+    def test_streamed_upload(self, flat_mix_status_xml, mocker):
+        """Verify that parsing is measured as part of building when the input file is streamed"""
+
+        # Setup
+        spans = []
+
+        # Mock
+        mocker.patch('py_result_uploader.py_result_uploader.submit_serialized',
+                     return_value=mocker.Mock(state='IN_WAITING', id='54321'))
+
+        # Test
+        py_result_uploader.upload_test_results(flat_mix_status_xml,
+                                               'valid_token',
+                                               12345,
+                                               'CL-1',
+                                               stream=True,
+                                               metrics=UploadMetrics(on_span=spans.append))
+        assert ['build', 'serialize', 'submit'] == [span.name for span in spans]
+        assert os.path.getsize(flat_mix_status_xml) == spans[0].bytes
+
+    def test_batches(self, flat_all_passing_xml, mocker):
+        """Verify that the phases of a batched upload are measured across all batches"""
+
+        # Setup
+        upload_metrics = UploadMetrics()
+
+        # Mock
+        mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                     side_effect=[mocker.Mock(state='IN_WAITING', id=job_id) for job_id in ('101', '102', '103')])
+
+        # Test
+        reports = py_result_uploader.upload_test_results_in_batches(flat_all_passing_xml,
+                                                                    'valid_token',
+                                                                    12345,
+                                                                    'CL-1',
+                                                                    max_logs=2,
+                                                                    workers=1,
+                                                                    metrics=upload_metrics)
+
+        spans = {span.name: span for span in upload_metrics.spans}
+        assert 5 == spans['submit'].cases
+        assert sum(r.byte_size for r in reports) == spans['serialize'].bytes == spans['submit'].bytes
+
+
+class TestConvertTestResults(object):
+    """Test cases for the 'convert_test_results' function"""
+
+    @pytest.fixture(autouse=True)
+    def fixed_timestamp(self, mocker):
+        mocker.patch('py_result_uploader.py_result_uploader._utc_timestamp', return_value='2018-01-01T00:00:00Z')
+
+    def _convert(self, input_files, **kwargs):
+        output = io.BytesIO()
+        count = py_result_uploader.convert_test_results(input_files, output, 'CL-1', **kwargs)
+
+        return count, output.getvalue()
+
+    def test_json(self, flat_mix_status_xml, flat_all_passing_xml):
+        """Verify that the JSON is identical to the body of an upload whether or not the input is streamed"""
+
+        # Setup
+        input_files = [flat_mix_status_xml, flat_all_passing_xml]
+        auto_req = py_result_uploader._build_auto_request(input_files, 'CL-1')
+
+        # Expectation
+        body_exp = py_result_uploader.serialize_auto_request(swagger_client.ApiClient(), auto_req)
+
+        # Test
+        assert (9, body_exp) == self._convert(input_files)
+        assert (9, body_exp) == self._convert(input_files, stream=True)
+        assert 'CL-1' == json.loads(body_exp.decode('utf-8'))['test_cycle']
+
+    def test_ndjson(self, flat_mix_status_xml):
+        """Verify that every test log is written on a line of its own"""
+
+        # Setup
+        count, body = self._convert(flat_mix_status_xml, output_format='json')
+        ndjson_count, ndjson = self._convert(flat_mix_status_xml, output_format='ndjson', stream=True)
+
+        # Test
+        assert 4 == count == ndjson_count
+        assert json.loads(body.decode('utf-8'))['test_logs'] == \
+            [json.loads(line) for line in ndjson.decode('utf-8').splitlines()]
+
+    def test_aggregate(self, parametrized_mix_status_xml):
+        """Verify that parametrized tests are aggregated when streaming"""
+
+        # Test
+        assert 3 == self._convert(parametrized_mix_status_xml, output_format='ndjson', stream=True, aggregate=True)[0]
+
+    def test_invalid_input(self, bad_xml):
+        """Verify that invalid input raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            self._convert(bad_xml, stream=True)
+
+    def test_unknown_format(self, flat_mix_status_xml):
+        """Verify that an unknown output format raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            self._convert(flat_mix_status_xml, output_format='xml')
+
+
+class TestWaitForQueueJobs(object):
+    """Test cases for the 'wait_for_queue_jobs' function"""
+
+    def test_happy_path(self, mocker):
+        """Verify that the function polls every job until qTest reports a terminal state"""
+
+        # Setup
+        api_token = 'valid_token'
+        job_ids = [101, 102]
+
+        # Mock
+        mock_track = mocker.patch('swagger_client.TestlogApi.track',
+                                  side_effect=lambda id: mocker.Mock(state='SUCCESS', id=id))
+
+        # Test
+        reports = py_result_uploader.wait_for_queue_jobs(job_ids, api_token, timeout=5)
+        assert job_ids == [r.job_id for r in reports]
+        assert ['SUCCESS', 'SUCCESS'] == [r.state for r in reports]
+        assert 2 == mock_track.call_count
+
+
+class TestQTestUploader(object):
+    """Test cases for the 'QTestUploader' class"""
+
+    def test_reuse_across_uploads(self, single_passing_xml, flat_all_passing_xml, mocker):
+        """Verify that a single uploader can be reused for many uploads without touching the global configuration"""
+
+        # Setup
+        project_id = 12345
+        test_cycle = 'CL-1'
+
+        # Expectation
+        job_ids = ['101', '102']
+
+        # Mock
+        mock_queue_resps = [mocker.Mock(state='IN_WAITING', id=job_id) for job_id in job_ids]
+        mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', side_effect=mock_queue_resps)
+
+        # Test
+        with py_result_uploader.QTestUploader('valid_token') as uploader:
+            responses = [uploader.upload_test_results(single_passing_xml, project_id, test_cycle),
+                         uploader.upload_test_results(flat_all_passing_xml, project_id, test_cycle)]
+        assert [int(job_id) for job_id in job_ids] == responses
+        assert 'Authorization' not in swagger_client.configuration.api_key
+
+    def test_concurrent_uploads(self, single_passing_xml, mocker):
+        """Verify that a single uploader can be used from concurrent threads"""
+
+        # Setup
+        project_id = 12345
+        test_cycle = 'CL-1'
+        responses = []
+        lock = threading.Lock()
+
+        # Mock
+        mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
+                     return_value=mocker.Mock(state='IN_WAITING', id='54321'))
+
+        # Test
+        with py_result_uploader.QTestUploader('valid_token') as uploader:
+            def upload():
+                response = uploader.upload_test_results(single_passing_xml, project_id, test_cycle)
+                with lock:
+                    responses.append(response)
+
+            threads = [threading.Thread(target=upload) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert [54321] * 8 == responses
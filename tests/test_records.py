@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import json
+import pickle
+import pytest
+import swagger_client
+from py_result_uploader import records
+
+
+@pytest.fixture()
+def compact_test_log():
+    return records.CompactTestLog('test_pass',
+                                  'PASSED',
+                                  'GIT_BRANCH',
+                                  '2018-01-01T00:00:00Z',
+                                  '2018-01-01T00:00:01Z',
+                                  'GIT_BRANCH#test_pass')
+
+
+class TestCompactTestLog(object):
+    """Test cases for the 'CompactTestLog' class"""
+
+    def test_wire_format(self, compact_test_log):
+        """Verify that a record serializes to exactly the same JSON as the equivalent swagger model"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+        model = swagger_client.AutomationTestLogResource()
+        model.name = 'test_pass'
+        model.status = 'PASSED'
+        model.module_names = ['GIT_BRANCH']
+        model.exe_start_date = '2018-01-01T00:00:00Z'
+        model.exe_end_date = '2018-01-01T00:00:01Z'
+        model.automation_content = 'GIT_BRANCH#test_pass'
+
+        # Test
+        assert json.dumps(api_client.sanitize_for_serialization(model)) == \
+            json.dumps(api_client.sanitize_for_serialization(compact_test_log))
+
+    def test_to_model(self, compact_test_log):
+        """Verify that a record converts into an equivalent swagger model"""
+
+        # Setup
+        model = compact_test_log.to_model()
+
+        # Test
+        assert isinstance(model, swagger_client.AutomationTestLogResource)
+        assert model.to_dict() == compact_test_log.to_dict()
+        assert ['GIT_BRANCH'] == model.module_names
+
+    def test_compact(self, compact_test_log):
+        """Verify that a record does not carry an instance dictionary"""
+
+        # Test
+        assert not hasattr(compact_test_log, '__dict__')
+        with pytest.raises(AttributeError):
+            compact_test_log.attachments = 'Not a slot'
+
+    def test_pickle(self, compact_test_log):
+        """Verify that a record survives the round trip to and from a worker process"""
+
+        # Setup
+        restored = pickle.loads(pickle.dumps(compact_test_log))
+
+        # Test
+        assert compact_test_log.to_dict() == restored.to_dict()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import json
+import zlib
+import pytest
+import swagger_client
+from swagger_client.rest import ApiException
+from py_result_uploader import records
+from py_result_uploader import serializer
+
+
+@pytest.fixture()
+def auto_request():
+    test_logs = []
+    for index, status in enumerate(['PASSED', 'FAILED', 'SKIPPED']):
+        test_logs.append(records.CompactTestLog(u'test_ünicode_{}'.format(index),
+                                                status,
+                                                'GIT_BRANCH',
+                                                '2018-01-01T00:00:00Z',
+                                                '2018-01-01T00:00:01Z',
+                                                'GIT_BRANCH#test_{}'.format(index)))
+    model = swagger_client.AutomationTestLogResource()
+    model.name = 'test_model'
+    model.status = 'PASSED'
+    model.module_names = ['GIT_BRANCH']
+    model.automation_content = 'GIT_BRANCH#test_model'
+    test_logs.append(model)
+
+    auto_req = swagger_client.AutomationRequest()
+    auto_req.test_cycle = 'CL-1'
+    auto_req.test_logs = test_logs
+    auto_req.execution_date = '2018-01-01T00:00:00Z'
+
+    return auto_req
+
+
+class TestSerializeAutoRequest(object):
+    """Test cases for the 'serialize_auto_request' function"""
+
+    def test_wire_format(self, auto_request):
+        """Verify that the incremental serializer produces exactly the same body as the swagger client"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+
+        # Expectation
+        body_exp = json.dumps(api_client.sanitize_for_serialization(auto_request)).encode('utf-8')
+
+        # Test
+        assert body_exp == serializer.serialize_auto_request(api_client, auto_request)
+
+    def test_empty_test_logs(self):
+        """Verify that a request without test logs serializes the same as the swagger client"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+        auto_req = swagger_client.AutomationRequest()
+        auto_req.test_cycle = 'CL-1'
+        auto_req.test_logs = []
+
+        # Test
+        assert json.dumps(api_client.sanitize_for_serialization(auto_req)).encode('utf-8') == \
+            serializer.serialize_auto_request(api_client, auto_req)
+
+
+class TestIterJsonChunks(object):
+    """Test cases for the 'iter_json_chunks' function"""
+
+    def test_chunk_size(self, auto_request):
+        """Verify that the body is split into multiple chunks that concatenate into the full document"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+
+        # Test
+        chunks = list(serializer.iter_json_chunks(api_client, auto_request, chunk_size=64))
+        assert len(chunks) > 1
+        assert serializer.serialize_auto_request(api_client, auto_request) == b''.join(chunks)
+
+
+class TestSubmitChunked(object):
+    """Test cases for the 'submit_chunked' function"""
+
+    def test_chunked_request(self, auto_request, mocker):
+        """Verify that the request is sent as a chunked, authorized POST to the auto test logs endpoint"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+        api_client.host = 'https://qtest.example.com'
+        mocker.patch.object(api_client, 'update_params_for_auth',
+                            side_effect=lambda headers, querys, auth: headers.update(Authorization='valid_token'))
+
+        # Mock
+        mock_urlopen = mocker.patch.object(api_client.rest_client.pool_manager, 'urlopen')
+        mock_urlopen.return_value = mocker.Mock(status=201,
+                                                reason='Created',
+                                                data=b'{"id": 101, "state": "IN_WAITING"}')
+
+        # Test
+        response = serializer.submit_chunked(api_client, 12345, auto_request)
+        assert 101 == response.id
+        assert 'IN_WAITING' == response.state
+
+        args, kwargs = mock_urlopen.call_args
+        assert ('POST', 'https://qtest.example.com/api/v3/projects/12345/auto-test-logs?type=automation') == args
+        assert kwargs['chunked'] is True
+        assert 'valid_token' == kwargs['headers']['Authorization']
+        assert 'application/json' == kwargs['headers']['Content-Type']
+        assert serializer.serialize_auto_request(api_client, auto_request) == b''.join(kwargs['body'])
+
+    def test_api_error(self, auto_request, mocker):
+        """Verify that an error response is raised as an 'ApiException'"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+
+        # Mock
+        mock_urlopen = mocker.patch.object(api_client.rest_client.pool_manager, 'urlopen')
+        mock_urlopen.return_value = mocker.Mock(status=429, reason='Too Many Requests', data=b'slow down')
+
+        # Test
+        with pytest.raises(ApiException) as e:
+            serializer.submit_chunked(api_client, 12345, auto_request)
+        assert 429 == e.value.status
+
+
+class TestSubmitCompressed(object):
+    """Test cases for the 'submit_compressed' function"""
+
+    @pytest.mark.parametrize('content_encoding,wbits', [('gzip', 16 + zlib.MAX_WBITS), ('deflate', zlib.MAX_WBITS)])
+    @pytest.mark.parametrize('chunked', [False, True])
+    def test_compressed_request(self, auto_request, content_encoding, wbits, chunked, mocker):
+        """Verify that the body is compressed with the requested content encoding and the sizes are reported"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+        body_exp = serializer.serialize_auto_request(api_client, auto_request)
+
+        sent = {}
+
+        def urlopen(method, url, body, headers, chunked, preload_content):
+            sent.update(body=body if isinstance(body, bytes) else b''.join(body), headers=headers, chunked=chunked)
+            return mocker.Mock(status=201, reason='Created', data=b'{"id": 101, "state": "IN_WAITING"}')
+
+        # Mock
+        mocker.patch.object(api_client.rest_client.pool_manager, 'urlopen', side_effect=urlopen)
+
+        # Test
+        response, report = serializer.submit_compressed(api_client,
+                                                        12345,
+                                                        auto_request,
+                                                        content_encoding,
+                                                        chunked=chunked,
+                                                        chunk_size=64)
+        assert 101 == response.id
+
+        kwargs = sent
+        body = sent['body']
+        assert content_encoding == kwargs['headers']['Content-Encoding']
+        assert chunked == kwargs['chunked']
+        assert body_exp == zlib.decompress(body, wbits)
+        assert (content_encoding, len(body_exp), len(body)) == report
+
+    def test_compression_ratio(self, mocker):
+        """Verify that repetitive test logs are reported as highly compressible"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+        auto_req = swagger_client.AutomationRequest()
+        auto_req.test_cycle = 'CL-1'
+        auto_req.test_logs = [records.CompactTestLog('test_{}'.format(i),
+                                                     'PASSED',
+                                                     'GIT_BRANCH',
+                                                     '2018-01-01T00:00:00Z',
+                                                     '2018-01-01T00:00:01Z',
+                                                     'GIT_BRANCH#test_{}'.format(i)) for i in range(1000)]
+
+        # Mock
+        mock_urlopen = mocker.patch.object(api_client.rest_client.pool_manager, 'urlopen')
+        mock_urlopen.return_value = mocker.Mock(status=201, reason='Created', data=b'{"id": 101}')
+
+        # Test
+        report = serializer.submit_compressed(api_client, 12345, auto_req)[1]
+        assert report.ratio > 10
+        assert report.raw_bytes - report.sent_bytes == report.saved_bytes
+
+    @pytest.mark.parametrize('status,data', [(415, b''), (400, b'{"message": "Unsupported Content-Encoding: gzip"}')])
+    def test_fallback(self, auto_request, mocker, status, data):
+        """Verify that a request whose compressed body is rejected is sent again uncompressed"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+        body_exp = serializer.serialize_auto_request(api_client, auto_request)
+
+        # Mock
+        mock_urlopen = mocker.patch.object(api_client.rest_client.pool_manager, 'urlopen')
+        mock_urlopen.side_effect = [mocker.Mock(status=status, reason='Rejected', data=data),
+                                    mocker.Mock(status=201, reason='Created', data=b'{"id": 101}')]
+
+        # Test
+        response, report = serializer.submit_compressed(api_client, 12345, auto_request, 'gzip')
+        assert 101 == response.id
+        assert (None, len(body_exp), len(body_exp)) == report
+        assert 1.0 == report.ratio
+
+        kwargs = mock_urlopen.call_args[1]
+        assert 'Content-Encoding' not in kwargs['headers']
+        assert body_exp == kwargs['body']
+
+    @pytest.mark.parametrize('status,data', [(503, b''), (400, b'{"message": "Malformed automation request!"}')])
+    def test_other_errors_not_retried(self, auto_request, mocker, status, data):
+        """Verify that errors unrelated to compression are raised without sending the request again"""
+
+        # Setup
+        api_client = swagger_client.ApiClient()
+
+        # Mock
+        mock_urlopen = mocker.patch.object(api_client.rest_client.pool_manager, 'urlopen')
+        mock_urlopen.return_value = mocker.Mock(status=status, reason='Failed', data=data)
+
+        # Test
+        with pytest.raises(ApiException):
+            serializer.submit_compressed(api_client, 12345, auto_request, 'gzip')
+        assert 1 == mock_urlopen.call_count
+
+    def test_unsupported_encoding(self, auto_request):
+        """Verify that an unknown content encoding is rejected"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            serializer.submit_compressed(swagger_client.ApiClient(), 12345, auto_request, 'br')
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import xml.etree.ElementTree as Etree
+from py_result_uploader import sharding
+
+
+class TestFindTestsuites(object):
+    """Test cases for the 'find_testsuites' function"""
+
+    def test_testsuites_root(self, multi_suite_xml):
+        """Verify that every top level testsuite is located and can be read as a standalone document"""
+
+        # Setup
+        layout = sharding.find_testsuites(multi_suite_xml)
+
+        # Test
+        assert 4 == len(layout.ranges)
+        assert ['pike', 'queens', 'empty', 'inherited'] == \
+            [Etree.fromstring(sharding.read_testsuite(multi_suite_xml, layout.prolog, start, end)).attrib['name']
+             for start, end in layout.ranges]
+
+    def test_skeleton(self, multi_suite_xml):
+        """Verify that the skeleton keeps the properties of the root element without any testsuites"""
+
+        # Setup
+        layout = sharding.find_testsuites(multi_suite_xml)
+        skeleton = Etree.fromstring(layout.prolog + layout.skeleton)
+
+        # Test
+        assert 'testsuites' == skeleton.tag
+        assert [] == skeleton.findall('testsuite')
+        assert 2 == len(skeleton.findall('./properties/property'))
+
+    def test_quoted_markup(self, tmpdir):
+        """Verify that markup inside of comments, CDATA sections and attribute values is not mistaken for a tag"""
+
+        # Setup
+        file_path = tmpdir.join('quoted.xml').strpath
+        with open(file_path, 'w') as f:
+            f.write('<testsuites><!-- <testsuite> -->'
+                    '<testsuite name="a/>b"><testcase name="x"><![CDATA[</testsuite>]]></testcase></testsuite>'
+                    '<testsuite name="c"/>'
+                    '</testsuites>')
+
+        # Test
+        assert 2 == len(sharding.find_testsuites(file_path).ranges)
+
+    def test_not_splittable(self, flat_all_passing_xml, bad_junit_root, bad_xml, tmpdir):
+        """Verify that files without a "testsuites" root element or that cannot be split safely are not split"""
+
+        # Setup
+        empty = tmpdir.join('empty.xml')
+        empty.write('')
+        doctype = tmpdir.join('doctype.xml')
+        doctype.write('<!DOCTYPE testsuites [<!ENTITY b "master">]><testsuites><testsuite/></testsuites>')
+        unclosed = tmpdir.join('unclosed.xml')
+        unclosed.write('<testsuites><testsuite></testsuite>')
+
+        # Test
+        for file_path in [flat_all_passing_xml, bad_junit_root, bad_xml, '/path/does/not/exist',
+                          empty.strpath, doctype.strpath, unclosed.strpath]:
+            assert sharding.find_testsuites(file_path) is None
+
+
+class TestFindTestcases(object):
+    """Test cases for the 'find_testcases' function"""
+
+    def test_shards(self, large_suite_xml):
+        """Verify that the testcases are split into shards that can be read as standalone documents"""
+
+        # Setup
+        layout = sharding.find_testcases(large_suite_xml, shard_bytes=500)
+        shards = [Etree.fromstring(sharding.read_testcases(large_suite_xml, layout.prolog, layout.root_tag, start, end))
+                  for start, end in layout.ranges]
+
+        # Test
+        assert 2 < len(shards)
+        assert 'test_case0[ansible://localhost]' == shards[0].find('testcase').attrib['name']
+        assert [tc.attrib['name'] for tc in Etree.parse(large_suite_xml).getroot().findall('testcase')] == \
+            [tc.attrib['name'] for shard in shards for tc in shard.findall('testcase')]
+
+    def test_skeleton(self, large_suite_xml):
+        """Verify that the skeleton keeps every property of the testsuite without any testcases"""
+
+        # Setup
+        layout = sharding.find_testcases(large_suite_xml, shard_bytes=500)
+        skeleton = Etree.fromstring(layout.prolog + layout.skeleton)
+
+        # Test
+        assert 'testsuite' == skeleton.tag
+        assert [] == skeleton.findall('testcase')
+        assert ['GIT_BRANCH', 'GIT_REPO', 'TRAILING'] == \
+            [p.attrib['name'] for p in skeleton.findall('./properties/property')]
+
+    def test_not_splittable(self, large_suite_xml, multi_suite_xml, tmpdir):
+        """Verify that small files and files without a flat "testsuite" root element are not split"""
+
+        # Setup
+        nested = tmpdir.join('nested.xml')
+        nested.write('<testsuite>{}</testsuite>'.format('<testsuite><testcase name="x"/></testsuite>' * 100))
+        unclosed = tmpdir.join('unclosed.xml')
+        unclosed.write('<testsuite>{}'.format('<testcase name="x"/>' * 100))
+
+        # Test
+        assert sharding.find_testcases(large_suite_xml) is None
+        assert sharding.find_testcases(multi_suite_xml, shard_bytes=100) is None
+        assert sharding.find_testcases(nested.strpath, shard_bytes=100) is None
+        assert sharding.find_testcases(unclosed.strpath, shard_bytes=100) is None
+        assert sharding.find_testcases(tmpdir.join('missing.xml').strpath, shard_bytes=100) is None
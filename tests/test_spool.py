@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import pytest
+from py_result_uploader import spool
+
+
+@pytest.fixture()
+def sealed_spool(tmpdir):
+    return spool.UploadSpool.create(tmpdir.strpath, 12345, 'CL-1', [(b'{"batch": 0}', 2), (b'{"batch": 1}', 1)])
+
+
+class TestUploadSpool(object):
+    """Test cases for the 'UploadSpool' class"""
+
+    def test_create(self, sealed_spool):
+        """Verify that a new spool holds every batch and that nothing has been acknowledged"""
+
+        # Test
+        assert 12345 == sealed_spool.qtest_project_id
+        assert 'CL-1' == sealed_spool.qtest_test_cycle
+        assert [{'test_log_count': 2, 'byte_size': 12}, {'test_log_count': 1, 'byte_size': 12}] == sealed_spool.batches
+        assert [0, 1] == sealed_spool.pending
+        assert b'{"batch": 1}' == sealed_spool.read_batch(1)
+        assert not sealed_spool.complete
+
+    def test_checkpoints_survive_restart(self, sealed_spool):
+        """Verify that acknowledged batches are remembered when the spool is opened again"""
+
+        # Setup
+        sealed_spool.acknowledge(1, 102)
+
+        # Test
+        reopened = spool.UploadSpool(sealed_spool.path)
+        assert [0] == reopened.pending
+        assert {1: 102} == reopened.job_ids
+
+        reopened.acknowledge(0, 101)
+        assert spool.UploadSpool(sealed_spool.path).complete
+
+    def test_torn_checkpoint(self, sealed_spool):
+        """Verify that a checkpoint that was only partially written before a crash is ignored"""
+
+        # Setup
+        sealed_spool.acknowledge(0, 101)
+        with open(os.path.join(sealed_spool.path, spool.CHECKPOINT_FILE_NAME), 'a') as f:
+            f.write('{"index": 1, "jo')
+
+        # Test
+        assert [1] == spool.UploadSpool(sealed_spool.path).pending
+
+    def test_unsealed(self, tmpdir, sealed_spool):
+        """Verify that a spool without a manifest is rejected and not listed"""
+
+        # Setup
+        tmpdir.mkdir('unsealed').join(spool.BATCH_FILE_NAME.format(0)).write('{}')
+
+        # Test
+        with pytest.raises(RuntimeError):
+            spool.UploadSpool(tmpdir.join('unsealed').strpath)
+        assert [sealed_spool.path] == [s.path for s in spool.list_spools(tmpdir.strpath)]
+
+    def test_remove(self, tmpdir, sealed_spool):
+        """Verify that a removed spool is gone from disk"""
+
+        # Test
+        sealed_spool.remove()
+        assert not os.path.exists(sealed_spool.path)
+        assert [] == spool.list_spools(tmpdir.strpath)
+        assert [] == spool.list_spools(tmpdir.join('missing').strpath)
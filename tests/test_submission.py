@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import time
+import threading
+import pytest
+from email.utils import formatdate
+from urllib3.exceptions import MaxRetryError, ProtocolError, ReadTimeoutError
+from py_result_uploader import submission
+
+
+class FakeApiError(Exception):
+    """An exception shaped like a swagger 'ApiException'."""
+
+    def __init__(self, status, headers=None):
+        super(FakeApiError, self).__init__('HTTP {}'.format(status))
+        self.status = status
+        self.headers = headers
+
+
+class TestRetryAfter(object):
+    """Test cases for the '_retry_after' function"""
+
+    def test_seconds(self):
+        """Verify that a delay-seconds "Retry-After" header is honored"""
+
+        # Test
+        assert 7.0 == submission._retry_after(FakeApiError(429, {'Retry-After': '7'}))
+
+    def test_http_date(self):
+        """Verify that a HTTP-date "Retry-After" header is converted into a delay"""
+
+        # Setup
+        delay = submission._retry_after(FakeApiError(503, {'retry-after': formatdate(time.time() + 30)}))
+
+        # Test
+        assert 25 < delay <= 30
+
+    def test_missing(self):
+        """Verify that a missing or unparseable "Retry-After" header is ignored"""
+
+        # Test
+        assert submission._retry_after(FakeApiError(503)) is None
+        assert submission._retry_after(FakeApiError(503, {'Retry-After': 'soon'})) is None
+
+
+class TestSubmissionController(object):
+    """Test cases for the 'SubmissionController' class"""
+
+    def test_retry_transient_failure(self):
+        """Verify that transient failures are retried after the delay requested by the server"""
+
+        # Setup
+        sleeps = []
+        responses = [FakeApiError(429, {'Retry-After': '3'}), FakeApiError(503, {'Retry-After': '1'}), 'queued']
+        controller = submission.SubmissionController(sleep=sleeps.append)
+
+        def func(value):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return '{} {}'.format(response, value)
+
+        # Test
+        assert 'queued job' == controller.submit(func, 'job')
+        assert [3.0, 1.0] == sleeps
+        assert 2 == controller.retries
+        assert 1 == controller.throttled
+
+    def test_non_transient_failure(self):
+        """Verify that non-transient failures are raised without retrying"""
+
+        # Setup
+        sleeps = []
+        controller = submission.SubmissionController(sleep=sleeps.append)
+
+        def func():
+            raise FakeApiError(400)
+
+        # Test
+        with pytest.raises(FakeApiError):
+            controller.submit(func)
+        assert [] == sleeps
+
+    @pytest.mark.parametrize('error', [ConnectionResetError(104, 'Connection reset by peer'),
+                                       ReadTimeoutError(None, '/api/v3', 'Read timed out.'),
+                                       ProtocolError('Connection aborted.'),
+                                       MaxRetryError(None, '/api/v3')])
+    def test_retry_connection_failure(self, error):
+        """Verify that dropped, reset and timed out connections are retried as transient failures"""
+
+        # Setup
+        responses = [error, 'queued']
+        controller = submission.SubmissionController(sleep=lambda s: None)
+
+        def func():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        # Test
+        assert 'queued' == controller.submit(func)
+        assert 1 == controller.retries
+        assert 0 == controller.throttled
+
+    def test_retries_exhausted(self):
+        """Verify that a transient failure is raised once the retries are exhausted"""
+
+        # Setup
+        calls = []
+        controller = submission.SubmissionController(max_retries=2, max_backoff=5, sleep=lambda s: None)
+
+        def func():
+            calls.append(1)
+            raise FakeApiError(503)
+
+        # Test
+        with pytest.raises(FakeApiError):
+            controller.submit(func)
+        assert 3 == len(calls)
+
+    def test_additive_increase(self):
+        """Verify that the in-flight limit grows by roughly one per round trip of successful requests"""
+
+        # Setup
+        controller = submission.SubmissionController(initial_limit=1, max_limit=4)
+
+        # Test
+        for _ in range(20):
+            controller.submit(lambda: None)
+        assert 4 == controller.limit
+
+    def test_multiplicative_decrease(self):
+        """Verify that the in-flight limit shrinks when the server pushes back"""
+
+        # Setup
+        responses = [FakeApiError(503), None]
+        controller = submission.SubmissionController(initial_limit=8, max_limit=8, sleep=lambda s: None)
+
+        def func():
+            response = responses.pop(0)
+            if response:
+                raise response
+
+        # Test
+        controller.submit(func)
+        assert 4 == controller.limit
+
+    def test_latency_target(self):
+        """Verify that the in-flight limit shrinks when responses are slower than the latency target"""
+
+        # Setup
+        controller = submission.SubmissionController(initial_limit=8, max_limit=8, latency_target=0.01)
+
+        # Test
+        controller.submit(time.sleep, 0.05)
+        assert 4 == controller.limit
+
+    def test_limit_enforced(self):
+        """Verify that no more requests than the current limit are ever in flight"""
+
+        # Setup
+        limit = 3
+        controller = submission.SubmissionController(initial_limit=limit, max_limit=limit)
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+
+        def func():
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+        threads = [threading.Thread(target=controller.submit, args=(func,)) for _ in range(12)]
+
+        # Test
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert limit == peak[0]
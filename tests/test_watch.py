@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import time
+import sqlite3
+import threading
+import pytest
+from py_result_uploader import watch
+from py_result_uploader import py_result_uploader
+
+
+class FakeUploader(object):
+    """Record uploaded file paths and hand out incrementing job IDs."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.uploaded = []
+
+    def upload(self, path):
+        if self.fail:
+            raise RuntimeError('Super duper failure!')
+        self.uploaded.append(path)
+
+        return len(self.uploaded)
+
+
+@pytest.fixture()
+def ledger(tmpdir):
+    ledger = watch.UploadLedger(tmpdir.join('ledger.sqlite').strpath)
+    yield ledger
+    ledger.close()
+
+
+class TestUploadLedger(object):
+    """Test cases for the 'UploadLedger' class"""
+
+    def test_uploaded_once(self, ledger):
+        """Verify that an uploaded file is never uploaded again, even if it changes"""
+
+        # Test
+        assert ledger.should_upload('/results/a.xml', (10, 1))
+        ledger.record('/results/a.xml', (10, 1), job_id=101)
+        assert not ledger.should_upload('/results/a.xml', (10, 1))
+        assert not ledger.should_upload('/results/a.xml', (20, 2))
+
+    def test_failed_retried_after_change(self, ledger):
+        """Verify that a failed file is retried as soon as its contents change"""
+
+        # Test
+        ledger.record('/results/a.xml', (10, 1), error='Super duper failure!')
+        assert not ledger.should_upload('/results/a.xml', (10, 1))
+        assert ledger.should_upload('/results/a.xml', (20, 2))
+
+    def test_failed_retried_after_backoff(self, ledger, mocker):
+        """Verify that an unchanged failed file is retried after a delay that doubles with every failure"""
+
+        # Mock
+        mock_time = mocker.patch('py_result_uploader.watch.time.time', return_value=1000.0)
+
+        # Test
+        ledger.record('/results/a.xml', (10, 1), error='Super duper failure!')
+        assert [] == ledger.due_retries()
+        mock_time.return_value = 1030.0
+        assert ledger.should_upload('/results/a.xml', (10, 1))
+        assert ['/results/a.xml'] == ledger.due_retries()
+        ledger.record('/results/a.xml', (10, 1), error='Super duper failure!')
+        mock_time.return_value = 1089.0
+        assert not ledger.should_upload('/results/a.xml', (10, 1))
+        mock_time.return_value = 1090.0
+        assert ledger.should_upload('/results/a.xml', (10, 1))
+        ledger.record('/results/a.xml', (10, 1), job_id=101)
+        assert not ledger.should_upload('/results/a.xml', (10, 1))
+        assert [] == ledger.due_retries()
+
+    def test_upgrade_schema(self, tmpdir):
+        """Verify that a ledger written without the retry columns is upgraded and its failures are retried"""
+
+        # Setup
+        path = tmpdir.join('ledger.sqlite').strpath
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE uploads (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, state TEXT, '
+                     'job_id INTEGER, error TEXT, updated REAL)')
+        conn.execute("INSERT INTO uploads VALUES ('/results/a.xml', 10, 1, 'failed', NULL, 'Super duper failure!', 0)")
+        conn.commit()
+        conn.close()
+
+        # Test
+        ledger = watch.UploadLedger(path)
+        assert ledger.should_upload('/results/a.xml', (10, 1))
+        ledger.record('/results/a.xml', (10, 1), job_id=101)
+        assert not ledger.should_upload('/results/a.xml', (10, 1))
+        ledger.close()
+
+    def test_persistent(self, tmpdir):
+        """Verify that the record survives reopening the database"""
+
+        # Setup
+        path = tmpdir.join('ledger.sqlite').strpath
+        first = watch.UploadLedger(path)
+        first.record('/results/a.xml', (10, 1), job_id=101)
+        first.close()
+
+        # Test
+        second = watch.UploadLedger(path)
+        assert not second.should_upload('/results/a.xml', (10, 1))
+        second.close()
+
+
+class TestDirectoryWatcher(object):
+    """Test cases for the 'DirectoryWatcher' class"""
+
+    def test_upload_existing_files_once(self, tmpdir, ledger):
+        """Verify that matching files are uploaded once they settle and are never uploaded twice"""
+
+        # Setup
+        tmpdir.join('a.xml').write('<testsuite/>')
+        tmpdir.join('notes.txt').write('ignored')
+        uploader = FakeUploader()
+        watcher = watch.DirectoryWatcher(tmpdir.strpath, uploader.upload, ledger, settle=0, use_notifications=False)
+
+        # Test
+        watcher.scan()
+        watcher.process_settled()     # First sighting records the signature.
+        watcher.process_settled()
+        watcher.scan()
+        watcher.process_settled()
+        assert [tmpdir.join('a.xml').strpath] == uploader.uploaded
+
+    def test_debounce_partial_file(self, tmpdir, ledger):
+        """Verify that a file which is still being written is not uploaded until it stops changing"""
+
+        # Setup
+        partial = tmpdir.join('a.xml')
+        partial.write('<testsuite>')
+        uploader = FakeUploader()
+        watcher = watch.DirectoryWatcher(tmpdir.strpath, uploader.upload, ledger, settle=0, use_notifications=False)
+
+        # Test
+        watcher.scan()
+        watcher.process_settled()
+        partial.write('<testsuite></testsuite>')
+        watcher.process_settled()     # The file changed so the settle timer restarts.
+        assert [] == uploader.uploaded
+        watcher.process_settled()
+        assert [partial.strpath] == uploader.uploaded
+
+    def test_settle_time(self, tmpdir, ledger):
+        """Verify that a file is not uploaded before the settle time has passed"""
+
+        # Setup
+        tmpdir.join('a.xml').write('<testsuite/>')
+        uploader = FakeUploader()
+        watcher = watch.DirectoryWatcher(tmpdir.strpath, uploader.upload, ledger, settle=60, use_notifications=False)
+
+        # Test
+        watcher.scan()
+        watcher.process_settled()
+        watcher.process_settled()
+        assert [] == uploader.uploaded
+
+    def test_failed_upload(self, tmpdir, ledger):
+        """Verify that failed uploads are reported and recorded"""
+
+        # Setup
+        tmpdir.join('a.xml').write('<testsuite/>')
+        results = []
+        uploader = FakeUploader(fail=True)
+        watcher = watch.DirectoryWatcher(tmpdir.strpath,
+                                         uploader.upload,
+                                         ledger,
+                                         settle=0,
+                                         use_notifications=False,
+                                         on_result=lambda *args: results.append(args))
+
+        # Test
+        watcher.scan()
+        watcher.process_settled()
+        watcher.process_settled()
+        watcher.scan()
+        watcher.process_settled()
+        assert 1 == len(results)
+        assert 'Super duper failure!' == results[0][2]
+
+    @pytest.mark.parametrize('use_scan', [True, False])
+    def test_failed_upload_retried(self, tmpdir, use_scan):
+        """Verify that an unchanged file whose upload failed is uploaded on a later pass once its retry is due"""
+
+        # Setup
+        tmpdir.join('a.xml').write('<testsuite/>')
+        ledger = watch.UploadLedger(tmpdir.join('ledger.sqlite').strpath, retry_backoff=0)
+        results = []
+        uploader = FakeUploader(fail=True)
+        watcher = watch.DirectoryWatcher(tmpdir.strpath,
+                                         uploader.upload,
+                                         ledger,
+                                         settle=0,
+                                         use_notifications=False,
+                                         on_result=lambda *args: results.append(args))
+
+        # Test
+        watcher.scan()
+        watcher.process_settled()
+        watcher.process_settled()
+        uploader.fail = False
+        if use_scan:
+            watcher.scan()
+        else:
+            watcher.requeue_failed()
+        watcher.process_settled()
+        watcher.process_settled()
+        ledger.close()
+        assert [tmpdir.join('a.xml').strpath] == uploader.uploaded
+        assert ['Super duper failure!', None] == [error for _, _, error in results]
+
+    def test_malformed_file(self, tmpdir, ledger):
+        """Verify that unexpected errors from malformed files are recorded and the other files are still uploaded"""
+
+        # Setup
+        tmpdir.join('a.xml').write('<testsuite><properties><property name="GIT_BRANCH" value="master"/></properties>'
+                                   '<testcase classname="a" name="test_plain"/></testsuite>')
+        tmpdir.join('b.xml').write('<testsuite><testcase classname="a" name="test_x[local]"/></testsuite>')
+        tmpdir.join('c.xml').write('<testsuite/>')
+        results = []
+        uploader = FakeUploader()
+
+        def upload(path):
+            py_result_uploader._build_auto_request(path, 'CL-1')
+            return uploader.upload(path)
+
+        watcher = watch.DirectoryWatcher(tmpdir.strpath,
+                                         upload,
+                                         ledger,
+                                         settle=0,
+                                         use_notifications=False,
+                                         on_result=lambda *args: results.append(args))
+
+        # Test
+        watcher.scan()
+        watcher.process_settled()
+        watcher.process_settled()
+        errors = {os.path.basename(path): error for path, _, error in results}
+        assert errors['a.xml'].startswith('Unexpected AttributeError')
+        assert errors['b.xml'].startswith('Unexpected KeyError')
+        assert errors['c.xml'] is None
+        assert [tmpdir.join('c.xml').strpath] == uploader.uploaded
+        malformed = tmpdir.join('a.xml').strpath
+        assert not ledger.should_upload(malformed, watch._file_signature(malformed))
+
+    @pytest.mark.parametrize('use_notifications', [True, False])
+    def test_run(self, tmpdir, ledger, use_notifications):
+        """Verify that files created while watching are uploaded"""
+
+        # Setup
+        uploader = FakeUploader()
+        stop_event = threading.Event()
+        watcher = watch.DirectoryWatcher(tmpdir.strpath,
+                                         uploader.upload,
+                                         ledger,
+                                         settle=0.05,
+                                         poll_interval=0.02,
+                                         use_notifications=use_notifications)
+        thread = threading.Thread(target=watcher.run, args=(stop_event,))
+
+        # Test
+        thread.start()
+        try:
+            time.sleep(0.1)
+            tmpdir.join('a.xml').write('<testsuite/>')
+            deadline = time.time() + 5
+            while not uploader.uploaded and time.time() < deadline:
+                time.sleep(0.02)
+        finally:
+            stop_event.set()
+            thread.join()
+        assert [os.path.join(tmpdir.strpath, 'a.xml')] == uploader.uploaded